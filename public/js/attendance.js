@@ -51,8 +51,37 @@ const AttendanceTheme = (() => {
 })();
 window.AttendanceTheme = AttendanceTheme;
 
-function difficultyOf(row) {
-  return row.difficulty || 'other';
+const DAY_MS = 86400000;
+
+// /attendance/activities.json sends the activities column by column (see _activity_columns in main.py):
+// repeated strings dictionary-encoded, per-event fields once per event, dates as day increments. Decode
+// it into typed arrays and per-index lookups rather than one object per activity.
+function decodeActivities(cols) {
+  const n = cols.n;
+  const ts = new Float64Array(n);
+  for (let i = 0, day = 0; i < n; i++) {
+    day += cols.day[i];
+    ts[i] = day * DAY_MS;
+  }
+  const lookup = (col) => (i) => col.values[col.index[i]];
+  return {
+    n,
+    ts,
+    activityId: Int32Array.from(cols.activity_id),
+    named: Int32Array.from(cols.named_total),
+    aggregate: Int32Array.from(cols.aggregate_total),
+    total: Int32Array.from(cols.total),
+    unknown: Int32Array.from(cols.named_unknown),
+    registered: Int32Array.from(cols.named_registered),
+    waitlisted: Int32Array.from(cols.event, (e) => cols.events.waitlisted[e]),
+    event: Int32Array.from(cols.event),
+    eventName: (i) => cols.events.name[cols.event[i]],
+    eventType: (i) => cols.events.event_type[cols.event[i]],
+    activityName: lookup(cols.activity_name),
+    difficulty: (i) => lookup(cols.difficulty)(i) || 'other',
+    eventTypes: new Set(cols.events.event_type),
+    difficulties: new Set(cols.difficulty.values.map((d) => d || 'other')),
+  };
 }
 
 // Shape name -> ECharts symbol string (custom path, or the built-in 'circle').
@@ -70,23 +99,27 @@ function svgSwatch(shape, { fill, stroke, strokeWidth = 1 }) {
   return `<svg viewBox="-11 -11 22 22" aria-hidden="true">${body}</svg>`;
 }
 
-// A tooltip HTML string built per point, so the chart's formatter is a trivial lookup.
-function attendedTip(r) {
-  return `<b>${r.event_name}</b><br>${r.activity_name}<br>${(r.date || '').slice(0, 10)}<br>` +
-    `Attended: ${r.total} (named ${r.named_total} + door ${r.aggregate_total})`;
+function isoDate(acts, i) {
+  return new Date(acts.ts[i]).toISOString().slice(0, 10);
+}
+
+// Tooltip HTML for activity i, built when the point is hovered rather than up front for every point.
+function attendedTip(acts, i) {
+  return `<b>${acts.eventName(i)}</b><br>${acts.activityName(i)}<br>${isoDate(acts, i)}<br>` +
+    `Attended: ${acts.total[i]} (named ${acts.named[i]} + door ${acts.aggregate[i]})`;
 }
-function registeredTip(r) {
-  return `<b>${r.event_name}</b><br>${r.activity_name}<br>${(r.date || '').slice(0, 10)}<br>` +
-    `Registered + waitlist: ${r.named_registered + r.waitlisted} ` +
-    `(registered ${r.named_registered} + waitlist ${r.waitlisted})<br>Turnout unknown: ${r.named_unknown}`;
+function registeredTip(acts, i) {
+  return `<b>${acts.eventName(i)}</b><br>${acts.activityName(i)}<br>${isoDate(acts, i)}<br>` +
+    `Registered + waitlist: ${acts.registered[i] + acts.waitlisted[i]} ` +
+    `(registered ${acts.registered[i]} + waitlist ${acts.waitlisted[i]})<br>Turnout unknown: ${acts.unknown[i]}`;
 }
 
-// customdata carried on each point for the pinned detail panel (order matches renderPointPanel).
-function customdata(r) {
+// customdata for the pinned detail panel (order matches renderPointPanel).
+function customdata(acts, i) {
   return [
-    r.event_name, r.activity_name, r.event_type, difficultyOf(r),
-    r.named_total, r.aggregate_total, r.total, r.named_registered, r.named_unknown,
-    r.activity_id, r.waitlisted,
+    acts.eventName(i), acts.activityName(i), acts.eventType(i), acts.difficulty(i),
+    acts.named[i], acts.aggregate[i], acts.total[i], acts.registered[i], acts.unknown[i],
+    acts.activityId[i], acts.waitlisted[i],
   ];
 }
 
@@ -95,27 +128,25 @@ function ts(dateStr) {
 }
 
 // One scatter series for confirmed attendance (filled markers), one for registrations (hollow).
-// Per-point symbol and itemStyle carry the difficulty / event-type / record encoding.
-function dataSeries(rows) {
-  const attended = rows.filter((r) => r.total > 0).map((r) => {
-    const colour = EVENT_COLOURS[r.event_type] || FALLBACK_COLOUR;
-    return {
-      value: [ts(r.date), r.total],
-      symbol: echartsSymbol(DIFFICULTY_SYMBOLS[difficultyOf(r)] || 'circle'),
-      itemStyle: { color: colour, opacity: 0.85 },
-      cd: customdata(r), x: (r.date || '').slice(0, 10), tip: attendedTip(r),
-    };
-  });
-  // hollow = registered + waitlist: named on the sheet (turned up or not) plus the event's waitlist.
-  const registered = rows.filter((r) => r.named_registered + r.waitlisted > 0).map((r) => {
-    const colour = EVENT_COLOURS[r.event_type] || FALLBACK_COLOUR;
-    return {
-      value: [ts(r.date), r.named_registered + r.waitlisted],
-      symbol: echartsSymbol(DIFFICULTY_SYMBOLS[difficultyOf(r)] || 'circle'),
-      itemStyle: { color: 'transparent', borderColor: colour, borderWidth: 1.4, opacity: 0.8 },
-      cd: customdata(r), x: (r.date || '').slice(0, 10), tip: registeredTip(r),
-    };
-  });
+// Per-point symbol and itemStyle carry the difficulty / event-type / record encoding; ``i`` is the
+// activity's index into the decoded columns, from which the tooltip and detail panel are built.
+function dataSeries(acts) {
+  const attended = [];
+  const registered = []; // hollow = registered + waitlist: named on the sheet plus the event's waitlist
+  for (let i = 0; i < acts.n; i++) {
+    const colour = EVENT_COLOURS[acts.eventType(i)] || FALLBACK_COLOUR;
+    const symbol = echartsSymbol(DIFFICULTY_SYMBOLS[acts.difficulty(i)] || 'circle');
+    if (acts.total[i] > 0) {
+      attended.push({ value: [acts.ts[i], acts.total[i]], symbol, itemStyle: { color: colour, opacity: 0.85 }, i });
+    }
+    const signedUp = acts.registered[i] + acts.waitlisted[i];
+    if (signedUp > 0) {
+      registered.push({
+        value: [acts.ts[i], signedUp], symbol, i, hollow: true,
+        itemStyle: { color: 'transparent', borderColor: colour, borderWidth: 1.4, opacity: 0.8 },
+      });
+    }
+  }
 
   // registered listed first so the filled attendance marker draws on top when the two coincide.
   return [
@@ -146,11 +177,9 @@ function earlyMeanSeries(means) {
 }
 
 // Build the HTML colour/shape key beneath the chart (ECharts has no built-in encoding legend).
-function renderLegend(rows) {
-  const eventTypes = [...new Set(rows.map((r) => r.event_type))].filter((t) => EVENT_COLOURS[t]);
-  const difficulties = Object.keys(DIFFICULTY_SYMBOLS).filter((d) =>
-    rows.some((r) => difficultyOf(r) === d)
-  );
+function renderLegend(acts) {
+  const eventTypes = [...acts.eventTypes].filter((t) => EVENT_COLOURS[t]);
+  const difficulties = Object.keys(DIFFICULTY_SYMBOLS).filter((d) => acts.difficulties.has(d));
   const item = (swatch, label) => `<span class="legend-item">${swatch}${label}</span>`;
 
   const eventItems = eventTypes.map((t) =>
@@ -177,18 +206,26 @@ const ACTIVITY_CSV_COLUMNS = [
   'record_type', 'dancer_id', 'first_name', 'last_name', 'status', 'ticket_type', 'head_count',
 ];
 
-let selectedActivity = null; // the clicked point's data, kept so we can re-render on unlock
+// Names are decrypted this many records at a time, yielding to the page in between.
+const DECRYPT_BATCH = 50;
+// The most activities one export request may name (config.ATTENDANCE_RECORDS_EXPORT_MAX_ACTIVITIES).
+const EXPORT_MAX_ACTIVITIES = 200;
+
+let selectedActivity = null; // the clicked activity's details, kept so we can re-render on unlock
 
-// Called with a clicked point's data item ({ cd, x }); pins its breakdown beneath the chart.
-function showDetails(item) {
-  if (!item || !item.cd) return;
-  selectedActivity = { cd: item.cd, x: item.x };
+// Called with a clicked activity's index into the decoded columns; pins its breakdown beneath the chart.
+function showDetails(acts, i) {
+  const eventActivityIds = [];
+  for (let j = 0; j < acts.n; j++) {
+    if (acts.event[j] === acts.event[i]) eventActivityIds.push(acts.activityId[j]);
+  }
+  selectedActivity = { cd: customdata(acts, i), x: isoDate(acts, i), eventActivityIds };
   renderPointPanel();
 }
 
 function renderPointPanel() {
   if (!selectedActivity) return;
-  const { cd, x } = selectedActivity;
+  const { cd, x, eventActivityIds } = selectedActivity;
   const [eventName, activityName, eventType, difficulty, named, agg, total, registered, unknown, activityId, waitlisted] = cd;
   const summary = `
     <p><strong>${eventName}</strong> — ${activityName} (${eventType}, ${difficulty})<br>${x}</p>
@@ -201,10 +238,22 @@ function renderPointPanel() {
 
   const body = document.getElementById('point-details-body');
   if (AttendanceCrypto.isUnlocked()) {
-    body.innerHTML = summary + '<p><button type="button" id="activity-download-btn">Download full record (CSV)</button></p>';
+    const wholeEvent = eventActivityIds.length > 1 && eventActivityIds.length <= EXPORT_MAX_ACTIVITIES;
+    body.innerHTML = summary +
+      '<p><button type="button" id="activity-download-btn">Download full record (CSV)</button>' +
+      (wholeEvent ? ' <button type="button" id="event-download-btn">Download the whole event (CSV)</button>' : '') +
+      '</p>';
     document.getElementById('activity-download-btn').addEventListener('click', (ev) =>
-      downloadActivity(activityId, ev.currentTarget)
+      downloadRecords(`/attendance/activity/${activityId}/records.ndjson`,
+        `activity_${activityId}_attendance.csv`, ev.currentTarget)
     );
+    if (wholeEvent) {
+      const query = eventActivityIds.map((id) => `activity_id=${id}`).join('&');
+      document.getElementById('event-download-btn').addEventListener('click', (ev) =>
+        downloadRecords(`/attendance/activities/records.ndjson?${query}`,
+          `event_${eventName.replace(/[^\w-]+/g, '_')}_attendance.csv`, ev.currentTarget)
+      );
+    }
   } else {
     body.innerHTML =
       summary +
@@ -213,22 +262,60 @@ function renderPointPanel() {
   document.getElementById('point-details').hidden = false;
 }
 
-async function downloadActivity(activityId, btn) {
+// Feed each line of an NDJSON response to onLine (awaited) as it arrives, without waiting for the whole body.
+async function readNdjson(resp, onLine) {
+  const reader = resp.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    buffered += decoder.decode(value, { stream: !done });
+    const lines = buffered.split('\n');
+    buffered = lines.pop();
+    for (const line of lines) if (line) await onLine(JSON.parse(line));
+    if (done) break;
+  }
+  if (buffered) await onLine(JSON.parse(buffered));
+}
+
+// Download a records stream (one activity's, or a whole event's) as CSV. The server sends each
+// activity's context once and then slim records; names are decrypted a batch at a time as the rows
+// arrive, yielding between batches, so a big weekender never freezes the tab.
+async function downloadRecords(url, filename, btn) {
   btn.setAttribute('aria-busy', 'true');
   try {
-    const resp = await fetch(`/attendance/activity/${activityId}/records.json`, {
-      credentials: 'same-origin',
-      cache: 'no-store',
-    });
-    const payload = await resp.json();
-    if (!resp.ok) throw new Error(payload.error || 'Could not load the activity record.');
-    const rows = [];
-    for (const r of payload.rows) {
-      const name = await AttendanceCrypto.decryptName(r.enc_name);
-      const out = { ...r, first_name: (name && name.first_name) || '', last_name: (name && name.last_name) || '' };
-      rows.push(ACTIVITY_CSV_COLUMNS.map((c) => out[c]));
+    const resp = await fetch(url, { credentials: 'same-origin', cache: 'no-store' });
+    if (!resp.ok) {
+      const payload = await resp.json().catch(() => ({}));
+      throw new Error(payload.error || 'Could not load the activity record.');
     }
-    AttendanceCrypto.downloadCsv(`activity_${activityId}_attendance.csv`, ACTIVITY_CSV_COLUMNS, rows);
+    const rows = [];
+    let pending = [];
+    let context = null;
+    let complete = false;
+    const flush = async () => {
+      const names = await Promise.all(pending.map((r) => AttendanceCrypto.decryptName(r.enc_name)));
+      pending.forEach((r, k) => {
+        const name = names[k];
+        const out = { ...r, first_name: (name && name.first_name) || '', last_name: (name && name.last_name) || '' };
+        rows.push(ACTIVITY_CSV_COLUMNS.map((c) => out[c]));
+      });
+      pending = [];
+      await new Promise((resolve) => setTimeout(resolve)); // let the page repaint between batches
+    };
+    await readNdjson(resp, async (line) => {
+      if (line.activity) {
+        context = line.activity;
+      } else if (line.end) {
+        complete = true;
+      } else {
+        pending.push({ ...context, dancer_id: '', status: '', head_count: '', ...line });
+        if (pending.length >= DECRYPT_BATCH) await flush();
+      }
+    });
+    await flush();
+    if (!complete) throw new Error('the download was cut short, please try again.');
+    AttendanceCrypto.downloadCsv(filename, ACTIVITY_CSV_COLUMNS, rows);
   } catch (e) {
     alert('Download failed: ' + e.message);
   } finally {
@@ -251,8 +338,8 @@ async function render() {
     return;
   }
 
-  const rows = payload.activities || [];
-  if (rows.length === 0) {
+  const acts = decodeActivities(payload.activities);
+  if (acts.n === 0) {
     status.innerHTML = '<p class="error">The attendance database is empty.</p>';
     return;
   }
@@ -260,7 +347,10 @@ async function render() {
   const chart = echarts.init(document.getElementById('attendance-chart'));
   chart.setOption({
     grid: { left: 8, right: 12, top: 15, bottom: 40, containLabel: true },
-    tooltip: { trigger: 'item', confine: true, formatter: (p) => p.data.tip },
+    tooltip: {
+      trigger: 'item', confine: true,
+      formatter: (p) => p.data.tip || (p.data.hollow ? registeredTip : attendedTip)(acts, p.data.i),
+    },
     xAxis: {
       type: 'time', axisLabel: { color: AttendanceTheme.text },
       splitLine: { show: true, lineStyle: { color: AttendanceTheme.grid } },
@@ -273,11 +363,11 @@ async function render() {
     // Pinch / scroll to zoom and drag to pan the date axis; filterMode 'filter' drops out-of-view
     // points so the y-axis (scale: true) re-fits to the visible data. Double-click resets.
     dataZoom: [{ type: 'inside', xAxisIndex: 0, filterMode: 'filter' }],
-    series: [...dataSeries(rows), ...earlyMeanSeries(payload.early_term_means)],
+    series: [...dataSeries(acts), ...earlyMeanSeries(payload.early_term_means)],
   });
 
-  renderLegend(rows);
-  chart.on('click', (p) => showDetails(p.data));
+  renderLegend(acts);
+  chart.on('click', (p) => p.data && p.data.i !== undefined && showDetails(acts, p.data.i));
   chart.getZr().on('dblclick', () => chart.dispatchAction({ type: 'dataZoom', start: 0, end: 100 }));
   window.addEventListener('resize', () => chart.resize());
 
@@ -70,17 +70,149 @@ function showResult(message, isValid) {
   audioResponse.play().catch(() => {});
 }
 
+// Offline card bundle: every currently valid card, keyed by the SHA-256 of its QR code text, so scans
+// can be answered without waiting on Dancecloud. It's kept in localStorage (so a reload on flaky venue
+// Wi-Fi still has it) and refreshed with deltas from /membership-cards/scanner/bundle.json.
+const BUNDLE_STORAGE_KEY = "esds-card-bundle";
+const BUNDLE_REFRESH_MS = 5 * 60 * 1000;
+const PENDING_STORAGE_KEY = "esds-pending-card-checks";
+let bundle = loadStored(BUNDLE_STORAGE_KEY, null);
+
+function loadStored(key, fallback) {
+  try {
+    return JSON.parse(localStorage.getItem(key)) ?? fallback;
+  } catch (err) {
+    return fallback;
+  }
+}
+
+function store(key, value) {
+  try {
+    localStorage.setItem(key, JSON.stringify(value));
+  } catch (err) {
+    // storage full or disabled: the in-memory copy still works for this page load
+  }
+}
+
+async function refreshBundle() {
+  try {
+    const since = bundle ? `?since=${encodeURIComponent(bundle.version)}` : "";
+    const res = await fetch(`/membership-cards/scanner/bundle.json${since}`);
+    if (!res.ok) return;
+    const update = await res.json();
+    if (update.full || !bundle) {
+      bundle = { version: update.version, cards: update.cards };
+    } else {
+      Object.assign(bundle.cards, update.upserts);
+      update.removals.forEach(key => delete bundle.cards[key]);
+      bundle.version = update.version;
+    }
+    store(BUNDLE_STORAGE_KEY, bundle);
+  } catch (err) {
+    // offline: keep using the bundle we have
+  }
+}
+
+async function cardKey(data) {
+  const digest = await crypto.subtle.digest("SHA-256", new TextEncoder().encode(data));
+  return Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, "0")).join("");
+}
+
+// What the bundle says about a card today: "valid", "expired", "unknown" (not in the bundle), or null
+// if there's no bundle to ask.
+async function checkLocally(data) {
+  if (!bundle || !window.crypto?.subtle) return null;
+  const entry = bundle.cards[await cardKey(data)];
+  if (!entry) return "unknown";
+  const today = new Date().toLocaleDateString("en-CA", { timeZone: "Europe/London" }); // YYYY-MM-DD
+  return entry[0] >= today ? "valid" : "expired";
+}
+
+// Thrown when Dancecloud couldn't be reached at all, as opposed to a check that came back unusable.
+class OfflineError extends Error {}
+
+async function checkWithDancecloud(data) {
+  let res, text;
+  try {
+    res = await fetch(`/proxy-card-check?url=${encodeURIComponent(data)}`);
+    text = await res.text();
+  } catch (err) {
+    throw new OfflineError(err.message);
+  }
+  if (!res.ok) throw new Error(`card check returned ${res.status}`);
+  // Dancecloud serves the check page as an Inertia.js SPA: the card status is
+  // embedded as JSON in the data-page attribute of #app, not as visible prose.
+  const doc = new DOMParser().parseFromString(text, "text/html");
+  const app = doc.getElementById("app");
+  if (!app) throw new Error("card check page has no #app element");
+  const page = JSON.parse(app.dataset.page);
+  return page.props.check.status === "valid";
+}
+
+// Scans answered from the bundle still go to Dancecloud, so they appear in the check logs; they are
+// queued (and survive a reload) until that succeeds. A check that comes back unusable rather than
+// offline is retried on the next few flushes and then dropped, so it can't hold up the rest.
+const MAX_SYNC_FAILURES = 3;
+let pending = loadStored(PENDING_STORAGE_KEY, []).map(
+  entry => (typeof entry === "string" ? { data: entry, failures: 0 } : entry)
+);
+let flushing = false;
+
+async function flushPendingChecks() {
+  if (flushing) return;
+  flushing = true;
+  const retry = [];
+  try {
+    while (pending.length) {
+      const entry = pending[0];
+      try {
+        await checkWithDancecloud(entry.data);
+      } catch (err) {
+        if (err instanceof OfflineError) break; // still offline; try again later
+        entry.failures += 1;
+        if (entry.failures < MAX_SYNC_FAILURES) retry.push(entry);
+      }
+      pending.shift();
+      store(PENDING_STORAGE_KEY, pending.concat(retry));
+    }
+  } finally {
+    pending.push(...retry);
+    store(PENDING_STORAGE_KEY, pending);
+    flushing = false;
+  }
+}
+
+function syncCheck(data) {
+  pending.push({ data, failures: 0 });
+  store(PENDING_STORAGE_KEY, pending);
+  flushPendingChecks();
+}
+
 async function validateCard(data) {
+  const local = await checkLocally(data).catch(() => null);
+  if (local === "valid") {
+    showResult("✅ CARD VALID", true);
+    syncCheck(data);
+    return;
+  }
+  // Not valid in the bundle (or no bundle): it may have been issued or renewed since the last sync, so
+  // ask Dancecloud, falling back to the bundle's answer if we can't reach it.
   try {
-    const res = await fetch(`/proxy-card-check?url=${encodeURIComponent(data)}`);
-    const text = await res.text();
-    // Dancecloud serves the check page as an Inertia.js SPA: the card status is
-    // embedded as JSON in the data-page attribute of #app, not as visible prose.
-    const doc = new DOMParser().parseFromString(text, "text/html");
-    const page = JSON.parse(doc.getElementById("app").dataset.page);
-    const valid = page.props.check.status === "valid";
+    const valid = await checkWithDancecloud(data);
     showResult(valid ? "✅ CARD VALID" : "❌ CARD INVALID", valid);
   } catch (err) {
-    showResult("❌ FAILED TO VALIDATE", false);
+    if (local === "expired") {
+      showResult("❌ CARD INVALID", false);
+      syncCheck(data);
+    } else if (local === "unknown") {
+      // Every valid card is in the bundle; one it doesn't hold may not be a card at all, so don't queue it.
+      showResult("❌ CARD INVALID", false);
+    } else {
+      showResult("❌ FAILED TO VALIDATE", false);
+    }
   }
 }
+
+refreshBundle().then(flushPendingChecks);
+setInterval(() => refreshBundle().then(flushPendingChecks), BUNDLE_REFRESH_MS);
+window.addEventListener("online", flushPendingChecks);
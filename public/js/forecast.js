@@ -99,6 +99,7 @@
     ]},
     { title: 'Analysis', controls: [
       { k: 'confidence', label: 'Confidence level (%)', type: 'percent', min: 50, max: 99, help: 'Width of the ranges shown. 95% means the true figure lands in the range about 95 times in 100 if our assumptions hold.' },
+      { k: 'monte_carlo', label: 'Sample the ranges (Monte Carlo)', type: 'toggle', help: 'Work the ranges out from thousands of sampled years instead of the quick approximation. Slower, but it follows the floors and caps in the budget (no fewer than zero sign-ups, the class-size cap) and shows the spread of the year result as a histogram.' },
     ]},
   ];
 
@@ -217,6 +218,12 @@
     el.value = v;
   }
 
+  // The Monte Carlo toggle picks the server's engine rather than setting a forecast parameter.
+  function requestBody(params, extra) {
+    const { monte_carlo: mc, ...rest } = params;
+    return JSON.stringify({ params: rest, confidence: rest.confidence, engine: mc ? 'monte_carlo' : 'unscented', ...extra });
+  }
+
   // Read every control, clamping to bounds. Returns { params, ok }: ok is false if a required box is
   // empty or non-numeric (we then skip the request rather than send rubbish).
   function collectParams() {
@@ -248,6 +255,7 @@
   const THROTTLE_MS = 3000, SETTLE_MS = 800;
 
   function scheduleUpdate() {
+    shownScenario = null;  // the controls no longer match the forecast on screen
     showSpinner('waiting to update…');
     if (timer) clearTimeout(timer);
     const wait = Math.max(SETTLE_MS, THROTTLE_MS - (Date.now() - lastFire));
@@ -265,7 +273,7 @@
       const resp = await fetch('/forecast/predict.json', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ params: collected.params, confidence: collected.params.confidence }),
+        body: requestBody(collected.params),
       });
       if (resp.status === 401) { setStatus('Your session has expired: please reload the page to sign in again.', true); return; }
       if (!resp.ok) { setStatus('Could not update the forecast (the server is unavailable).', true); return; }
@@ -303,7 +311,11 @@
     return charts[id];
   }
 
+  // Token of the forecast on screen: the download exports that result rather than recomputing it.
+  let shownScenario = null;
+
   function render(r) {
+    shownScenario = r.scenario || null;
     renderHeadline(r);
     renderBudget(r);
     renderBalance(r);
@@ -314,6 +326,7 @@
     renderSplit(r);
     renderSurvival(r);
     renderVariance(r);
+    renderHistogram(r);
     document.getElementById('loyalty-every-label').textContent = ordinal(r.detail.loyalty_every);
   }
 
@@ -607,18 +620,42 @@
   }
 
   function renderVariance(r) {
-    const c = r.contributors.slice().reverse();
-    const ch = chart('variance-chart');
+    renderShares('variance-chart', r.contributors);
+    renderShares('variance-line-chart', r.contributors_by_line);
+  }
+
+  function renderShares(id, rows) {
+    const c = rows.slice().reverse();
+    const ch = chart(id);
     ch.setOption({
       grid: { left: 210, right: 40, top: 20, bottom: 36 },
       tooltip: { trigger: 'axis', valueFormatter: v => v + '%' },
       xAxis: { type: 'value', name: '% of the spread', axisLabel: { formatter: '{value}%' } },
       yAxis: { type: 'category', data: c.map(x => x.name), axisLabel: { interval: 0, width: 195, overflow: 'break' } },
-      series: [{ type: 'bar', data: c.map(x => x.pct), itemStyle: { color: '#1f77b4' },
+      series: [{ type: 'bar', data: c.map(x => ({ value: x.pct, itemStyle: { color: x.pct < 0 ? '#2ca02c' : '#1f77b4' } })),
         label: { show: true, position: 'right', formatter: '{c}%' } }],
     }, true);
   }
 
+  function renderHistogram(r) {
+    const wrap = document.getElementById('net-histogram');
+    wrap.hidden = !r.histogram;
+    if (!r.histogram) return;
+    const h = r.histogram;
+    const mids = h.counts.map((_, i) => (h.edges[i] + h.edges[i + 1]) / 2);
+    const total = h.counts.reduce((a, b) => a + b, 0);
+    const ch = chart('net-histogram-chart');
+    ch.resize();  // it may have been drawn while hidden
+    ch.setOption({
+      grid: { left: 48, right: 20, top: 20, bottom: 36 },
+      tooltip: { trigger: 'axis', formatter: ps => `around ${signedMoney(mids[ps[0].dataIndex])}: ${(100 * ps[0].value / total).toFixed(1)}% of years` },
+      xAxis: { type: 'category', data: mids.map(signedMoney), name: 'year result' },
+      yAxis: { type: 'value', axisLabel: { show: false } },
+      series: [{ type: 'bar', data: h.counts, barCategoryGap: '5%',
+        itemStyle: { color: p => mids[p.dataIndex] >= 0 ? '#2ca02c' : '#d62728' } }],
+    }, true);
+  }
+
   // ---- reset & download ----
   function setControlToDefault(c) {
     const el = document.getElementById('ctl-' + c.k);
@@ -650,7 +687,7 @@
       const resp = await fetch('/forecast/download.xlsx', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ params: collected.params, confidence: collected.params.confidence }),
+        body: requestBody(collected.params, { scenario: shownScenario }),
       });
       if (!resp.ok) { setStatus('Could not generate the download.', true); return; }
       const blob = await resp.blob();
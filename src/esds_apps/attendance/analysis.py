@@ -10,21 +10,27 @@ is the production port of three of them:
   later, plus the teaching team that ran each joining term.
 
 The term-bucketing and team derivation are lifted near-verbatim from the notebook (see
-``_term_calendar``) deliberately: terms are not a stored column, the logic is intricate, and
+``terms.TermCalendar``) deliberately: terms are not a stored column, the logic is intricate, and
 keeping one implementation means the web charts can't silently drift from the validated
-notebook ones. Everything here is read-only — only SELECTs run — so it never disturbs the
+notebook ones. The calendar is derived once per version of the database and shared by every
+dataset here (``terms.term_calendar``), as are the named attendance records the per-dancer charts
+filter (``facts.fact_frame``). Everything here is read-only — only SELECTs run — so it never disturbs the
 database the notebook rebuilds.
 """
 
 import calendar
 import datetime
 import sqlite3
+from dataclasses import dataclass
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
 from esds_apps import config
+from esds_apps.attendance.attendance_db import DbVersionMemo, read_connection
+from esds_apps.attendance.facts import fact_frame
+from esds_apps.attendance.terms import TermCalendar, acad_year_label, stored_terms_current, term_calendar
 
 # Pre-database term means (from the old ESDS analysis summaries and the 2023 AGM report), kept as a
 # committed CSV because they don't fit the per-dancer schema. They feed the pre-2023 context on the
@@ -50,30 +56,16 @@ _MONTH = {
     'dec': 12,
 }
 
-# A substantial Level 1 block (>= this many weekly lessons) anchors a term; shorter L1
-# appearances (one-offs, Stockbridge) never define one.
-_MIN_L1_LESSONS_FOR_TERM = 4
-# Two L1 block starts within this many days are the same term (a twice-weekly strand or a
-# paired social mustn't split a term).
-_TERM_MERGE_DAYS = 21
 # Charts that lean on confirmed turnout start here: 2021/22 and 2022/23 logged mostly
 # enrolment, so including them would read misleadingly (see the notebook's per-chart notes).
 _FIRST_TURNOUT_ACAD_YEAR = 2023
 # The paired post-class socials only begin in autumn 2024; earlier social points are artefacts.
 _FIRST_PAIRED_SOCIAL_ACAD_YEAR = 2024
-# Academic years run September -> August, so a date in this month or later belongs to the year
-# that's just starting (Sept 2024 -> the 2024/25 year; Jan 2025 -> still 2024/25).
-_ACADEMIC_YEAR_START_MONTH = 8
 # The community chart looks at 2026 only: that is when we began recording Level 2 attendees by
 # name (January 2026), so earlier years carry no improvers' names and would undercount the core.
 _FIRST_L2_NAMES_DATE = '2026-01-01'
 
 
-def _acad_year_label(acad_year: int) -> str:
-    """'2023' -> '23/24'."""
-    return f'{str(acad_year)[2:]}/{str(acad_year + 1)[2:]}'
-
-
 def _early_stats() -> pd.DataFrame:
     """The committed pre-database term means (mean_attendance per acad_year/term_num, by level)."""
     return pd.read_csv(_EARLY_STATS_PATH)
@@ -109,17 +101,15 @@ def early_term_means() -> list[dict]:
     if ref.empty or not Path(config.ATTENDANCE_DB_PATH).exists():
         return []
 
-    conn = sqlite3.connect(config.ATTENDANCE_DB_PATH)
-    try:
-        terms, assign = _term_calendar(conn)
-        acts = pd.read_sql_query(
-            "SELECT date, difficulty, total FROM activity_attendance WHERE difficulty IN ('Level 1', 'Level 2')",
-            conn,
-            parse_dates=['date'],
-        )
-    finally:
-        conn.close()
+    conn = read_connection(config.ATTENDANCE_DB_PATH)
+    calendar = term_calendar(conn)
+    acts = pd.read_sql_query(
+        "SELECT date, difficulty, total FROM activity_attendance WHERE difficulty IN ('Level 1', 'Level 2')",
+        conn,
+        parse_dates=['date'],
+    )
 
+    terms, assign = calendar.terms, calendar.assign
     term_start = dict(zip(terms['term_idx'], terms['term_start']))
     # Class nights of each teaching term = its Level 1 lesson dates.
     l1 = acts.loc[acts['difficulty'] == 'Level 1', ['date']].copy()
@@ -147,80 +137,32 @@ def early_term_means() -> list[dict]:
     return means
 
 
-def _term_calendar(conn: sqlite3.Connection):
-    """Derive the teaching-term calendar and an ``assign`` function, as the notebook does.
+def _term_rows(conn: sqlite3.Connection, calendar: TermCalendar, columns: str, where: str) -> pd.DataFrame:
+    """``columns`` of the ``activity_attendance`` rows matching ``where``, with each one's ``term_idx``.
 
-    Returns ``(terms, assign)`` where ``terms`` is a DataFrame indexed implicitly by row order
-    (one row per term, with ``term_idx``, ``acad_year``, ``term_num``, ``label`` and the
-    teaching-team columns) and ``assign`` maps datetime-like values to their ``term_idx``.
+    Rows before the first term are left out. Joins on the stored ``activity_term`` table when it is
+    current (``terms.stored_terms_current``), and otherwise buckets each activity's date through
+    ``calendar``, so a database written since its terms were last stored still reads right.
     """
-    l1 = pd.read_sql_query(
-        'SELECT MIN(a.date) AS start, GROUP_CONCAT(DISTINCT et.dancer_id) AS teachers '
-        'FROM event e JOIN activity a USING(event_id) '
-        'LEFT JOIN event_teacher et ON et.event_id = e.event_id '
-        "WHERE e.event_type = 'course' AND a.difficulty = 'Level 1' "
-        'GROUP BY e.event_id HAVING COUNT(a.activity_id) >= ? ORDER BY start',
-        conn,
-        params=(_MIN_L1_LESSONS_FOR_TERM,),
-        parse_dates=['start'],
-    )
-
-    anchors: list[pd.Timestamp] = []
-    for d in sorted(l1['start']):
-        if not anchors or (d - anchors[-1]).days > _TERM_MERGE_DAYS:
-            anchors.append(d)
-
-    terms = pd.DataFrame({'term_idx': range(len(anchors)), 'term_start': pd.to_datetime(anchors)})
-    terms['acad_year'] = terms['term_start'].apply(
-        lambda d: d.year if d.month >= _ACADEMIC_YEAR_START_MONTH else d.year - 1
-    )
-    terms['term_num'] = terms.groupby('acad_year').cumcount() + 1
-    terms['label'] = terms.apply(lambda r: f'{_acad_year_label(r.acad_year)} T{r.term_num}', axis=1)
-
-    term_starts = terms['term_start'].to_numpy()
-
-    def assign(dates):
-        """Map datetime-like values to their term_idx via the calendar (NaN before the first term)."""
-        d = pd.to_datetime(dates)
-        if not isinstance(d, pd.Series):
-            d = pd.Series(d)
-        idx = np.searchsorted(term_starts, d.to_numpy(), side='right') - 1
-        return pd.Series(idx, index=d.index).where(idx >= 0).astype('Int64')
-
-    # Teaching team per term: the union of Level 1 teachers on the courses that fall in it.
-    l1['term_idx'] = assign(l1['start'])
-    team = (
-        l1.dropna(subset=['teachers'])
-        .groupby('term_idx')['teachers']
-        .apply(lambda s: frozenset(t for v in s for t in v.split(',')))
-    )
-    terms['teacher_set'] = terms['term_idx'].map(team).apply(lambda s: s if isinstance(s, frozenset) else frozenset())
-
-    order: list[frozenset] = []
-    for s in terms['teacher_set']:
-        if s and s not in order:
-            order.append(s)
-    team_id = {s: i for i, s in enumerate(order)}  # stable int id by first appearance
-    terms['teacher_id'] = terms['teacher_set'].apply(lambda s: team_id.get(s, -1))
-    terms['teacher_label'] = terms['teacher_set'].apply(
-        lambda s: '+'.join(sorted(d.replace('DNC-', '') for d in s)) if s else 'unknown'
-    )
-    return terms, assign
+    if stored_terms_current(conn, calendar):
+        return pd.read_sql_query(
+            f'SELECT {columns}, t.term_idx FROM activity_attendance JOIN activity_term t USING(activity_id) '
+            f'WHERE {where}',
+            conn,
+        )
+    rows = pd.read_sql_query(f'SELECT {columns}, date FROM activity_attendance WHERE {where}', conn)
+    rows['term_idx'] = calendar.assign(rows.pop('date'))
+    return rows.dropna(subset=['term_idx']).astype({'term_idx': int})
 
 
-def _beginner_intake(conn: sqlite3.Connection, terms: pd.DataFrame, assign) -> list[dict]:
+def _beginner_intake(conn: sqlite3.Connection, calendar: TermCalendar) -> list[dict]:
     """Plot 2: mean Level 1 attendance and registrations (+ waitlist) per term, by academic year."""
-    l1 = pd.read_sql_query(
-        "SELECT event_id, date, total, named_registered FROM activity_attendance WHERE difficulty = 'Level 1'",
-        conn,
-        parse_dates=['date'],
-    )
+    l1 = _term_rows(conn, calendar, 'event_id, total, named_registered', "difficulty = 'Level 1'")
     wl = pd.read_sql_query('SELECT event_id, COUNT(*) AS waitlisted FROM waitlist GROUP BY event_id', conn)
-    l1['term_idx'] = assign(l1['date'])
     per_term = l1.groupby('term_idx')[['total', 'named_registered']].mean()
-    ev_term = l1.groupby('event_id')['term_idx'].first()
+    ev_term = l1.groupby('event_id')['term_idx'].min()  # the term of each event's first activity
     wl_term = wl.join(ev_term, on='event_id').groupby('term_idx')['waitlisted'].sum()
-    m = terms.set_index('term_idx').join(per_term).dropna(subset=['total'])
+    m = calendar.terms.set_index('term_idx').join(per_term).dropna(subset=['total'])
     m = m.join(wl_term)
     m['waitlisted'] = m['waitlisted'].fillna(0)
     m['registered'] = m['named_registered'] + m['waitlisted']
@@ -232,7 +174,7 @@ def _beginner_intake(conn: sqlite3.Connection, terms: pd.DataFrame, assign) -> l
         out.append(
             {
                 'acad_year': int(ay),
-                'label': _acad_year_label(int(ay)),
+                'label': acad_year_label(int(ay)),
                 'points': [
                     {'term_num': int(tn), 'attended': float(a), 'registered': float(r)}
                     for tn, a, r in zip(g['term_num'], g['total'], g['registered'])
@@ -249,7 +191,7 @@ def _beginner_intake(conn: sqlite3.Connection, terms: pd.DataFrame, assign) -> l
         out.append(
             {
                 'acad_year': int(ay),
-                'label': _acad_year_label(int(ay)),
+                'label': acad_year_label(int(ay)),
                 'points': [
                     {'term_num': int(tn), 'attended': float(a), 'registered': None}
                     for tn, a in zip(g['term_num'], g['mean_attendance'])
@@ -260,22 +202,14 @@ def _beginner_intake(conn: sqlite3.Connection, terms: pd.DataFrame, assign) -> l
     return out
 
 
-def _level2_and_socials(conn: sqlite3.Connection, terms: pd.DataFrame, assign) -> list[dict]:
+def _level2_and_socials(conn: sqlite3.Connection, calendar: TermCalendar) -> list[dict]:
     """Plot 3: mean Level 2 attendance per term with the paired social-only turnout, by year."""
-    l2 = pd.read_sql_query(
-        "SELECT date, total FROM activity_attendance WHERE difficulty = 'Level 2'", conn, parse_dates=['date']
-    )
-    soc = pd.read_sql_query(
-        "SELECT date, total FROM activity_attendance WHERE activity_type = 'social' AND event_type = 'course'",
-        conn,
-        parse_dates=['date'],
-    )
+    l2 = _term_rows(conn, calendar, 'total', "difficulty = 'Level 2'")
+    soc = _term_rows(conn, calendar, 'total', "activity_type = 'social' AND event_type = 'course'")
 
     def per_term_mean(df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        df['term_idx'] = assign(df['date'])
         m = (
-            terms.set_index('term_idx')
+            calendar.terms.set_index('term_idx')
             .join(df.groupby('term_idx')['total'].mean().rename('mean'))
             .dropna(subset=['mean'])
         )
@@ -292,7 +226,7 @@ def _level2_and_socials(conn: sqlite3.Connection, terms: pd.DataFrame, assign) -
         out.append(
             {
                 'acad_year': int(ay),
-                'label': _acad_year_label(int(ay)),
+                'label': acad_year_label(int(ay)),
                 'class_points': [{'term_num': int(t), 'value': float(v)} for t, v in zip(g['term_num'], g['mean'])],
                 'social_points': [{'term_num': int(t), 'value': float(v)} for t, v in zip(gs['term_num'], gs['mean'])],
             }
@@ -306,7 +240,7 @@ def _level2_and_socials(conn: sqlite3.Connection, terms: pd.DataFrame, assign) -
         out.append(
             {
                 'acad_year': int(ay),
-                'label': _acad_year_label(int(ay)),
+                'label': acad_year_label(int(ay)),
                 'class_points': [
                     {'term_num': int(t), 'value': float(v)} for t, v in zip(g['term_num'], g['mean_attendance'])
                 ],
@@ -317,34 +251,36 @@ def _level2_and_socials(conn: sqlite3.Connection, terms: pd.DataFrame, assign) -
     return out
 
 
-def _cohort_retention(conn: sqlite3.Connection, terms: pd.DataFrame, assign) -> dict:
+def _retention_counts(dancer_ids: pd.Series, term_idx: pd.Series, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Plot 5's tallies from one (dancer, term) row per presence, repeats allowed.
+
+    Returns ``counts`` (n x n; rows = cohort term, cols = terms since joining: how many of the cohort
+    were present that many terms on) and ``totals`` (the size of each cohort). A dancer's cohort is
+    the first term they were present in.
+    """
+    dancer = pd.factorize(dancer_ids)[0].astype(np.int64)
+    # One code per distinct (dancer, term), sorted by dancer and then term.
+    pairs = np.unique(dancer * n + term_idx.to_numpy(dtype=np.int64))
+    dancer, term = np.divmod(pairs, n)
+    first = np.ones(len(pairs), dtype=bool)
+    first[1:] = dancer[1:] != dancer[:-1]
+    joined = term[first][np.cumsum(first) - 1]  # each row's dancer's cohort term
+    counts = np.bincount(joined * n + (term - joined), minlength=n * n).reshape(n, n).astype(float)
+    totals = np.bincount(term[first], minlength=n).astype(float)
+    return counts, totals
+
+
+def _cohort_retention(conn: sqlite3.Connection, calendar: TermCalendar, facts: pd.DataFrame) -> dict:
     """Plot 5: % of each joining cohort still present a given number of terms later, plus teams.
 
     Presence (status 'attended' OR 'unknown') rather than confirmed attendance, because turnout
     was only consistently recorded from ~2024 and an attended-only rule would make every
     pre-2024 cohort look like it churned instantly.
     """
-    pres = pd.read_sql_query(
-        'SELECT at.dancer_id, a.date FROM attendance at JOIN activity a USING(activity_id) '
-        "WHERE at.status IN ('attended', 'unknown')",
-        conn,
-        parse_dates=['date'],
-    )
-    pres['term_idx'] = assign(pres['date'])
-    pres = pres.dropna(subset=['term_idx'])
-    pres['term_idx'] = pres['term_idx'].astype(int)
-
-    terms_active = pres.groupby('dancer_id')['term_idx'].apply(set)
-    cohort = pres.groupby('dancer_id')['term_idx'].min()
-
+    terms = calendar.terms
+    pres = facts[facts['status'].isin(['attended', 'unknown']) & (facts['term_idx'] >= 0)]
     n = len(terms)
-    counts = np.zeros((n, n))  # rows = cohort term, cols = terms since joining
-    totals = np.zeros(n)
-    for dancer_id, joined in cohort.items():
-        totals[joined] += 1
-        for t in terms_active[dancer_id]:
-            if t >= joined:
-                counts[joined, t - joined] += 1
+    counts, totals = _retention_counts(pres['dancer_id'], pres['term_idx'], n)
     with np.errstate(invalid='ignore'):
         pct = np.where(totals[:, None] > 0, counts / totals[:, None] * 100, np.nan)
 
@@ -377,23 +313,17 @@ def _cohort_retention(conn: sqlite3.Connection, terms: pd.DataFrame, assign) ->
     return {'terms': term_meta, 'matrix': matrix, 'teams': teams, 'teacher_enc': teacher_enc}
 
 
-def _community_frame(conn: sqlite3.Connection) -> pd.DataFrame:
+def _community_frame(facts: pd.DataFrame) -> pd.DataFrame:
     """Named confirmed attendances since the Level 2 names began, one row per (dancer, date).
 
     Flagged with ``is_30th`` so the 30th anniversary weekender can be filtered out. Shared by the
     chart dataset and the CSV download so the two can't disagree about who is counted.
     """
-    return pd.read_sql_query(
-        "SELECT DISTINCT at.dancer_id, a.date, (e.name LIKE '%30 Years%') AS is_30th "
-        'FROM attendance at JOIN activity a USING(activity_id) JOIN event e USING(event_id) '
-        "WHERE at.status = 'attended' AND a.date >= ?",
-        conn,
-        params=(_FIRST_L2_NAMES_DATE,),
-        parse_dates=['date'],
-    )
+    named = facts[(facts['status'] == 'attended') & (facts['date'] >= pd.Timestamp(_FIRST_L2_NAMES_DATE))]
+    return named[['dancer_id', 'date', 'is_30th']].drop_duplicates()
 
 
-def _community_2026(conn: sqlite3.Connection) -> dict:
+def _community_2026(facts: pd.DataFrame) -> dict:
     """Plot 7: the 2026 survival curve — dancers attending at least each share of the calendar.
 
     For each series (with and without the 30th anniversary) one point per distinct attendance
@@ -401,11 +331,11 @@ def _community_2026(conn: sqlite3.Connection) -> dict:
     2026 calendar. The denominator is the full calendar for both series so the two are directly
     comparable. ``min_dates`` is carried so a click can fetch exactly that point's dancers.
     """
-    raw = _community_frame(conn)
+    raw = _community_frame(facts)
     total_dates = int(raw['date'].nunique())
 
     def series(df: pd.DataFrame) -> list[dict]:
-        per_dancer = df.groupby('dancer_id')['date'].nunique()
+        per_dancer = df.groupby('dancer_id', observed=True)['date'].nunique()
         if per_dancer.empty or total_dates == 0:
             return []
         return [
@@ -420,29 +350,20 @@ def _community_2026(conn: sqlite3.Connection) -> dict:
     return {
         'total_dates': total_dates,
         'incl_30th': series(raw),
-        'excl_30th': series(raw[raw['is_30th'] == 0]),
+        'excl_30th': series(raw[~raw['is_30th']]),
     }
 
 
-def _termly_activity_counts(conn: sqlite3.Connection, assign) -> pd.DataFrame:
+def _termly_activity_counts(facts: pd.DataFrame) -> pd.DataFrame:
     """Distinct activities each dancer attended in each term, with and without the 30th weekender."""
-    att = pd.read_sql_query(
-        "SELECT at.dancer_id, a.date, a.activity_id, (e.name LIKE '%30 Years%') AS is_30th "
-        'FROM attendance at JOIN activity a USING(activity_id) JOIN event e USING(event_id) '
-        "WHERE at.status = 'attended'",
-        conn,
-        parse_dates=['date'],
-    )
-    att['term_idx'] = assign(att['date'])
-    att = att.dropna(subset=['term_idx'])
-    att['term_idx'] = att['term_idx'].astype(int)
-
-    n_incl = att.groupby(['term_idx', 'dancer_id'])['activity_id'].nunique().rename('n_incl')
-    n_excl = att[att['is_30th'] == 0].groupby(['term_idx', 'dancer_id'])['activity_id'].nunique().rename('n_excl')
+    att = facts[(facts['status'] == 'attended') & (facts['term_idx'] >= 0)]
+    by = ['term_idx', 'dancer_id']
+    n_incl = att.groupby(by, observed=True)['activity_id'].nunique().rename('n_incl')
+    n_excl = att[~att['is_30th']].groupby(by, observed=True)['activity_id'].nunique().rename('n_excl')
     return pd.concat([n_incl, n_excl], axis=1).fillna(0).astype(int)
 
 
-def _termly_active_community(conn: sqlite3.Connection, terms: pd.DataFrame, assign) -> list[dict]:
+def _termly_active_community(calendar: TermCalendar, facts: pd.DataFrame) -> list[dict]:
     """Plot 8: distinct active dancers per term since 2026, across all event types, incl/excl the 30th.
 
     For every term whose start falls on or after the Level 2 names began (January 2026), two
@@ -450,13 +371,13 @@ def _termly_active_community(conn: sqlite3.Connection, terms: pd.DataFrame, assi
     those with at least two ("regulars"). Each carries ``term_start`` so a click can fetch exactly
     that point's dancers.
     """
-    counts = _termly_activity_counts(conn, assign)
+    counts = _termly_activity_counts(facts)
 
     def dancers_per_term(col: str, threshold: int) -> pd.Series:
         hit = counts[counts[col] >= threshold]
         return hit.reset_index().groupby('term_idx')['dancer_id'].nunique()
 
-    m = terms.set_index('term_idx')
+    m = calendar.terms.set_index('term_idx')
     for name, col, threshold in (
         ('active_incl', 'n_incl', 1),
         ('active_excl', 'n_excl', 1),
@@ -479,6 +400,75 @@ def _termly_active_community(conn: sqlite3.Connection, terms: pd.DataFrame, assi
     ]
 
 
+@dataclass(frozen=True)
+class _AtLeast:
+    """Dancers ranked by a per-dancer count, so "everyone with at least k" is a binary search and a slice."""
+
+    counts: np.ndarray  # ascending
+    order: np.ndarray  # the position in ``ids`` of the dancer with each of ``counts``
+    ids: np.ndarray  # the dancer_ids, sorted
+
+    @classmethod
+    def of(cls, per_dancer: pd.Series) -> '_AtLeast':
+        ids = np.asarray(per_dancer.index, dtype=object)
+        by_id = np.argsort(ids)
+        counts = per_dancer.to_numpy()[by_id]
+        order = np.argsort(counts, kind='stable')
+        return cls(counts[order], order, ids[by_id])
+
+    def dancers(self, k: int) -> list[str]:
+        """The dancer_ids with a count of at least ``k``, sorted."""
+        start = np.searchsorted(self.counts, k, side='left')
+        return self.ids[np.sort(self.order[start:])].tolist()
+
+
+@dataclass(frozen=True)
+class _ClickThrough:
+    """Everything the community click-throughs answer from, derived once per version of the database."""
+
+    community: dict[str, _AtLeast]  # scope -> unique 2026 dates per dancer
+    termly: dict[tuple[int, str], _AtLeast]  # (term_idx, scope) -> activities per dancer in that term
+    term_by_start: dict[pd.Timestamp, int]
+    enc_names: dict[str, str | None]
+
+    @classmethod
+    def derive(cls, conn: sqlite3.Connection) -> '_ClickThrough':
+        facts = fact_frame(conn)
+        raw = _community_frame(facts)
+        community = {
+            scope: _AtLeast.of(df.groupby('dancer_id', observed=True)['date'].nunique())
+            for scope, df in (('incl', raw), ('excl', raw[~raw['is_30th']]))
+        }
+        termly = {}
+        for term_idx, counts in _termly_activity_counts(facts).groupby(level='term_idx'):
+            counts = counts.droplevel('term_idx')
+            termly[int(term_idx), 'incl'] = _AtLeast.of(counts['n_incl'])
+            termly[int(term_idx), 'excl'] = _AtLeast.of(counts['n_excl'])
+        terms = term_calendar(conn).terms
+        term_by_start = dict(zip(terms['term_start'], terms['term_idx'].astype(int)))
+        enc_names = dict(conn.execute('SELECT dancer_id, enc_name FROM dancer').fetchall())
+        return cls(community, termly, term_by_start, enc_names)
+
+    def rows(self, ids: list[str]) -> list[dict]:
+        return [{'dancer_id': i, 'enc_name': self.enc_names.get(i)} for i in ids]
+
+
+_CLICK_THROUGH: DbVersionMemo[_ClickThrough] = DbVersionMemo()
+
+
+def _click_through() -> _ClickThrough:
+    """The click-through index of the deployed database, rebuilt only when the file changes.
+
+    A hit only stats the file, so once the index is built a click never opens the database.
+    Raises FileNotFoundError if the database is absent.
+    """
+    if not Path(config.ATTENDANCE_DB_PATH).exists():
+        raise FileNotFoundError(config.ATTENDANCE_DB_PATH)
+    return _CLICK_THROUGH.get(
+        config.ATTENDANCE_DB_PATH, lambda: _ClickThrough.derive(read_connection(config.ATTENDANCE_DB_PATH))
+    )
+
+
 def community_2026_dancer_rows(scope: str, min_dates: int) -> list[dict]:
     """(dancer_id, enc_name) for dancers who attended at least ``min_dates`` unique dates in 2026.
 
@@ -487,19 +477,8 @@ def community_2026_dancer_rows(scope: str, min_dates: int) -> list[dict]:
     decrypts it so the server never emits plaintext. Backs the click-to-download on the community
     chart. Raises FileNotFoundError if the database is absent.
     """
-    if not Path(config.ATTENDANCE_DB_PATH).exists():
-        raise FileNotFoundError(config.ATTENDANCE_DB_PATH)
-    conn = sqlite3.connect(config.ATTENDANCE_DB_PATH)
-    try:
-        raw = _community_frame(conn)
-        if scope == 'excl':
-            raw = raw[raw['is_30th'] == 0]
-        per_dancer = raw.groupby('dancer_id')['date'].nunique()
-        ids = sorted(per_dancer[per_dancer >= min_dates].index.tolist())
-        enc = _enc_names(conn, ids)
-    finally:
-        conn.close()
-    return [{'dancer_id': i, 'enc_name': enc.get(i)} for i in ids]
+    index = _click_through()
+    return index.rows(index.community['excl' if scope == 'excl' else 'incl'].dancers(min_dates))
 
 
 def termly_active_dancer_rows(term_start: str, scope: str, min_activities: int) -> list[dict]:
@@ -511,25 +490,10 @@ def termly_active_dancer_rows(term_start: str, scope: str, min_activities: int)
     emits plaintext. Backs the click-to-download on the termly community chart. Returns [] for a
     ``term_start`` that matches no term. Raises FileNotFoundError if the database is absent.
     """
-    if not Path(config.ATTENDANCE_DB_PATH).exists():
-        raise FileNotFoundError(config.ATTENDANCE_DB_PATH)
-    conn = sqlite3.connect(config.ATTENDANCE_DB_PATH)
-    try:
-        terms, assign = _term_calendar(conn)
-        match = terms[terms['term_start'] == pd.Timestamp(term_start)]
-        counts = _termly_activity_counts(conn, assign)
-        if match.empty or counts.empty:
-            return []
-        term_idx = int(match['term_idx'].iloc[0])
-        if term_idx not in counts.index.get_level_values('term_idx'):
-            return []
-        term_counts = counts.xs(term_idx, level='term_idx')
-        col = 'n_excl' if scope == 'excl' else 'n_incl'
-        ids = sorted(term_counts[term_counts[col] >= min_activities].index.tolist())
-        enc = _enc_names(conn, ids)
-    finally:
-        conn.close()
-    return [{'dancer_id': i, 'enc_name': enc.get(i)} for i in ids]
+    index = _click_through()
+    term_idx = index.term_by_start.get(pd.Timestamp(term_start))
+    ranked = index.termly.get((term_idx, 'excl' if scope == 'excl' else 'incl'))
+    return index.rows(ranked.dancers(min_activities)) if ranked is not None else []
 
 
 def _enc_names(conn: sqlite3.Connection, dancer_ids: list[str]) -> dict[str, str | None]:
@@ -553,11 +517,8 @@ def decrypt_params() -> dict:
     """
     if not Path(config.ATTENDANCE_DB_PATH).exists():
         raise FileNotFoundError(config.ATTENDANCE_DB_PATH)
-    conn = sqlite3.connect(config.ATTENDANCE_DB_PATH)
-    try:
-        rows = dict(conn.execute("SELECT key, value FROM meta WHERE key IN ('salt', 'sentinel')").fetchall())
-    finally:
-        conn.close()
+    conn = read_connection(config.ATTENDANCE_DB_PATH)
+    rows = dict(conn.execute("SELECT key, value FROM meta WHERE key IN ('salt', 'sentinel')").fetchall())
     return {'salt': rows.get('salt'), 'sentinel': rows.get('sentinel')}
 
 
@@ -582,90 +543,91 @@ ACTIVITY_RECORD_FIELDS = [
 ]
 
 
+def activity_record_chunk(activity_id: int) -> list[dict]:
+    """One activity's records in the slim form of the streamed export: its context once, then the records.
+
+    The first item is ``{'activity': {...}}``, the event/activity context (the context fields of
+    ``ACTIVITY_RECORD_FIELDS`` plus ``activity_id``). It is followed by one ``{'record_type': 'named',
+    dancer_id, status, ticket_type, enc_name}`` per named attendee and one ``{'record_type': 'aggregate',
+    ticket_type, head_count}`` per anonymous head-count. Returns an empty list for an unknown activity;
+    raises FileNotFoundError if the database is absent.
+    """
+    if not Path(config.ATTENDANCE_DB_PATH).exists():
+        raise FileNotFoundError(config.ATTENDANCE_DB_PATH)
+    cur = read_connection(config.ATTENDANCE_DB_PATH).cursor()
+    cur.row_factory = sqlite3.Row  # on the cursor: the pooled connection is shared
+    context = cur.execute(
+        'SELECT a.activity_id, e.name AS event_name, e.event_type, e.venue, '
+        'a.name AS activity_name, a.activity_type, a.difficulty, a.date '
+        'FROM activity a JOIN event e USING(event_id) WHERE a.activity_id = ?',
+        (activity_id,),
+    ).fetchone()
+    if context is None:
+        return []
+    named = cur.execute(
+        'SELECT at.dancer_id, at.status, at.ticket_type, d.enc_name '
+        'FROM attendance at LEFT JOIN dancer d ON d.dancer_id = at.dancer_id '
+        'WHERE at.activity_id = ? ORDER BY at.dancer_id',
+        (activity_id,),
+    ).fetchall()
+    aggregate = cur.execute(
+        'SELECT ticket_type, head_count FROM attendance_count WHERE activity_id = ? ORDER BY ticket_type',
+        (activity_id,),
+    ).fetchall()
+
+    return [
+        {'activity': dict(context)},
+        *({'record_type': 'named', **dict(r)} for r in named),
+        *({'record_type': 'aggregate', **dict(r)} for r in aggregate),
+    ]
+
+
 def activity_records(activity_id: int) -> list[dict]:
     """Every attendance record for one activity, with its parent event/activity context.
 
     One row per named attendee (dancer_id + status, plus the ``enc_name`` ciphertext the browser
     decrypts to first/last name) and one per anonymous aggregate head-count (head_count, no
-    dancer), each carrying the event and activity it belongs to. Backs the click-to-download on
-    the all-activities scatter. Returns an empty list for an unknown activity; raises
+    dancer), each carrying the event and activity it belongs to. The flat form of
+    ``activity_record_chunk``. Returns an empty list for an unknown activity; raises
     FileNotFoundError if the database is absent.
     """
-    if not Path(config.ATTENDANCE_DB_PATH).exists():
-        raise FileNotFoundError(config.ATTENDANCE_DB_PATH)
-    conn = sqlite3.connect(config.ATTENDANCE_DB_PATH)
-    conn.row_factory = sqlite3.Row
-    try:
-        context = conn.execute(
-            'SELECT e.name AS event_name, e.event_type, e.venue, '
-            'a.name AS activity_name, a.activity_type, a.difficulty, a.date '
-            'FROM activity a JOIN event e USING(event_id) WHERE a.activity_id = ?',
-            (activity_id,),
-        ).fetchone()
-        if context is None:
-            return []
-        named = conn.execute(
-            'SELECT at.dancer_id, at.status, at.ticket_type, d.enc_name '
-            'FROM attendance at LEFT JOIN dancer d ON d.dancer_id = at.dancer_id '
-            'WHERE at.activity_id = ? ORDER BY at.dancer_id',
-            (activity_id,),
-        ).fetchall()
-        aggregate = conn.execute(
-            'SELECT ticket_type, head_count FROM attendance_count WHERE activity_id = ? ORDER BY ticket_type',
-            (activity_id,),
-        ).fetchall()
-    finally:
-        conn.close()
-
-    ctx = dict(context)
-    rows = [
-        {
-            **ctx,
-            'record_type': 'named',
-            'dancer_id': r['dancer_id'],
-            'status': r['status'],
-            'ticket_type': r['ticket_type'],
-            'head_count': '',
-            'enc_name': r['enc_name'],
-        }
-        for r in named
-    ]
-    rows += [
+    chunk = activity_record_chunk(activity_id)
+    if not chunk:
+        return []
+    ctx = {k: v for k, v in chunk[0]['activity'].items() if k != 'activity_id'}
+    return [
         {
             **ctx,
-            'record_type': 'aggregate',
-            'dancer_id': '',
-            'status': '',
+            'record_type': r['record_type'],
+            'dancer_id': r.get('dancer_id', ''),
+            'status': r.get('status', ''),
             'ticket_type': r['ticket_type'],
-            'head_count': r['head_count'],
-            'enc_name': None,
+            'head_count': r.get('head_count', ''),
+            'enc_name': r.get('enc_name'),
         }
-        for r in aggregate
+        for r in chunk[1:]
     ]
-    return rows
 
 
 def summaries() -> dict:
     """Build the /attendance summary-chart datasets from the deployed attendance database.
 
-    Raises FileNotFoundError if that database hasn't been built. The term calendar is derived
-    once and shared by the builders that bucket by term.
+    Raises FileNotFoundError if that database hasn't been built. The term calendar and the named
+    attendance facts (each loaded once per version of the database) are shared by the builders.
     """
     if not Path(config.ATTENDANCE_DB_PATH).exists():
         raise FileNotFoundError(config.ATTENDANCE_DB_PATH)
 
-    conn = sqlite3.connect(config.ATTENDANCE_DB_PATH)
-    try:
-        terms, assign = _term_calendar(conn)
-        # The per-year charts colour each year from a turbo ramp; the browser derives the ramp
-        # positions from the academic years actually present in these datasets (see the summaries
-        # JS), so the colours re-rank themselves as more years are added.
-        return {
-            'beginner_intake': _beginner_intake(conn, terms, assign),
-            'level2_socials': _level2_and_socials(conn, terms, assign),
-            'cohort_retention': _cohort_retention(conn, terms, assign),
-            'community_2026': _community_2026(conn),
-            'termly_active': _termly_active_community(conn, terms, assign),
-        }
-    finally:
-        conn.close()
+    conn = read_connection(config.ATTENDANCE_DB_PATH)
+    calendar = term_calendar(conn)
+    facts = fact_frame(conn)
+    # The per-year charts colour each year from a turbo ramp; the browser derives the ramp
+    # positions from the academic years actually present in these datasets (see the summaries
+    # JS), so the colours re-rank themselves as more years are added.
+    return {
+        'beginner_intake': _beginner_intake(conn, calendar),
+        'level2_socials': _level2_and_socials(conn, calendar),
+        'cohort_retention': _cohort_retention(conn, calendar, facts),
+        'community_2026': _community_2026(facts),
+        'termly_active': _termly_active_community(calendar, facts),
+    }
@@ -10,14 +10,20 @@ must be pseudonymised before their attendance is ingested.
 This module owns the attendance schema and a narrow write API; it never creates a dancer (that is
 the pseudonymiser's job, see ``pseudonyms_db``) and never reads a spreadsheet cell (parsers in
 ``ingest.py`` do that and call in here). See ``working/attendance_db_design.md`` for the rationale.
+
+The readers (the /attendance datasets and the forecast) go through ``read_connection`` instead: one
+pooled, read-only connection per thread.
 """
 
 import os
 import sqlite3
-from dataclasses import dataclass
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import date, datetime, timezone
 from enum import StrEnum
 from pathlib import Path
+from typing import Callable, Generic, Iterable, Iterator, TypeVar
 
 
 class EventType(StrEnum):
@@ -63,6 +69,26 @@ class TicketType(StrEnum):
 
 SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'attendance_schema.sql')
 
+# activity_attendance as a table (see AttendanceDb.materialise_activity_attendance): the columns of the
+# activity_attendance_live view, indexed for the analytics' filters on level and date and joins on event.
+_ACTIVITY_ATTENDANCE_TABLE = """
+CREATE TABLE activity_attendance (
+    activity_id      INTEGER PRIMARY KEY REFERENCES activity(activity_id),
+    event_id         INTEGER NOT NULL,
+    event_type       TEXT NOT NULL,
+    date             TEXT NOT NULL,
+    activity_type    TEXT,
+    difficulty       TEXT,
+    named_total      INTEGER NOT NULL,
+    aggregate_total  INTEGER NOT NULL,
+    total            INTEGER NOT NULL,
+    named_unknown    INTEGER NOT NULL,
+    named_registered INTEGER NOT NULL
+);
+CREATE INDEX idx_activity_attendance_difficulty_date ON activity_attendance(difficulty, date);
+CREATE INDEX idx_activity_attendance_event ON activity_attendance(event_id);
+"""
+
 
 def _to_iso_date(value: date | datetime | str) -> str:
     """Normalise a date/datetime/ISO-ish string to a 'YYYY-MM-DD' string."""
@@ -78,6 +104,46 @@ class AttendanceDb:
     """Thin write API over the attendance SQLite file. All methods commit."""
 
     conn: sqlite3.Connection
+    _deferred: bool = field(default=False, init=False, repr=False)
+
+    # ---- the materialised activity_attendance ----
+
+    def materialise_activity_attendance(self) -> None:
+        """Store ``activity_attendance`` as an indexed table rather than a view over the raw facts.
+
+        Readers query it by the same name, but no longer pay for re-aggregating ``attendance`` on
+        every query. From then on each write below refreshes the rows of the activity it touches (or,
+        inside ``deferred_refresh``, the whole table once at the end). Idempotent: calling it again
+        rebuilds the table. Called inside ``deferred_refresh``, the table is filled on exit along with
+        everything else, which is how ``ingest.ingest_folder`` uses it.
+        """
+        if not _is_materialised(self.conn):
+            self.conn.execute('DROP VIEW IF EXISTS activity_attendance')
+            self.conn.executescript(_ACTIVITY_ATTENDANCE_TABLE)
+        if not self._deferred:
+            _refresh_activity_attendance(self.conn)
+        self.conn.commit()
+
+    @contextmanager
+    def deferred_refresh(self) -> Iterator['AttendanceDb']:
+        """Skip the per-write refreshes of a materialised ``activity_attendance``; rebuild it once on exit.
+
+        For bulk loads such as ``ingest.ingest_folder``, where one rebuild is far cheaper than a refresh
+        per row. A no-op while ``activity_attendance`` is a view.
+        """
+        self._deferred = True
+        try:
+            yield self
+        finally:
+            self._deferred = False
+            if _is_materialised(self.conn):
+                _refresh_activity_attendance(self.conn)
+                self.conn.commit()
+
+    def _refresh(self, activity_id: int) -> None:
+        # Called before each write's commit, so the fact and its total land together.
+        if not self._deferred and _is_materialised(self.conn):
+            _refresh_activity_attendance(self.conn, [activity_id])
 
     # ---- ingest provenance ----
 
@@ -173,6 +239,7 @@ class AttendanceDb:
                 (event_id, name, str(activity_type) if activity_type else None, difficulty, iso),
             )
             activity_id = cur.lastrowid
+        self._refresh(activity_id)
         self.conn.commit()
         return activity_id
 
@@ -215,6 +282,7 @@ class AttendanceDb:
             f'  source_cell = CASE WHEN {incoming_at_least} THEN excluded.source_cell ELSE source_cell END',
             (activity_id, dancer_id, str(status), _tt(ticket_type), ingest_id, source_cell),
         )
+        self._refresh(activity_id)
         self.conn.commit()
 
     def record_count(
@@ -245,6 +313,7 @@ class AttendanceDb:
                 'VALUES (?, ?, ?, ?, ?)',
                 (activity_id, tt, head_count, ingest_id, source_cell),
             )
+        self._refresh(activity_id)
         self.conn.commit()
 
     def record_waitlist(
@@ -295,6 +364,28 @@ class AttendanceDb:
         self.conn.close()
 
 
+def _is_materialised(conn: sqlite3.Connection) -> bool:
+    """Whether ``activity_attendance`` is a table (materialised) rather than the default view."""
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = 'activity_attendance'").fetchone()
+    return row is not None and row[0] == 'table'
+
+
+def _refresh_activity_attendance(conn: sqlite3.Connection, activity_ids: Iterable[int] | None = None) -> None:
+    """Recompute the materialised rows of ``activity_ids`` (all of them if None) from the live view. No commit.
+
+    The per-activity refresh filters the live view by id, which SQLite pushes down into each of its
+    aggregates, so it costs a few index lookups rather than a pass over ``attendance``.
+    """
+    if activity_ids is None:
+        conn.execute('DELETE FROM activity_attendance')
+        conn.execute('INSERT INTO activity_attendance SELECT * FROM activity_attendance_live')
+        return
+    conn.executemany(
+        'INSERT OR REPLACE INTO activity_attendance SELECT * FROM activity_attendance_live WHERE activity_id = ?',
+        [(activity_id,) for activity_id in activity_ids],
+    )
+
+
 def _tt(ticket_type: TicketType | None) -> str | None:
     # Preserve None as None (SQL NULL) instead of converting to string 'None'.
     return str(ticket_type) if ticket_type is not None else None
@@ -324,10 +415,12 @@ def reassign_dancer(conn: sqlite3.Connection, old_id: str, new_id: str) -> dict[
     * ``event_teacher`` (PK event_id, dancer_id) — once repointed the pair is identical, so the
       duplicate is dropped.
 
-    Does not touch the ``dancer`` table and does not commit: the caller commits once so the whole
+    A materialised ``activity_attendance`` is refreshed for the activities ``old_id`` has rows on. Does
+    not touch the ``dancer`` table and does not commit: the caller commits once so the whole
     merge (facts + identity) lands atomically. Returns ``{table: rows_moved}`` for reporting.
     """
     moved: dict[str, int] = {}
+    touched = [r[0] for r in conn.execute('SELECT activity_id FROM attendance WHERE dancer_id = ?', (old_id,))]
 
     # attendance: resolve same-activity clashes (upgrade the survivor's status if old's beats it,
     # then drop old's row), then repoint whatever remains.
@@ -363,6 +456,8 @@ def reassign_dancer(conn: sqlite3.Connection, old_id: str, new_id: str) -> dict[
         'UPDATE event_teacher SET dancer_id = ? WHERE dancer_id = ?', (new_id, old_id)
     ).rowcount
 
+    if _is_materialised(conn):  # a collapsed pair can change an activity's counts
+        _refresh_activity_attendance(conn, touched)
     return moved
 
 
@@ -382,3 +477,116 @@ def open_db(db_path: Path | str, enforce_foreign_keys: bool = True) -> Attendanc
         conn.executescript(f.read())
     conn.commit()
     return AttendanceDb(conn)
+
+
+def db_fingerprint(db_path: Path | str) -> tuple:
+    """A cheap token that changes whenever the database file (or its WAL) is written or replaced.
+
+    Built from ``os.stat`` of the file (size, mtime and inode, so an upload that swaps in a new file of
+    the same size is still seen) and of its ``-wal`` sidecar. An empty WAL counts as no WAL: readers
+    create one just by opening the file. Readers that cache results derived from the database compare
+    fingerprints instead of re-querying (``DbVersionMemo`` does so for a single value).
+
+    Take the fingerprint *before* reading the data it stands for: a write landing mid-read then leaves the
+    file with a newer fingerprint than the one kept, so the next comparison rebuilds rather than keeping
+    a result that missed the write.
+    """
+    try:
+        st = os.stat(db_path)
+        db = st.st_size, st.st_mtime_ns, st.st_ino
+    except FileNotFoundError:
+        db = None
+    try:
+        st = os.stat(f'{db_path}-wal')
+        wal = (st.st_size, st.st_mtime_ns) if st.st_size else None
+    except FileNotFoundError:
+        wal = None
+    return db, wal
+
+
+T = TypeVar('T')
+
+
+class DbVersionMemo(Generic[T]):
+    """One value derived from a database file, kept until the file changes (see ``db_fingerprint``).
+
+    Each memo holds a single (path, fingerprint) slot, so it suits a value of the one deployed database:
+    the term calendar, the attendance fact frame, the click-through index. Thread-safe; two threads that
+    miss at once both derive, and the later result is kept.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cached: tuple[tuple, T] | None = None  # ((db path, db_fingerprint), value) of the last derivation
+
+    def get(self, db_path: Path | str, derive: Callable[[], T]) -> T:
+        """The value for the current version of ``db_path``, calling ``derive()`` only if that version is new.
+
+        A hit only stats the file.
+        """
+        version = str(db_path), db_fingerprint(db_path)
+        with self._lock:
+            if self._cached is not None and self._cached[0] == version:
+                return self._cached[1]
+        value = derive()
+        with self._lock:
+            self._cached = version, value
+        return value
+
+    def of(self, conn: sqlite3.Connection, derive: Callable[[sqlite3.Connection], T]) -> T:
+        """``get`` for the database ``conn`` is open on, as ``derive(conn)``.
+
+        An in-memory database has no version to key on, so it is derived on every call.
+        """
+        path = conn.execute('PRAGMA database_list').fetchone()[2]
+        if not path:
+            return derive(conn)
+        return self.get(path, lambda: derive(conn))
+
+
+# Pragmas for the pooled read-only connections: a 64 MiB page cache, and up to 256 MiB of the file
+# memory-mapped so that warm reads are served from the page cache without a read() per page.
+_READ_CACHE_KIB = 64 * 1024
+_READ_MMAP_BYTES = 256 * 1024 * 1024
+
+_READERS = threading.local()  # per thread: (db path, (st_dev, st_ino), connection) of its pooled reader
+
+
+def _open_reader(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(f'{path.resolve().as_uri()}?mode=ro', uri=True)
+    conn.execute('PRAGMA query_only = ON')
+    conn.execute(f'PRAGMA cache_size = -{_READ_CACHE_KIB}')
+    conn.execute(f'PRAGMA mmap_size = {_READ_MMAP_BYTES}')
+    conn.execute('PRAGMA temp_store = MEMORY')
+    return conn
+
+
+def read_connection(db_path: Path | str) -> sqlite3.Connection:
+    """This thread's read-only connection to the database at ``db_path``, kept open between calls.
+
+    Opened ``mode=ro`` and ``query_only``, with a large page cache, memory-mapped reads and in-memory
+    temp tables, so the analytics queries neither write to the file nor pay a cold open (and an empty
+    page cache) per request. Each thread keeps one connection, reopened when it asks for another path or
+    when the file at ``db_path`` has been replaced (a new inode, as an upload or rebuild swaps it in);
+    writes made in place are seen as by any SQLite reader. The connection is shared, so callers must not
+    close it or change its ``row_factory`` (set one on a cursor instead). Raises FileNotFoundError if the
+    database is absent.
+    """
+    path = Path(db_path)
+    st = os.stat(path)
+    identity = st.st_dev, st.st_ino
+    pooled = getattr(_READERS, 'pooled', None)
+    if pooled is not None and pooled[:2] == (str(path), identity):
+        return pooled[2]
+    close_read_connection()
+    conn = _open_reader(path)
+    _READERS.pooled = str(path), identity, conn
+    return conn
+
+
+def close_read_connection() -> None:
+    """Close this thread's pooled read-only connection, if it has one."""
+    pooled = getattr(_READERS, 'pooled', None)
+    if pooled is not None:
+        _READERS.pooled = None
+        pooled[2].close()
@@ -73,8 +73,30 @@ CREATE TABLE IF NOT EXISTS waitlist (
 );
 
 CREATE INDEX IF NOT EXISTS idx_activity_date ON activity(date);
+CREATE INDEX IF NOT EXISTS idx_activity_event_difficulty_date ON activity(event_id, difficulty, date);
+CREATE INDEX IF NOT EXISTS idx_activity_difficulty_date ON activity(difficulty, date);
+CREATE INDEX IF NOT EXISTS idx_attendance_status_activity_dancer ON attendance(status, activity_id, dancer_id);
+CREATE INDEX IF NOT EXISTS idx_attendance_dancer ON attendance(dancer_id);
+CREATE INDEX IF NOT EXISTS idx_attendance_ticket_activity ON attendance(ticket_type, activity_id);
+CREATE INDEX IF NOT EXISTS idx_attendance_count_activity_heads ON attendance_count(activity_id, ticket_type, head_count);
+CREATE INDEX IF NOT EXISTS idx_waitlist_event_heads ON waitlist(event_id, head_count);
 
-CREATE VIEW IF NOT EXISTS activity_attendance AS
+CREATE TABLE IF NOT EXISTS term (
+    term_idx   INTEGER PRIMARY KEY,
+    term_start TEXT NOT NULL,
+    acad_year  INTEGER NOT NULL,
+    term_num   INTEGER NOT NULL,
+    label      TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS activity_term (
+    activity_id INTEGER PRIMARY KEY REFERENCES activity(activity_id),
+    term_idx    INTEGER NOT NULL REFERENCES term(term_idx)
+);
+
+CREATE INDEX IF NOT EXISTS idx_activity_term_term ON activity_term(term_idx);
+
+CREATE VIEW IF NOT EXISTS activity_attendance_live AS
 SELECT a.activity_id, a.event_id, e.event_type, a.date, a.activity_type, a.difficulty,
        COALESCE(named.n, 0)                       AS named_total,
        COALESCE(agg.n, 0)                         AS aggregate_total,
@@ -91,3 +113,5 @@ LEFT JOIN (SELECT activity_id, COUNT(*) AS n FROM attendance
            GROUP BY activity_id) reg USING (activity_id)
 LEFT JOIN (SELECT activity_id, SUM(head_count) AS n FROM attendance_count
            GROUP BY activity_id) agg USING (activity_id);
+
+CREATE VIEW IF NOT EXISTS activity_attendance AS SELECT * FROM activity_attendance_live;
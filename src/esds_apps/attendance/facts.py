@@ -0,0 +1,48 @@
+"""The named attendance facts of the attendance DB as one columnar frame, shared by the /attendance datasets.
+
+The cohort, community and termly charts (and the click-through downloads behind them) all read the same
+``attendance JOIN activity JOIN event`` rows, then parse the dates and bucket them by term. ``fact_frame``
+does that once per version of the database (see ``attendance_db.db_fingerprint``), as ``terms.term_calendar``
+does for the calendar, and each dataset filters the shared frame rather than querying for its own copy.
+"""
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from esds_apps.attendance.attendance_db import DbVersionMemo
+from esds_apps.attendance.terms import term_calendar
+
+# The 30th anniversary weekender, which several charts show with and without.
+_THIRTIETH_EVENT_PATTERN = '%30 Years%'
+
+
+def _load(conn: sqlite3.Connection) -> pd.DataFrame:
+    facts = pd.read_sql_query(
+        'SELECT at.dancer_id, at.activity_id, at.status, a.date, a.activity_type, (e.name LIKE ?) AS is_30th '
+        'FROM attendance at JOIN activity a USING(activity_id) JOIN event e USING(event_id)',
+        conn,
+        params=(_THIRTIETH_EVENT_PATTERN,),
+        parse_dates=['date'],
+    )
+    for col in ('dancer_id', 'status', 'activity_type'):
+        facts[col] = facts[col].astype('category')
+    facts['is_30th'] = facts['is_30th'].astype(bool)
+    term_idx = facts['activity_id'].map(term_calendar(conn).activity_terms)
+    facts['term_idx'] = term_idx.fillna(-1).to_numpy(dtype=np.int64)
+    return facts
+
+
+_FRAMES: DbVersionMemo[pd.DataFrame] = DbVersionMemo()
+
+
+def fact_frame(conn: sqlite3.Connection) -> pd.DataFrame:
+    """Every named attendance record of the database ``conn`` is open on, loaded once per version of that file.
+
+    One row per (dancer, activity): categorical ``dancer_id``, ``status`` and ``activity_type``, the
+    ``activity_id``, its ``date`` (datetime64), ``is_30th`` (the activity belongs to the 30th anniversary
+    weekender) and ``term_idx`` (see ``terms.TermCalendar``; -1 before the first term). Shared between
+    callers, so filter it rather than modify it. An in-memory database is loaded on every call.
+    """
+    return _FRAMES.of(conn, _load)
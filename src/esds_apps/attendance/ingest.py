@@ -16,6 +16,7 @@ import openpyxl
 
 from esds_apps.attendance.attendance_db import AttendanceDb
 from esds_apps.attendance.parsers import PARSERS, _parse_dt, _strip_attendance
+from esds_apps.attendance.terms import store_terms
 
 
 @dataclass
@@ -167,10 +168,20 @@ def ingest_file(
     return report
 
 
-def ingest_folder(output_root, db: AttendanceDb, parsers: list | None = None) -> IngestReport:
-    """Walk the attendance_outputs tree, dispatch each sheet to a matching parser."""
+def ingest_folder(output_root, db: AttendanceDb, parsers: list | None = None, materialise: bool = True) -> IngestReport:
+    """Walk the attendance_outputs tree, dispatch each sheet to a matching parser.
+
+    ``activity_attendance`` is stored as an indexed table (``AttendanceDb.materialise_activity_attendance``)
+    unless ``materialise`` is False, which keeps the view. A materialised table is rebuilt once at the end
+    rather than after every row. Finishes by rewriting the stored term calendar (``terms.store_terms``) to
+    cover the activities just ingested.
+    """
     parsers = parsers if parsers is not None else PARSERS
     report = IngestReport()
-    for path in sorted(output_root.rglob('*.xlsx')):
-        ingest_file(path, db, parsers=parsers, rel=path.relative_to(output_root).as_posix(), report=report)
+    with db.deferred_refresh():
+        if materialise:
+            db.materialise_activity_attendance()
+        for path in sorted(output_root.rglob('*.xlsx')):
+            ingest_file(path, db, parsers=parsers, rel=path.relative_to(output_root).as_posix(), report=report)
+    store_terms(db.conn)
     return report
@@ -0,0 +1,196 @@
+"""The /attendance JSON responses, computed once per version of the attendance database.
+
+The database only changes when a new build is uploaded, so each dataset (the scatter rows, the summary
+charts, a community download, ...) is computed and serialised on first request and the bytes are kept
+against the database's fingerprint (see ``attendance_db.db_fingerprint``). Each entry carries an ETag, a
+digest of its bytes, so every worker process hands out the same tag for the same data and a browser
+holding it gets a bodiless 304. A body worth compressing is gzipped once, when it is cached, and sent
+that way to every client that accepts gzip.
+
+When the fingerprint changes, the entries of the previous version keep serving while a background thread
+recomputes them against the new file, as the forecast does with its context, so no request waits on a
+rebuild of a dataset that was already in use. A dataset first asked for after the change is computed in
+the calling thread. Without a database nothing is cached: ``get`` just runs ``compute``, which raises
+FileNotFoundError in that case.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from esds_apps import config
+from esds_apps.attendance.attendance_db import db_fingerprint
+
+log = logging.getLogger(__name__)
+
+
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    for coding in (accept_encoding or '').split(','):
+        name, _, params = coding.partition(';')
+        if name.strip().lower() in ('gzip', '*'):
+            q = params.strip().replace(' ', '')
+            try:
+                return not q.startswith('q=') or float(q[2:]) > 0
+            except ValueError:
+                return False
+    return False
+
+
+@dataclass(frozen=True)
+class CachedJson:
+    body: bytes
+    etag: str
+    gzipped: Optional[bytes] = None  # the body gzip-compressed once, if it is big enough to be worth it
+
+    @property
+    def gzip_etag(self) -> str:
+        """The ETag of the gzipped body: each encoding is a representation of its own, with its own tag."""
+        return f'{self.etag[:-1]}-gzip"'
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Whether an ``If-None-Match`` header value names this entry (weak tags and ``*`` included)."""
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        return '*' in tags or self.etag in tags or (self.gzipped is not None and self.gzip_etag in tags)
+
+    def encoded(self, accept_encoding: Optional[str]) -> tuple[bytes, dict]:
+        """The body to send for an ``Accept-Encoding`` header value, and its ETag and encoding headers."""
+        if self.gzipped is None:
+            return self.body, {'ETag': self.etag}
+        if _accepts_gzip(accept_encoding):
+            return self.gzipped, {'ETag': self.gzip_etag, 'Content-Encoding': 'gzip', 'Vary': 'Accept-Encoding'}
+        return self.body, {'ETag': self.etag, 'Vary': 'Accept-Encoding'}
+
+
+@dataclass
+class _Entry:
+    json: CachedJson
+    compute: Callable[[], Any]
+
+
+_LOCK = threading.Lock()
+_FINGERPRINT: tuple | None = None  # the database version the entries in _ENTRIES were computed from
+_ENTRIES: 'OrderedDict[tuple, _Entry]' = OrderedDict()
+_STALE: 'OrderedDict[tuple, _Entry]' = OrderedDict()  # the previous version's, served until recomputed
+_KEY_LOCKS: dict[tuple, threading.Lock] = {}  # so concurrent misses on one key compute it once
+_WARM: Optional[threading.Thread] = None
+
+
+def _serialise(payload: Any) -> CachedJson:
+    # The same encoding as JSONResponse, so a cached body is byte-for-byte what the route used to send.
+    body = json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(',', ':')).encode()
+    gzipped = gzip.compress(body, mtime=0) if len(body) >= config.ATTENDANCE_GZIP_MIN_BYTES else None
+    return CachedJson(body, f'"{hashlib.sha256(body).hexdigest()[:32]}"', gzipped)
+
+
+def _store(key: tuple, entry: _Entry) -> None:
+    # Bounded per dataset, so paging through downloads of one kind only evicts older ones of that kind.
+    _ENTRIES[key] = entry
+    _ENTRIES.move_to_end(key)
+    same_dataset = [k for k in _ENTRIES if k[0] == key[0]]  # least recently used first
+    for k in same_dataset[: len(same_dataset) - config.ATTENDANCE_RESULT_CACHE_SIZE]:
+        del _ENTRIES[k]
+
+
+def _warm(fingerprint: tuple) -> None:
+    global _WARM
+    while True:
+        with _LOCK:
+            if _FINGERPRINT != fingerprint or not _STALE:
+                break
+            key, stale = next(reversed(_STALE.items()))  # most recently used first
+        try:
+            _fill(key, stale.compute, fingerprint)  # moves the key from _STALE to _ENTRIES
+        except Exception:
+            # e.g. an upload still being copied into place: keep serving the old result until the file changes
+            log.exception('Recomputing the cached attendance dataset %s failed; keeping the previous one.', key)
+            with _LOCK:
+                if _FINGERPRINT == fingerprint and _STALE.pop(key, None) is not None:
+                    _store(key, stale)
+    with _LOCK:
+        if _WARM is threading.current_thread():
+            _WARM = None
+
+
+def _check_version(fingerprint: tuple) -> None:
+    # Called holding _LOCK: on a new database version, the current entries go stale and start recomputing.
+    global _FINGERPRINT, _ENTRIES, _STALE, _WARM
+    if fingerprint == _FINGERPRINT:
+        return
+    _FINGERPRINT, _STALE, _ENTRIES = fingerprint, _ENTRIES, OrderedDict()
+    _KEY_LOCKS.clear()
+    if _STALE:
+        log.info('The attendance database has changed; recomputing %d cached datasets.', len(_STALE))
+        _WARM = threading.Thread(target=_warm, args=(fingerprint,), name='attendance-cache', daemon=True)
+        _WARM.start()
+
+
+def lookup(key: tuple) -> Optional[CachedJson]:
+    """The cached response for ``key`` if there is one (possibly the previous version's), without computing it.
+
+    Only stats the database and reads a dict, so it is safe to call on the event loop.
+    """
+    fingerprint = db_fingerprint(config.ATTENDANCE_DB_PATH)
+    if fingerprint[0] is None:
+        return None
+    with _LOCK:
+        _check_version(fingerprint)
+        entry = _ENTRIES.get(key) or _STALE.get(key)
+        if entry is None:
+            return None
+        if key in _ENTRIES:
+            _ENTRIES.move_to_end(key)
+        return entry.json
+
+
+def _fill(key: tuple, compute: Callable[[], Any], fingerprint: tuple) -> CachedJson:
+    with _LOCK:
+        key_lock = _KEY_LOCKS.setdefault(key, threading.Lock())
+    with key_lock:
+        with _LOCK:
+            if _FINGERPRINT == fingerprint and key in _ENTRIES:
+                _STALE.pop(key, None)
+                return _ENTRIES[key].json
+        cached = _serialise(compute())
+        with _LOCK:
+            # A result computed while the file was being replaced is returned but not kept.
+            if _FINGERPRINT == fingerprint:
+                _STALE.pop(key, None)
+                _store(key, _Entry(cached, compute))
+        return cached
+
+
+def get(key: tuple, compute: Callable[[], Any]) -> CachedJson:
+    """The response for ``key``, from the cache or by serialising ``compute()`` and caching it.
+
+    ``key`` names the dataset and its arguments, e.g. ``('community_dancers', 'incl', 3)``; ``compute`` is
+    kept with the result and called again whenever the database changes. Each dataset keeps its
+    ``config.ATTENDANCE_RESULT_CACHE_SIZE`` most recently used results. May run the (slow) computation,
+    so call it from a worker thread.
+    """
+    # Taken before computing (see db_fingerprint).
+    fingerprint = db_fingerprint(config.ATTENDANCE_DB_PATH)
+    if fingerprint[0] is None:
+        return _serialise(compute())
+    with _LOCK:
+        _check_version(fingerprint)
+        entry = _ENTRIES.get(key) or _STALE.get(key)
+    if entry is not None:
+        return entry.json
+    return _fill(key, compute, fingerprint)
+
+
+def clear() -> None:
+    """Forget every cached response, e.g. between tests."""
+    global _FINGERPRINT
+    with _LOCK:
+        _FINGERPRINT = None
+        _ENTRIES.clear()
+        _STALE.clear()
+        _KEY_LOCKS.clear()
@@ -0,0 +1,168 @@
+"""The teaching-term calendar: which term each date, and each activity, of the attendance DB falls in.
+
+Terms are not a stored column. A term opens with each substantial Level 1 course block, blocks starting
+within a few weeks of each other being one term, and is named by its academic year and its place in it
+('24/25 T2'). The derivation is lifted near-verbatim from the notebook (``working/attendance.ipynb``) so
+the web charts can't drift from the validated notebook ones.
+
+Every /attendance dataset buckets by term, so ``term_calendar`` derives the calendar once per version of
+the database (see ``attendance_db.db_fingerprint``) and hands out the same ``TermCalendar`` until the file
+changes. ``store_terms`` writes the calendar into the database itself, as the ``term`` and
+``activity_term`` tables, so SQL can join on a term instead of re-bucketing dates in pandas; the ingest
+refreshes them at the end of each run, and readers check ``stored_terms_current`` before joining.
+"""
+
+import sqlite3
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from esds_apps.attendance.attendance_db import DbVersionMemo
+
+# A substantial Level 1 block (>= this many weekly lessons) anchors a term; shorter L1
+# appearances (one-offs, Stockbridge) never define one.
+_MIN_L1_LESSONS_FOR_TERM = 4
+# Two L1 block starts within this many days are the same term (a twice-weekly strand or a
+# paired social mustn't split a term).
+_TERM_MERGE_DAYS = 21
+# Academic years run September -> August, so a date in this month or later belongs to the year
+# that's just starting (Sept 2024 -> the 2024/25 year; Jan 2025 -> still 2024/25).
+_ACADEMIC_YEAR_START_MONTH = 8
+
+
+def acad_year_label(acad_year: int) -> str:
+    """'2023' -> '23/24'."""
+    return f'{str(acad_year)[2:]}/{str(acad_year + 1)[2:]}'
+
+
+def _assign(term_starts: np.ndarray, dates) -> pd.Series:
+    d = pd.to_datetime(dates)
+    if not isinstance(d, pd.Series):
+        d = pd.Series(d)
+    idx = np.searchsorted(term_starts, d.to_numpy(), side='right') - 1
+    return pd.Series(idx, index=d.index).where(idx >= 0).astype('Int64')
+
+
+@dataclass(frozen=True, eq=False)
+class TermCalendar:
+    """The terms of one version of the attendance DB, and the term of each of its activities.
+
+    ``terms`` has one row per term in date order: ``term_idx``, ``term_start``, ``acad_year``,
+    ``term_num``, ``label`` and the teaching-team columns (``teacher_set``, ``teacher_id``,
+    ``teacher_label``). ``activity_terms`` maps each activity_id on or after the first term's start to
+    its ``term_idx``. Shared between callers, so neither may be modified.
+    """
+
+    terms: pd.DataFrame
+    activity_terms: pd.Series
+    term_starts: np.ndarray
+
+    def assign(self, dates) -> pd.Series:
+        """Map datetime-like values to their term_idx via the calendar (<NA> before the first term)."""
+        return _assign(self.term_starts, dates)
+
+    @classmethod
+    def derive(cls, conn: sqlite3.Connection) -> 'TermCalendar':
+        """Derive the calendar from the database ``conn`` is open on, as the notebook does."""
+        l1 = pd.read_sql_query(
+            'SELECT MIN(a.date) AS start, GROUP_CONCAT(DISTINCT et.dancer_id) AS teachers '
+            'FROM event e JOIN activity a USING(event_id) '
+            'LEFT JOIN event_teacher et ON et.event_id = e.event_id '
+            "WHERE e.event_type = 'course' AND a.difficulty = 'Level 1' "
+            'GROUP BY e.event_id HAVING COUNT(a.activity_id) >= ? ORDER BY start',
+            conn,
+            params=(_MIN_L1_LESSONS_FOR_TERM,),
+            parse_dates=['start'],
+        )
+
+        anchors: list[pd.Timestamp] = []
+        for d in sorted(l1['start']):
+            if not anchors or (d - anchors[-1]).days > _TERM_MERGE_DAYS:
+                anchors.append(d)
+
+        term_start = pd.to_datetime(pd.Series(anchors, dtype=object))
+        terms = pd.DataFrame({'term_idx': np.arange(len(anchors)), 'term_start': term_start})
+        starts = terms['term_start'].dt
+        terms['acad_year'] = (starts.year - (starts.month < _ACADEMIC_YEAR_START_MONTH)).astype(int)
+        terms['term_num'] = terms.groupby('acad_year').cumcount() + 1
+        terms['label'] = [f'{acad_year_label(ay)} T{n}' for ay, n in zip(terms['acad_year'], terms['term_num'])]
+
+        term_starts = terms['term_start'].to_numpy()
+        activities = pd.read_sql_query('SELECT activity_id, date FROM activity', conn, parse_dates=['date'])
+        term_idx = _assign(term_starts, activities['date'])
+        in_term = term_idx.notna()
+        activity_terms = pd.Series(
+            term_idx[in_term].astype(int).to_numpy(), index=activities.loc[in_term, 'activity_id'], name='term_idx'
+        )
+
+        # Teaching team per term: the union of Level 1 teachers on the courses that fall in it.
+        team: dict[int, frozenset] = {}
+        for t, teachers in zip(_assign(term_starts, l1['start']), l1['teachers']):
+            if isinstance(teachers, str) and not pd.isna(t):
+                team[int(t)] = team.get(int(t), frozenset()) | frozenset(teachers.split(','))
+        teacher_sets = [team.get(t, frozenset()) for t in terms['term_idx']]
+        team_id = {s: i for i, s in enumerate(dict.fromkeys(s for s in teacher_sets if s))}  # by first appearance
+        terms['teacher_set'] = teacher_sets
+        terms['teacher_id'] = [team_id.get(s, -1) for s in teacher_sets]
+        terms['teacher_label'] = [
+            '+'.join(sorted(d.replace('DNC-', '') for d in s)) if s else 'unknown' for s in teacher_sets
+        ]
+        return cls(terms, activity_terms, term_starts)
+
+
+_CALENDARS: DbVersionMemo[TermCalendar] = DbVersionMemo()
+
+
+def term_calendar(conn: sqlite3.Connection) -> TermCalendar:
+    """The term calendar of the database ``conn`` is open on, derived once per version of that file.
+
+    An in-memory database has no version to key on, so its calendar is derived on every call.
+    """
+    return _CALENDARS.of(conn, TermCalendar.derive)
+
+
+def stored_terms_current(conn: sqlite3.Connection, calendar: TermCalendar) -> bool:
+    """Whether the ``term`` and ``activity_term`` tables hold ``calendar``, so SQL may join on them.
+
+    ``calendar`` is the one derived from the same version of the file (``term_calendar``). The stored
+    tables match it when they have the same term starts and the same number of activities: the tables
+    are rewritten wholesale, so a database written since the last ``store_terms`` (or built before the
+    tables existed) shows up as a difference there.
+    """
+    try:
+        starts = [s for (s,) in conn.execute('SELECT term_start FROM term ORDER BY term_idx')]
+        n_activities = conn.execute('SELECT COUNT(*) FROM activity_term').fetchone()[0]
+    except sqlite3.OperationalError:  # no such table
+        return False
+    return starts == calendar.terms['term_start'].dt.strftime('%Y-%m-%d').tolist() and n_activities == len(
+        calendar.activity_terms
+    )
+
+
+def store_terms(conn: sqlite3.Connection) -> TermCalendar:
+    """Rewrite the ``term`` and ``activity_term`` tables from a fresh derivation, commit, and return it.
+
+    Run after the activities change (the ingest does so at the end of each run); until then the tables
+    describe the database as it was when they were last stored.
+    """
+    calendar = TermCalendar.derive(conn)
+    terms = calendar.terms
+    conn.execute('DELETE FROM activity_term')
+    conn.execute('DELETE FROM term')
+    conn.executemany(
+        'INSERT INTO term (term_idx, term_start, acad_year, term_num, label) VALUES (?, ?, ?, ?, ?)',
+        zip(
+            terms['term_idx'].tolist(),
+            terms['term_start'].dt.strftime('%Y-%m-%d').tolist(),
+            terms['acad_year'].tolist(),
+            terms['term_num'].tolist(),
+            terms['label'].tolist(),
+        ),
+    )
+    conn.executemany(
+        'INSERT INTO activity_term (activity_id, term_idx) VALUES (?, ?)',
+        zip(calendar.activity_terms.index.tolist(), calendar.activity_terms.tolist()),
+    )
+    conn.commit()
+    return calendar
@@ -1,7 +1,10 @@
+import asyncio
 import json
 import logging
 import secrets
 import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from functools import wraps
 from http import HTTPStatus
 from typing import Callable
@@ -158,7 +161,28 @@ async def handle_oauth_callback(request: Request) -> RedirectResponse:
     return response
 
 
-async def _get_service_account_token(scopes: list[str]) -> str:
+@dataclass
+class _ServiceAccountToken:
+    access_token: str
+    expires_at: float  # time.monotonic() deadline
+
+
+# Service-account tokens, per scope set. A token is reused until it is within _SA_TOKEN_EXPIRY_MARGIN_S
+# of expiring; inside _SA_TOKEN_REFRESH_WINDOW_S a replacement is fetched in the background while the
+# current one keeps serving, so a login only waits on the token exchange when there is no usable token.
+_SA_TOKENS: dict[tuple[str, ...], _ServiceAccountToken] = {}
+_SA_TOKEN_REFRESHES: dict[tuple[str, ...], asyncio.Task] = {}
+_SA_TOKEN_LOCK = asyncio.Lock()
+_SA_TOKEN_EXPIRY_MARGIN_S = 60
+_SA_TOKEN_REFRESH_WINDOW_S = 5 * 60
+
+# Recent group-membership answers, least recently used first: email -> (is_member, time.monotonic() deadline).
+_GROUP_MEMBERSHIP: 'OrderedDict[str, tuple[bool, float]]' = OrderedDict()
+
+_GROUP_MEMBER_SCOPES = ['https://www.googleapis.com/auth/admin.directory.group.member.readonly']
+
+
+async def _fetch_service_account_token(scopes: list[str]) -> _ServiceAccountToken:
     """Obtain a Bearer token for the service account via the JWT bearer grant flow."""
     with open(config.SECRETS['GOOGLE_SERVICE_ACCOUNT_FILE']) as f:
         sa_info = json.load(f)
@@ -181,15 +205,68 @@ async def _get_service_account_token(scopes: list[str]) -> str:
             data={'grant_type': 'urn:ietf:params:oauth:grant-type:jwt-bearer', 'assertion': assertion},
         )
     resp.raise_for_status()
-    return resp.json()['access_token']
+    body = resp.json()
+    return _ServiceAccountToken(body['access_token'], time.monotonic() + float(body.get('expires_in', 3600)))
+
+
+def _usable(token: _ServiceAccountToken | None) -> bool:
+    return token is not None and time.monotonic() < token.expires_at - _SA_TOKEN_EXPIRY_MARGIN_S
+
+
+async def _refresh_service_account_token(key: tuple[str, ...]) -> None:
+    """Replace the cached token for ``key`` in the background; the current one stays in use until then."""
+    try:
+        async with _SA_TOKEN_LOCK:
+            _SA_TOKENS[key] = await _fetch_service_account_token(list(key))
+        log.debug('Refreshed the service account token in the background')
+    except httpx.HTTPError as e:
+        log.warning(f'Background refresh of the service account token failed ({e}); will retry on next use')
+
+
+async def _get_service_account_token(scopes: list[str]) -> str:
+    """Return a Bearer token for the service account, reusing the cached one while it is still valid."""
+    key = tuple(sorted(scopes))
+    cached = _SA_TOKENS.get(key)
+    if _usable(cached):
+        if time.monotonic() >= cached.expires_at - _SA_TOKEN_REFRESH_WINDOW_S:
+            refresh = _SA_TOKEN_REFRESHES.get(key)
+            if refresh is None or refresh.done():
+                _SA_TOKEN_REFRESHES[key] = asyncio.create_task(_refresh_service_account_token(key))
+        return cached.access_token
+
+    async with _SA_TOKEN_LOCK:
+        # A concurrent login may have fetched a fresh token while this one waited for the lock.
+        cached = _SA_TOKENS.get(key)
+        if not _usable(cached):
+            cached = await _fetch_service_account_token(list(key))
+            _SA_TOKENS[key] = cached
+    return cached.access_token
+
+
+def _store_group_membership(key: str, is_member: bool, expires_at: float) -> None:
+    _GROUP_MEMBERSHIP[key] = (is_member, expires_at)
+    _GROUP_MEMBERSHIP.move_to_end(key)
+    while len(_GROUP_MEMBERSHIP) > config.GROUP_MEMBERSHIP_CACHE_MAX_ENTRIES:
+        _GROUP_MEMBERSHIP.popitem(last=False)
 
 
 async def _is_group_member(email: str) -> bool:
-    """Return True if email is a member of the configured Google Workspace group."""
+    """Return True if email is a member of the configured Google Workspace group.
+
+    Answers are cached per email for a few minutes (config.GROUP_MEMBERSHIP_CACHE_TIMEOUT_S, or the
+    shorter GROUP_NON_MEMBERSHIP_CACHE_TIMEOUT_S for a "no"), so a burst of logins doesn't re-ask Google.
+    The cache holds at most GROUP_MEMBERSHIP_CACHE_MAX_ENTRIES emails. Failed checks are never cached.
+    """
+    key = email.lower()
+    cached = _GROUP_MEMBERSHIP.get(key)
+    if cached is not None:
+        if time.monotonic() < cached[1]:
+            _GROUP_MEMBERSHIP.move_to_end(key)
+            return cached[0]
+        del _GROUP_MEMBERSHIP[key]
+
     group = config.SECRETS['GOOGLE_ALLOWED_GROUP_EMAIL']
-    access_token = await _get_service_account_token(
-        ['https://www.googleapis.com/auth/admin.directory.group.member.readonly']
-    )
+    access_token = await _get_service_account_token(_GROUP_MEMBER_SCOPES)
     url = f'{_GOOGLE_ADMIN_API}/groups/{group}/hasMember/{email}'
     async with httpx.AsyncClient() as client:
         resp = await client.get(url, headers={'Authorization': f'Bearer {access_token}'})
@@ -197,6 +274,11 @@ async def _is_group_member(email: str) -> bool:
         is_member = resp.json().get('isMember', False)
         if is_member:
             log.info(f'{email} is a member of {group}, access granted')
+        ttl = config.GROUP_MEMBERSHIP_CACHE_TIMEOUT_S if is_member else config.GROUP_NON_MEMBERSHIP_CACHE_TIMEOUT_S
+        _store_group_membership(key, is_member, time.monotonic() + ttl)
         return is_member
+    if resp.status_code == HTTPStatus.UNAUTHORIZED:
+        # The cached token was revoked early; drop it so the next login fetches a new one.
+        _SA_TOKENS.pop(tuple(sorted(_GROUP_MEMBER_SCOPES)), None)
     log.warning(f'Group membership check for {email} returned {resp.status_code}: {resp.text}')
     return False
@@ -0,0 +1,116 @@
+"""Snapshots of currently valid membership cards, for the door scanner to check against offline.
+
+The rapid scanner downloads a bundle of every card that isn't invalidated, keyed by the SHA-256 hex
+digest of the card's check URL (the text in its QR code), and answers scans from it at once; the live
+Dancecloud check then happens in the background. Keying by digest means the bundle never carries card
+UUIDs or names: it can only confirm a URL someone has already scanned.
+
+A bundle is an unsigned, versioned snapshot: its ``version`` is the SHA-256 digest of its contents, and
+the scanner trusts it as it trusts any other response from this server over HTTPS. A signature would add
+nothing: the scanner would have to verify it with the same-origin JavaScript that decides what to show,
+so anyone able to tamper with the bundle could tamper with that check too. A scanner that already
+holds a bundle sends its version back as ``since`` and gets only the entries that changed. An unknown or
+expired version gets a full snapshot, as does any worker that never served the older version.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional
+
+import pytz
+
+from esds_apps import config
+from esds_apps.classes import MembershipCard
+from esds_apps.dancecloud_interface import fetch_membership_cards
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class _Snapshot:
+    digest: str
+    generated_at: str
+    cards: dict[str, list[str]]  # card_key -> [expires_on (YYYY-MM-DD), status]
+
+
+_history: 'OrderedDict[str, _Snapshot]' = OrderedDict()
+_current: Optional[_Snapshot] = None
+_current_built_at = float('-inf')  # time.monotonic() of the last rebuild, even one that changed nothing
+_lock = asyncio.Lock()
+
+
+def card_key(check_url: str) -> str:
+    """The bundle key for a card: the SHA-256 hex digest of its check URL (the QR code text)."""
+    return hashlib.sha256(check_url.encode()).hexdigest()
+
+
+def _entries(cards: Iterable[MembershipCard]) -> dict[str, list[str]]:
+    return {
+        card_key(card.check_url): [card.expires_at.date().isoformat(), str(card.status)]
+        for card in cards
+        if not card.is_invalidated
+    }
+
+
+def _remember(cards: dict[str, list[str]]) -> _Snapshot:
+    digest = hashlib.sha256(json.dumps(cards, sort_keys=True).encode()).hexdigest()
+    snapshot = _history.get(digest)
+    if snapshot is None:
+        generated_at = datetime.now(pytz.timezone('Europe/London')).isoformat(timespec='seconds')
+        snapshot = _Snapshot(digest, generated_at, cards)
+        _history[digest] = snapshot
+        while len(_history) > config.CARD_BUNDLE_HISTORY:
+            _history.popitem(last=False)
+    _history.move_to_end(digest)
+    return snapshot
+
+
+async def current_snapshot() -> _Snapshot:
+    """Return the latest snapshot, rebuilding it from Dancecloud if it's older than CARD_BUNDLE_MAX_AGE_S."""
+    global _current, _current_built_at
+    async with _lock:
+        if _current is not None and time.monotonic() - _current_built_at < config.CARD_BUNDLE_MAX_AGE_S:
+            return _current
+        cards = await fetch_membership_cards()
+        if not cards and _current is not None:
+            # fetch_membership_cards returns [] on any upstream error; don't wipe every card from the
+            # scanners because Dancecloud had a bad moment.
+            log.warning('Dancecloud returned no membership cards; keeping the previous card bundle.')
+        else:
+            _current = _remember(_entries(cards))
+        _current_built_at = time.monotonic()
+        return _current
+
+
+async def bundle(since: Optional[str] = None) -> dict:
+    """The current bundle, as a delta from the ``since`` version when that version is still known."""
+    snapshot = await current_snapshot()
+    payload = {'version': snapshot.digest, 'generated_at': snapshot.generated_at}
+    base = _history.get(since) if since else None
+    if base is None:
+        return {**payload, 'full': True, 'cards': snapshot.cards}
+    return {
+        **payload,
+        'full': False,
+        'upserts': {key: entry for key, entry in snapshot.cards.items() if base.cards.get(key) != entry},
+        'removals': [key for key in base.cards if key not in snapshot.cards],
+    }
+
+
+def expire() -> None:
+    """Make the next request rebuild the snapshot, e.g. after a card has been cancelled or reissued."""
+    global _current_built_at
+    _current_built_at = float('-inf')
+
+
+def reset() -> None:
+    """Forget every snapshot, so the next request rebuilds from Dancecloud."""
+    global _current, _current_built_at
+    _history.clear()
+    _current, _current_built_at = None, float('-inf')
@@ -0,0 +1,138 @@
+"""Pass-through of Dancecloud card-check pages for the door scanner.
+
+The rapid scanner can't fetch Dancecloud directly because of CORS, so each scan goes through
+/proxy-card-check. On a busy door night those arrive in bursts, so this module:
+
+- reuses one keep-alive ``httpx.AsyncClient`` rather than opening a new connection (and TLS handshake)
+  per scan;
+- streams the upstream body to the scanner as it arrives rather than buffering it first;
+- keeps successful responses for CARD_CHECK_CACHE_TTL_S, so a card scanned twice in quick succession
+  (a double tap, or a retry after a slow response) costs one upstream call;
+- records per-request latency for /health/metrics.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+import httpx
+from fastapi.responses import Response, StreamingResponse
+
+from esds_apps import config
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class _CachedCheck:
+    status_code: int
+    media_type: Optional[str]
+    content: bytes
+    expires_at: float  # time.monotonic() deadline
+
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_cache: 'OrderedDict[str, _CachedCheck]' = OrderedDict()
+_latencies_s: deque = deque(maxlen=config.CARD_CHECK_LATENCY_SAMPLES)
+_counts = {'requests': 0, 'cache_hits': 0, 'upstream_errors': 0}
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it on first use (or if the event loop has changed)."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=config.CARD_CHECK_TIMEOUT_S,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client's pooled connections; called on app shutdown."""
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client, _client_loop = None, None
+
+
+def _cached(url: str) -> Optional[_CachedCheck]:
+    entry = _cache.get(url)
+    if entry is None:
+        return None
+    if time.monotonic() >= entry.expires_at:
+        del _cache[url]
+        return None
+    return entry
+
+
+def _store(url: str, entry: _CachedCheck) -> None:
+    _cache[url] = entry
+    _cache.move_to_end(url)
+    while len(_cache) > config.CARD_CHECK_CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+
+
+def clear_cache() -> None:
+    """Forget all cached card checks."""
+    _cache.clear()
+
+
+async def proxy(url: str) -> Response:
+    """Fetch ``url`` from Dancecloud (or the short-lived cache) and stream it back to the scanner."""
+    started_at = time.perf_counter()
+    _counts['requests'] += 1
+
+    entry = _cached(url)
+    if entry is not None:
+        _counts['cache_hits'] += 1
+        _latencies_s.append(time.perf_counter() - started_at)
+        return Response(content=entry.content, status_code=entry.status_code, media_type=entry.media_type)
+
+    client = _get_client()
+    try:
+        upstream = await client.send(client.build_request('GET', url), stream=True)
+    except httpx.HTTPError:
+        _counts['upstream_errors'] += 1
+        raise
+    media_type = upstream.headers.get('content-type')
+
+    async def body() -> AsyncIterator[bytes]:
+        chunks = []
+        try:
+            async for chunk in upstream.aiter_bytes():
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            await upstream.aclose()
+            _latencies_s.append(time.perf_counter() - started_at)
+        if upstream.status_code == httpx.codes.OK:
+            expires_at = time.monotonic() + config.CARD_CHECK_CACHE_TTL_S
+            _store(url, _CachedCheck(upstream.status_code, media_type, b''.join(chunks), expires_at))
+
+    return StreamingResponse(body(), status_code=upstream.status_code, media_type=media_type)
+
+
+def metrics() -> dict:
+    """Request counts and recent latency percentiles (in ms) for the /health/metrics route."""
+    samples = sorted(_latencies_s)
+
+    def percentile_ms(q: float) -> Optional[float]:
+        # nearest-rank percentile over the most recent samples
+        return round(1000 * samples[min(len(samples) - 1, int(q * len(samples)))], 3) if samples else None
+
+    return {
+        **_counts,
+        'cached_urls': len(_cache),
+        'latency_samples': len(samples),
+        'p50_ms': percentile_ms(0.5),
+        'p95_ms': percentile_ms(0.95),
+        'max_ms': percentile_ms(1.0),
+    }
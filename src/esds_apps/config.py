@@ -7,6 +7,13 @@ from fastapi.templating import Jinja2Templates
 
 LOGGING_LEVEL = logging.DEBUG
 
+# Number of uvicorn worker processes started by `python -m esds_apps.serve`. Defaults to the cores this
+# process may run on (which respects container CPU pinning), overridable with WEB_CONCURRENCY.
+_AVAILABLE_CORES = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+WORKERS = int(os.environ.get('WEB_CONCURRENCY', _AVAILABLE_CORES))
+# How often a standby worker checks whether it should take over the background pollers (see leader.py).
+LEADER_RETRY_INTERVAL_S = 30
+
 CACHE_ROOT = '/tmp/esds_cache'
 BASE_URL = 'https://apps.esds.org.uk'
 QR_DB_PATH = CACHE_ROOT + '/qr_codes.db'
@@ -36,6 +43,12 @@ IS_CARD_DISTRIBUTION_ENABLED = True
 CARD_DISTRIBUTION_EMAIL_BATCH_SIZE = 20
 AUTH_COOKIE_NAME = 'session'
 AUTH_COOKIE_TIMEOUT_SECONDS = 24 * 60 * 60
+# How long a Google group-membership answer is trusted before asking the Admin SDK again. Negative
+# answers expire sooner, so someone just added to the group isn't locked out for long.
+GROUP_MEMBERSHIP_CACHE_TIMEOUT_S = 5 * 60
+GROUP_NON_MEMBERSHIP_CACHE_TIMEOUT_S = 60
+# At most this many emails' answers are kept; the least recently used go first.
+GROUP_MEMBERSHIP_CACHE_MAX_ENTRIES = 256
 
 PUBLIC_DIR = directory = Path(__file__).resolve().parent.parent.parent / 'public'
 TEMPLATES = Jinja2Templates(directory=Path(__file__).resolve().parent.parent.parent / 'templates')
@@ -94,6 +107,17 @@ DC_GET_HEADERS = {'Authorization': f'Bearer {SECRETS["DC_API_TOKEN"]}', 'Accept'
 DC_PATCH_HEADERS = {**DC_GET_HEADERS, 'Content-Type': 'application/vnd.api+json'}
 DC_POST_HEADERS = {**DC_GET_HEADERS, 'Content-Type': 'application/json'}
 
+# The door scanner's /proxy-card-check (see card_check_proxy.py): repeat scans of the same card within
+# CARD_CHECK_CACHE_TTL_S are answered from memory rather than asking Dancecloud again.
+CARD_CHECK_CACHE_TTL_S = 10
+CARD_CHECK_CACHE_MAX_ENTRIES = 512
+CARD_CHECK_TIMEOUT_S = 10
+CARD_CHECK_LATENCY_SAMPLES = 500
+# The scanner's offline bundle of valid cards (see card_bundle.py) is rebuilt from Dancecloud at most this
+# often; scanners poll for deltas against one of the last CARD_BUNDLE_HISTORY versions.
+CARD_BUNDLE_MAX_AGE_S = 5 * 60
+CARD_BUNDLE_HISTORY = 24
+
 MAIL_NO_HTML_FALLBACK_MESSAGE = """
 Welcome to Edinburgh Swing Dance Society!
 This email contains your digital membership card.
@@ -112,4 +136,43 @@ PASS2U_MODEL_ID = 311534
 PASS2U_API_PATH = 'v2'
 PASS2U_HOST = 'https://api.pass2u.net'
 
+# How many distinct /attendance JSON responses of each dataset (e.g. the latest activity_records downloads)
+# attendance/result_cache.py keeps per worker for the current version of the attendance DB. Bounded per dataset,
+# so a client walking through activity ids can't evict the charts' datasets.
+ATTENDANCE_RESULT_CACHE_SIZE = 64
+
+# Cached /attendance responses at least this big are also kept gzipped, for clients that accept gzip.
+ATTENDANCE_GZIP_MIN_BYTES = 1024
+
+# The most activities one streamed /attendance records export may ask for (a whole event is a few dozen).
+ATTENDANCE_RECORDS_EXPORT_MAX_ACTIVITIES = 200
+
+# How many distinct what-if results forecast.predict keeps in memory, so repeat scenarios return at once.
+FORECAST_RESULT_CACHE_SIZE = 128
+# How many derived quantities (Level 1 predictions, loyalty refunds, ...) each forecast context memoises.
+FORECAST_CONTEXT_MEMO_SIZE = 64
+# The most scenarios one /forecast/compare.json request may evaluate.
+FORECAST_COMPARE_MAX_SCENARIOS = 200
+# The forecast's Monte Carlo engine draws FORECAST_MC_REPLICATES scrambled Sobol sequences, FORECAST_MC_MIN_SAMPLES
+# points in all at first and doubling, until the standard errors of the year net's mean and band ends are
+# within FORECAST_MC_TARGET_SE pounds or FORECAST_MC_MAX_SAMPLES points have been drawn.
+FORECAST_MC_REPLICATES = 8
+FORECAST_MC_MIN_SAMPLES = 1024
+FORECAST_MC_MAX_SAMPLES = 16384
+FORECAST_MC_TARGET_SE = 25
+FORECAST_MC_HISTOGRAM_BINS = 40
+# /forecast/solve.json (the goal seek) varies at most FORECAST_SOLVE_MAX_FREE parameters, draws its trade-off
+# curve at FORECAST_SOLVE_CURVE_STEPS points, and keeps the last FORECAST_SOLVE_CACHE_SIZE results.
+FORECAST_SOLVE_MAX_FREE = 3
+FORECAST_SOLVE_CURVE_STEPS = 11
+FORECAST_SOLVE_CACHE_SIZE = 32
+
 FOREVER_CACHE_TIMEOUT_S = 9999 * 365.25 * 24 * 60 * 60
+
+# Worker pools for blocking work called from async routes (see executors.py). Once max_workers + max_queued
+# calls are in flight, further calls get a 503 with a Retry-After of retry_after_s.
+EXECUTOR_POOLS = {
+    'forecast': {'max_workers': 2, 'max_queued': 8, 'retry_after_s': 5},
+    'attendance': {'max_workers': 4, 'max_queued': 16, 'retry_after_s': 2},
+    'render': {'max_workers': 2, 'max_queued': 16, 'retry_after_s': 2},
+}
@@ -0,0 +1,149 @@
+"""Bounded worker pools for blocking work done on behalf of async route handlers.
+
+Every handler in main.py is ``async def``, so anything that blocks (the forecast, pandas over the
+attendance database, rasterising card fronts and QR codes) would otherwise run on the event loop and
+stall every other request — including the public QR redirects and the door scanner proxy — until it
+finished. Such calls go through ``await POOL.run(fn, *args)`` instead.
+
+Each pool is a small thread pool with a bounded backlog. Once ``max_workers + max_queued`` calls are in
+flight, further calls are rejected straight away with ExecutorOverloaded (served as a 503 with
+Retry-After) rather than piling up behind work the client may have given up on. Threads rather than
+processes because the heavy work is numpy/pandas/SQLite (which release the GIL for the expensive parts)
+and because the forecast context is a large per-process cache that a process pool would have to rebuild
+in every child.
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from esds_apps import config
+
+log = logging.getLogger(__name__)
+
+
+class ExecutorOverloaded(Exception):
+    """Raised when a pool's backlog is full and a call is rejected rather than queued."""
+
+    def __init__(self, pool: str, retry_after_s: int):
+        super().__init__(f'The {pool} pool is at capacity, please retry in {retry_after_s}s.')
+        self.pool = pool
+        self.retry_after_s = retry_after_s
+
+
+@dataclass
+class _PoolCounters:
+    submitted: int = 0
+    rejected: int = 0
+    completed: int = 0
+    failed: int = 0
+    in_flight: int = 0
+    running: int = 0
+    total_wait_s: float = 0.0
+    max_wait_s: float = 0.0
+    total_run_s: float = 0.0
+
+
+class BoundedPool:
+    """A thread pool that rejects work once ``max_workers + max_queued`` calls are in flight."""
+
+    def __init__(self, name: str, max_workers: int, max_queued: int, retry_after_s: int = 5):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.retry_after_s = retry_after_s
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f'esds-{name}')
+        self._lock = threading.Lock()
+        self._counters = _PoolCounters()
+
+        assert max_workers >= 1 and max_queued >= 0
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn(*args, **kwargs)`` on the pool and await its result.
+
+        Context variables are copied across, so anything the caller set (e.g. request-scoped state)
+        is visible to ``fn``. Raises ExecutorOverloaded without running ``fn`` if the pool is full.
+        """
+        with self._lock:
+            if self._counters.in_flight >= self.max_workers + self.max_queued:
+                self._counters.rejected += 1
+                log.warning(f'{self.name} pool is full ({self._counters.in_flight} in flight), rejecting call')
+                raise ExecutorOverloaded(self.name, self.retry_after_s)
+            self._counters.in_flight += 1
+            self._counters.submitted += 1
+
+        ctx = contextvars.copy_context()
+        enqueued_at = time.perf_counter()
+
+        def call() -> Any:
+            started_at = time.perf_counter()
+            with self._lock:
+                wait_s = started_at - enqueued_at
+                self._counters.running += 1
+                self._counters.total_wait_s += wait_s
+                self._counters.max_wait_s = max(self._counters.max_wait_s, wait_s)
+            try:
+                return ctx.run(fn, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self._counters.running -= 1
+                    self._counters.total_run_s += time.perf_counter() - started_at
+
+        # Count completion from the worker's future rather than from this coroutine: if the client
+        # disconnects and the await is cancelled, the call keeps its slot until the thread is free.
+        future = self._executor.submit(call)
+        future.add_done_callback(self._on_done)
+        return await asyncio.wrap_future(future)
+
+    def _on_done(self, future: Future) -> None:
+        with self._lock:
+            self._counters.in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                self._counters.failed += 1
+            else:
+                self._counters.completed += 1
+
+    def metrics(self) -> dict:
+        """Return a snapshot of this pool's load and history, for the /health/metrics route."""
+        with self._lock:
+            c = self._counters
+            started = c.completed + c.failed + c.running
+            return {
+                'max_workers': self.max_workers,
+                'max_queued': self.max_queued,
+                'in_flight': c.in_flight,
+                'running': c.running,
+                'queued': c.in_flight - c.running,
+                'submitted': c.submitted,
+                'rejected': c.rejected,
+                'completed': c.completed,
+                'failed': c.failed,
+                'mean_wait_ms': round(1000 * c.total_wait_s / started, 3) if started else 0.0,
+                'max_wait_ms': round(1000 * c.max_wait_s, 3),
+                'mean_run_ms': round(1000 * c.total_run_s / (c.completed + c.failed), 3)
+                if c.completed + c.failed
+                else 0.0,
+            }
+
+
+def _make_pool(name: str) -> BoundedPool:
+    return BoundedPool(name, **config.EXECUTOR_POOLS[name])
+
+
+# The forecast gets its own pool so a burst of what-if requests can't starve the attendance pages,
+# and rendering gets its own so card fronts keep flowing while either of those is busy.
+FORECAST_POOL = _make_pool('forecast')
+ATTENDANCE_POOL = _make_pool('attendance')
+RENDER_POOL = _make_pool('render')
+
+POOLS = {pool.name: pool for pool in (FORECAST_POOL, ATTENDANCE_POOL, RENDER_POOL)}
+
+
+def metrics() -> dict:
+    """Return the metrics of every pool, keyed by pool name."""
+    return {name: pool.metrics() for name, pool in POOLS.items()}
@@ -10,7 +10,9 @@ two halves:
   Level 2 loyalty survival curve. Only SELECTs run, and only counts and dates are read — never PII.
 * **A per-request forecast** (``predict``) that takes the committee's parameter overrides, rebuilds
   the calendar and the money ledger, and propagates the attendance uncertainty through it with the
-  **unscented transform** (the sigma-point method — cheap enough for live use, unlike Monte Carlo).
+  **unscented transform** (the sigma-point method, cheap enough to rerun on every edit). On request it
+  samples instead, with quasi-Monte Carlo over the vectorised ledger, for percentile bands that follow
+  the ledger's floors and caps (see ``ENGINES``).
 
 The sensitive financial defaults (prices, pay rates, the opening bank balance, the fitted band fee and
 membership figures) are **not** committed: they load from a key,value CSV under ``working/`` — see
@@ -21,9 +23,14 @@ provenance note in the UI (see the frontend's control metadata). The scenario *d
 
 import csv
 import datetime
+import functools
+import hashlib
 import io
-import sqlite3
+import json
+import logging
 import threading
+import uuid
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import date, timedelta
 from pathlib import Path
@@ -31,10 +38,15 @@ from pathlib import Path
 import numpy as np
 import openpyxl
 from dateutil.easter import easter
-from scipy import stats
+from scipy import optimize, stats
 from scipy.optimize import curve_fit
+from scipy.stats import qmc
 
 from esds_apps import config
+from esds_apps.attendance.attendance_db import db_fingerprint, read_connection
+from esds_apps.timing import span
+
+log = logging.getLogger(__name__)
 
 MON, THU, FRI, SUN = 0, 3, 4, 6
 TERM_MIN_WEEKS, TERM_MAX_WEEKS = 5, 7
@@ -51,6 +63,7 @@ _MIN_L2_NIGHT = 15  # ... as are terms whose mean per-night reads implausibly lo
 _MIN_SOCIAL_TOTAL = 10  # socials below this headcount are booking exports, not real turnout
 _SURVIVAL_EPS = 1e-4  # stop summing the loyalty survival tail once it falls below this
 _MAX_SURVIVAL_NIGHTS = 1000  # ... or this many nights, whichever comes first
+_MC_SEED = 0  # seeds the Monte Carlo engine's Sobol scrambles, so a scenario's samples never change
 
 # The uncertain inputs propagated through the ledger, in vector order. The first six are the Level 1
 # term sign-ups (correlated, carrying the regression covariance); the rest are independent.
@@ -221,8 +234,12 @@ def _best_split(n_weeks: int) -> list[int]:
     return opts[0]
 
 
+@functools.lru_cache(maxsize=16)
 def build_calendar(ay: int) -> dict:
-    """Derive the six-term teaching calendar and the fixed party dates for academic year ``ay``."""
+    """Derive the six-term teaching calendar and the fixed party dates for academic year ``ay``.
+
+    Memoised per year: the result is shared between callers and must not be modified.
+    """
     term1_first = _nth_weekday(ay, 9, THU, 2)
     xmas = date(ay, 12, 25)
     xmas_party = _week_monday(xmas) - timedelta(days=7) + timedelta(days=THU)
@@ -250,6 +267,11 @@ def build_calendar(ay: int) -> dict:
     return {'ay': ay, 'terms': terms, 'xmas_party': xmas_party, 'eoy_party': eoy_party, 'first_class': term1_first}
 
 
+@functools.lru_cache(maxsize=64)
+def _socials_for(ay: int, n_tea: int, have_weekender: bool) -> tuple[tuple[str, date], ...]:
+    return tuple(place_socials(build_calendar(ay), n_tea, have_weekender))
+
+
 def place_socials(cal: dict, n_tea: int, have_weekender: bool) -> list[tuple[str, date]]:
     """Evenly space the tea dances (+ optional weekender) around the two fixed parties."""
     start, xmas, eoy = cal['first_class'], cal['xmas_party'], cal['eoy_party']
@@ -332,10 +354,21 @@ class ForecastContext:
     survival_l2: dict  # empirical + fitted curve, for the detailed chart
     # sensitive financial defaults (from the spreadsheet)
     defaults: dict = field(default_factory=dict)
+    # identifies this build in result-cache keys, so a rebuilt context never serves a stale forecast
+    version: str = field(default_factory=lambda: uuid.uuid4().hex)
+    # the _source_fingerprint() of the DB + defaults this was built from (None if never recorded)
+    fingerprint: tuple | None = field(default=None, compare=False)
+    # per-context memo of derived quantities that depend only on the context and a few parameters (see _memoised)
+    memo: OrderedDict = field(default_factory=OrderedDict, repr=False, compare=False)
 
 
 _CONTEXT: ForecastContext | None = None
 _LOCK = threading.Lock()
+_REBUILD: threading.Thread | None = None  # the background rebuild in progress, if any
+_FAILED_FINGERPRINT: tuple | None = None  # sources whose last rebuild failed; not retried until they change
+# The most recent (merged parameters, forecast result) pairs, keyed by _scenario_key (see predict)
+_RESULTS: 'OrderedDict[str, tuple[dict, dict]]' = OrderedDict()
+_RESULTS_LOCK = threading.Lock()
 
 
 def _coerce(s: str):
@@ -381,202 +414,206 @@ def _build_context() -> ForecastContext:  # noqa: PLR0915  (a single sweep of th
     if not db.exists():
         raise FileNotFoundError(db)
 
-    with sqlite3.connect(f'file:{db}?mode=ro', uri=True) as conn:
-        # ---- Level 1 terms: interest (= reg + waitlist) and the weekly attendance series ----
-        l1_rows = []
+    conn = read_connection(db)
+    # ---- Level 1 terms: interest (= reg + waitlist) and the weekly attendance series ----
+    # One grouped query per quantity across every course, rather than three queries per term.
+    registered = dict(
+        conn.execute(
+            'SELECT a.event_id, COUNT(DISTINCT at.dancer_id) FROM attendance at JOIN activity a USING(activity_id) '
+            "JOIN event e USING(event_id) WHERE e.event_type='course' GROUP BY a.event_id"
+        )
+    )
+    waitlisted = dict(conn.execute('SELECT event_id, SUM(head_count) FROM waitlist GROUP BY event_id'))
+    weekly_by_event: dict[int, list] = {}
+    for eid, total in conn.execute(
+        'SELECT a.event_id, aa.total FROM activity a JOIN activity_attendance aa USING(activity_id) '
+        "WHERE aa.event_type='course' AND a.difficulty='Level 1' ORDER BY a.event_id, a.date, a.activity_id"
+    ):
+        weekly_by_event.setdefault(eid, []).append(total)
+    l1_rows = [
+        {
+            'ay': _ay_of(start),
+            'weeks': weeks,
+            'interest': registered.get(eid, 0) + (waitlisted.get(eid) or 0),
+            'weekly': weekly_by_event.get(eid, []),
+        }
         for eid, start, weeks in conn.execute(
             'SELECT e.event_id, MIN(a.date), COUNT(DISTINCT a.date) FROM event e JOIN activity a USING(event_id) '
             "WHERE e.event_type='course' AND a.difficulty='Level 1' GROUP BY e.event_id "
             'HAVING COUNT(DISTINCT a.date) >= 3 ORDER BY MIN(a.date)'
-        ):
-            reg = conn.execute(
-                'SELECT COUNT(DISTINCT at.dancer_id) FROM attendance at JOIN activity a USING(activity_id) '
-                'WHERE a.event_id = ?',
-                (eid,),
-            ).fetchone()[0]
-            wl = conn.execute(
-                'SELECT COALESCE(SUM(head_count), 0) FROM waitlist WHERE event_id = ?', (eid,)
-            ).fetchone()[0]
-            weekly = [
-                t
-                for (t,) in conn.execute(
-                    'SELECT aa.total FROM activity a JOIN activity_attendance aa USING(activity_id) '
-                    "WHERE a.event_id = ? AND a.difficulty='Level 1' ORDER BY a.date",
-                    (eid,),
-                )
-            ]
-            l1_rows.append({'ay': _ay_of(start), 'weeks': weeks, 'interest': reg + wl, 'weekly': weekly})
-        # position of each term within its academic year
-        seen: dict[int, int] = {}
-        for r in l1_rows:
-            seen[r['ay']] = seen.get(r['ay'], 0) + 1
-            r['pos'] = seen[r['ay']]
-
-        # ---- Level 1 sign-ups OLS: interest ~ year + C(term position) over the full six-term years ----
-        d = [r for r in l1_rows if r['ay'] >= _FIRST_FULL_YEAR]
-        x = np.column_stack(
-            [
-                np.ones(len(d)),
-                np.array([r['ay'] for r in d]) - 2024,
-                *[np.array([1.0 if r['pos'] == p else 0.0 for r in d]) for p in range(2, 7)],
-            ]
         )
-        y = np.array([r['interest'] for r in d], float)
-        beta, *_ = np.linalg.lstsq(x, y, rcond=None)
-        resid = y - x @ beta
-        dof = len(y) - x.shape[1]
-        s2 = float(resid @ resid / dof)
-        xtxi = np.linalg.inv(x.T @ x)
-
-        # ---- Level 1 weekly attendance as a fraction of sign-ups (curve for the per-night what-if) ----
-        fracs = [
-            [h / r['interest'] for h in r['weekly']]
-            for r in l1_rows
-            if len(r['weekly']) >= _MIN_WEEKS_FOR_CURVE
-            and r['weekly']
-            and r['weekly'][0] >= _MIN_WK1_HEADCOUNT
-            and r['interest']
-        ]
-        max_wk = max(len(a) for a in fracs)
-        l1_attend_curve = [float(np.mean([a[w] for a in fracs if len(a) > w])) for w in range(max_wk)]
-
-        # ---- Level 2 per-night turnout (complete recent terms only) ----
-        l2_vals = [
-            mt
-            for (start, nights, mt) in conn.execute(
-                'SELECT MIN(a.date), COUNT(DISTINCT a.date), AVG(aa.total) FROM event e '
-                'JOIN activity a USING(event_id) JOIN activity_attendance aa USING(activity_id) '
-                "WHERE e.event_type='course' AND a.difficulty='Level 2' GROUP BY e.event_id"
-            )
-            if _ay_of(start) >= _FIRST_COMPLETE_L2_YEAR and mt and mt > _MIN_L2_NIGHT
+    ]
+    # position of each term within its academic year
+    seen: dict[int, int] = {}
+    for r in l1_rows:
+        seen[r['ay']] = seen.get(r['ay'], 0) + 1
+        r['pos'] = seen[r['ay']]
+
+    # ---- Level 1 sign-ups OLS: interest ~ year + C(term position) over the full six-term years ----
+    d = [r for r in l1_rows if r['ay'] >= _FIRST_FULL_YEAR]
+    x = np.column_stack(
+        [
+            np.ones(len(d)),
+            np.array([r['ay'] for r in d]) - 2024,
+            *[np.array([1.0 if r['pos'] == p else 0.0 for r in d]) for p in range(2, 7)],
         ]
+    )
+    y = np.array([r['interest'] for r in d], float)
+    beta, *_ = np.linalg.lstsq(x, y, rcond=None)
+    resid = y - x @ beta
+    dof = len(y) - x.shape[1]
+    s2 = float(resid @ resid / dof)
+    xtxi = np.linalg.inv(x.T @ x)
+
+    # ---- Level 1 weekly attendance as a fraction of sign-ups (curve for the per-night what-if) ----
+    fracs = [
+        [h / r['interest'] for h in r['weekly']]
+        for r in l1_rows
+        if len(r['weekly']) >= _MIN_WEEKS_FOR_CURVE
+        and r['weekly']
+        and r['weekly'][0] >= _MIN_WK1_HEADCOUNT
+        and r['interest']
+    ]
+    max_wk = max(len(a) for a in fracs)
+    l1_attend_curve = [float(np.mean([a[w] for a in fracs if len(a) > w])) for w in range(max_wk)]
+
+    # ---- Level 2 per-night turnout (complete recent terms only) ----
+    l2_vals = [
+        mt
+        for (start, nights, mt) in conn.execute(
+            'SELECT MIN(a.date), COUNT(DISTINCT a.date), AVG(aa.total) FROM event e '
+            'JOIN activity a USING(event_id) JOIN activity_attendance aa USING(activity_id) '
+            "WHERE e.event_type='course' AND a.difficulty='Level 2' GROUP BY e.event_id"
+        )
+        if _ay_of(start) >= _FIRST_COMPLETE_L2_YEAR and mt and mt > _MIN_L2_NIGHT
+    ]
 
-        # ---- Standalone socials: regular vs Christmas, workshop-paired dropped; the 30th never enters ----
-        workshop_dates = {
-            dd
-            for (dd,) in conn.execute(
-                "SELECT DISTINCT a.date FROM event e JOIN activity a USING(event_id) WHERE e.event_type='workshop'"
-            )
-        }
-        soc_vals, xmas_vals = [], []
-        for name, dd, tot in conn.execute(
-            'SELECT e.name, MIN(a.date), SUM(aa.total) FROM event e JOIN activity a USING(event_id) '
-            "JOIN activity_attendance aa USING(activity_id) WHERE e.event_type='social' "
-            "AND e.name NOT LIKE '%30 Years%' GROUP BY e.event_id"
-        ):
-            if tot is None or tot <= _MIN_SOCIAL_TOTAL:
-                continue
-            if 'Christmas' in name or 'Xmas' in name:
-                xmas_vals.append(tot)
-            elif dd not in workshop_dates:
-                soc_vals.append(tot)
-        social_only_vals = [
-            n / k
-            for n, k in conn.execute(
-                'SELECT SUM(aa.total), COUNT(DISTINCT a.date) FROM event e JOIN activity a USING(event_id) '
-                "JOIN activity_attendance aa USING(activity_id) WHERE e.event_type='course' "
-                "AND a.activity_type='social' AND a.date >= '2026-01-01' GROUP BY e.event_id"
-            )
-        ]
+    # ---- Standalone socials: regular vs Christmas, workshop-paired dropped; the 30th never enters ----
+    workshop_dates = {
+        dd
+        for (dd,) in conn.execute(
+            "SELECT DISTINCT a.date FROM event e JOIN activity a USING(event_id) WHERE e.event_type='workshop'"
+        )
+    }
+    soc_vals, xmas_vals = [], []
+    for name, dd, tot in conn.execute(
+        'SELECT e.name, MIN(a.date), SUM(aa.total) FROM event e JOIN activity a USING(event_id) '
+        "JOIN activity_attendance aa USING(activity_id) WHERE e.event_type='social' "
+        "AND e.name NOT LIKE '%30 Years%' GROUP BY e.event_id"
+    ):
+        if tot is None or tot <= _MIN_SOCIAL_TOTAL:
+            continue
+        if 'Christmas' in name or 'Xmas' in name:
+            xmas_vals.append(tot)
+        elif dd not in workshop_dates:
+            soc_vals.append(tot)
+    social_only_vals = [
+        n / k
+        for n, k in conn.execute(
+            'SELECT SUM(aa.total), COUNT(DISTINCT a.date) FROM event e JOIN activity a USING(event_id) '
+            "JOIN activity_attendance aa USING(activity_id) WHERE e.event_type='course' "
+            "AND a.activity_type='social' AND a.date >= '2026-01-01' GROUP BY e.event_id"
+        )
+    ]
 
-        def disc_named(where):
-            r = dict(
-                conn.execute(
-                    "SELECT CASE WHEN at.ticket_type='ordinary' THEN 'ord' ELSE 'disc' END, COUNT(*) "
-                    'FROM attendance at JOIN activity a USING(activity_id) JOIN event e USING(event_id) '
-                    f"WHERE {where} AND at.ticket_type IN ('ordinary','member','concession','member_or_concession') "
-                    'GROUP BY 1'
-                ).fetchall()
-            )
-            n = r.get('disc', 0) + r.get('ord', 0)
-            return r.get('disc', 0) / n, n
-
-        def disc_agg(where):
-            r = dict(
-                conn.execute(
-                    "SELECT CASE WHEN ticket_type='ordinary' THEN 'ord' ELSE 'disc' END, SUM(head_count) "
-                    'FROM attendance_count ac JOIN activity a USING(activity_id) JOIN event e USING(event_id) '
-                    f"WHERE {where} AND ticket_type IN ('ordinary','member','concession','member_or_concession') "
-                    'GROUP BY 1'
-                ).fetchall()
-            )
-            n = r.get('disc', 0) + r.get('ord', 0)
-            return r.get('disc', 0) / n, n
-
-        f_l1, n_l1 = disc_named("a.difficulty='Level 1' AND e.event_type='course'")
-        f_l2, n_l2 = disc_agg("a.difficulty='Level 2' AND e.event_type='course'")
-        f_soc, n_soc = disc_named("e.event_type='social' AND e.name NOT LIKE '%30 Years%'")
-        f_wk, n_wk = disc_named("e.event_type='weekender'")
-
-        # ---- Recurring weekender audience: the biggest past weekender's retained crowd + its ticket mix ----
-        wk_eid, wk_name, wk_last = conn.execute(
-            'SELECT e.event_id, e.name, MAX(a.date) FROM event e JOIN activity a USING(event_id) '
-            "JOIN attendance at ON at.activity_id = a.activity_id AND at.status IN ('attended','unknown') "
-            "WHERE e.event_type='weekender' GROUP BY e.event_id ORDER BY COUNT(DISTINCT at.dancer_id) DESC LIMIT 1"
-        ).fetchone()
-        att_ref = {
-            r[0]
-            for r in conn.execute(
-                'SELECT DISTINCT at.dancer_id FROM attendance at JOIN activity a USING(activity_id) '
-                "WHERE a.event_id = ? AND at.status IN ('attended','unknown')",
-                (wk_eid,),
-            )
-        }
-        after = {
-            r[0]
-            for r in conn.execute(
-                'SELECT DISTINCT at.dancer_id FROM attendance at JOIN activity a USING(activity_id) '
-                "WHERE a.date > ? AND at.status='attended'",
-                (wk_last,),
-            )
-        }
-        # Classify each reference-weekender attendee by how many lessons vs socials they went to, so we
-        # can separate the four ticket kinds: full pass (lessons on 2+ days), day pass (one day of
-        # lessons), social pass (socials only, no lessons), and a single-social walk-in.
-        mix_rows = conn.execute(
-            "SELECT SUM(CASE WHEN a.activity_type='lesson' THEN 1 ELSE 0 END), "
-            "SUM(CASE WHEN a.activity_type='social' THEN 1 ELSE 0 END) "
-            'FROM attendance at JOIN activity a USING(activity_id) '
-            "WHERE a.event_id = ? AND at.status IN ('attended','unknown') GROUP BY at.dancer_id",
+    def disc_named(where):
+        r = dict(
+            conn.execute(
+                "SELECT CASE WHEN at.ticket_type='ordinary' THEN 'ord' ELSE 'disc' END, COUNT(*) "
+                'FROM attendance at JOIN activity a USING(activity_id) JOIN event e USING(event_id) '
+                f"WHERE {where} AND at.ticket_type IN ('ordinary','member','concession','member_or_concession') "
+                'GROUP BY 1'
+            ).fetchall()
+        )
+        n = r.get('disc', 0) + r.get('ord', 0)
+        return r.get('disc', 0) / n, n
+
+    def disc_agg(where):
+        r = dict(
+            conn.execute(
+                "SELECT CASE WHEN ticket_type='ordinary' THEN 'ord' ELSE 'disc' END, SUM(head_count) "
+                'FROM attendance_count ac JOIN activity a USING(activity_id) JOIN event e USING(event_id) '
+                f"WHERE {where} AND ticket_type IN ('ordinary','member','concession','member_or_concession') "
+                'GROUP BY 1'
+            ).fetchall()
+        )
+        n = r.get('disc', 0) + r.get('ord', 0)
+        return r.get('disc', 0) / n, n
+
+    f_l1, n_l1 = disc_named("a.difficulty='Level 1' AND e.event_type='course'")
+    f_l2, n_l2 = disc_agg("a.difficulty='Level 2' AND e.event_type='course'")
+    f_soc, n_soc = disc_named("e.event_type='social' AND e.name NOT LIKE '%30 Years%'")
+    f_wk, n_wk = disc_named("e.event_type='weekender'")
+
+    # ---- Recurring weekender audience: the biggest past weekender's retained crowd + its ticket mix ----
+    wk_eid, wk_name, wk_last = conn.execute(
+        'SELECT e.event_id, e.name, MAX(a.date) FROM event e JOIN activity a USING(event_id) '
+        "JOIN attendance at ON at.activity_id = a.activity_id AND at.status IN ('attended','unknown') "
+        "WHERE e.event_type='weekender' GROUP BY e.event_id ORDER BY COUNT(DISTINCT at.dancer_id) DESC LIMIT 1"
+    ).fetchone()
+    att_ref = {
+        r[0]
+        for r in conn.execute(
+            'SELECT DISTINCT at.dancer_id FROM attendance at JOIN activity a USING(activity_id) '
+            "WHERE a.event_id = ? AND at.status IN ('attended','unknown')",
             (wk_eid,),
-        ).fetchall()
-        tot = len(mix_rows)
-        rr = len(att_ref & after)
-        scale = rr / tot if tot else 0.0
-        n_full = sum(1 for les, _soc in mix_rows if les >= 2)  # noqa: PLR2004
-        n_partial = sum(1 for les, _soc in mix_rows if les == 1)
-        n_social = sum(1 for les, soc in mix_rows if les == 0 and soc >= 2)  # noqa: PLR2004
-        n_single = sum(1 for les, soc in mix_rows if les == 0 and soc == 1)
-        wk_mix = {
-            'reference': wk_name,
-            'attendees_ref': tot,
-            'retained': rr,
-            'full': round(scale * n_full),
-            'partial': round(scale * n_partial),
-            'social': round(scale * n_social),
-            'single': round(scale * n_single),
-        }
+        )
+    }
+    after = {
+        r[0]
+        for r in conn.execute(
+            'SELECT DISTINCT at.dancer_id FROM attendance at JOIN activity a USING(activity_id) '
+            "WHERE a.date > ? AND at.status='attended'",
+            (wk_last,),
+        )
+    }
+    # Classify each reference-weekender attendee by how many lessons vs socials they went to, so we
+    # can separate the four ticket kinds: full pass (lessons on 2+ days), day pass (one day of
+    # lessons), social pass (socials only, no lessons), and a single-social walk-in.
+    mix_rows = conn.execute(
+        "SELECT SUM(CASE WHEN a.activity_type='lesson' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN a.activity_type='social' THEN 1 ELSE 0 END) "
+        'FROM attendance at JOIN activity a USING(activity_id) '
+        "WHERE a.event_id = ? AND at.status IN ('attended','unknown') GROUP BY at.dancer_id",
+        (wk_eid,),
+    ).fetchall()
+    tot = len(mix_rows)
+    rr = len(att_ref & after)
+    scale = rr / tot if tot else 0.0
+    n_full = sum(1 for les, _soc in mix_rows if les >= 2)  # noqa: PLR2004
+    n_partial = sum(1 for les, _soc in mix_rows if les == 1)
+    n_social = sum(1 for les, soc in mix_rows if les == 0 and soc >= 2)  # noqa: PLR2004
+    n_single = sum(1 for les, soc in mix_rows if les == 0 and soc == 1)
+    wk_mix = {
+        'reference': wk_name,
+        'attendees_ref': tot,
+        'retained': rr,
+        'full': round(scale * n_full),
+        'partial': round(scale * n_partial),
+        'social': round(scale * n_social),
+        'single': round(scale * n_single),
+    }
 
-        # ---- Level 2 loyalty survival: family chosen on the smooth all-activity curve, refit to L2 ----
-        all_nights = [
-            n
-            for (n,) in conn.execute(
-                'SELECT COUNT(DISTINCT a.date) FROM attendance at JOIN activity a USING(activity_id) '
-                "WHERE at.status='attended' AND a.date >= '2026-01-01' GROUP BY at.dancer_id"
-            )
-        ]
-        l2_nights = [
-            n
-            for (n,) in conn.execute(
-                'SELECT COUNT(DISTINCT a.date) FROM attendance at JOIN activity a USING(activity_id) '
-                "JOIN event e USING(event_id) WHERE a.difficulty='Level 2' AND e.event_type='course' "
-                "AND at.status='attended' AND a.date >= '2026-01-01' GROUP BY at.dancer_id"
-            )
-        ]
-        obs_thu = conn.execute(
-            'SELECT COUNT(DISTINCT a.date) FROM activity a JOIN event e USING(event_id) '
-            "WHERE a.difficulty='Level 2' AND e.event_type='course' AND a.date >= '2026-01-01'"
-        ).fetchone()[0]
+    # ---- Level 2 loyalty survival: family chosen on the smooth all-activity curve, refit to L2 ----
+    all_nights = [
+        n
+        for (n,) in conn.execute(
+            'SELECT COUNT(DISTINCT a.date) FROM attendance at JOIN activity a USING(activity_id) '
+            "WHERE at.status='attended' AND a.date >= '2026-01-01' GROUP BY at.dancer_id"
+        )
+    ]
+    l2_nights = [
+        n
+        for (n,) in conn.execute(
+            'SELECT COUNT(DISTINCT a.date) FROM attendance at JOIN activity a USING(activity_id) '
+            "JOIN event e USING(event_id) WHERE a.difficulty='Level 2' AND e.event_type='course' "
+            "AND at.status='attended' AND a.date >= '2026-01-01' GROUP BY at.dancer_id"
+        )
+    ]
+    obs_thu = conn.execute(
+        'SELECT COUNT(DISTINCT a.date) FROM activity a JOIN event e USING(event_id) '
+        "WHERE a.difficulty='Level 2' AND e.event_type='course' AND a.date >= '2026-01-01'"
+    ).fetchone()[0]
 
     ks_all, s_all = _survival(all_nights)
     best = max(_FAMILIES, key=lambda nm: _fit_family(nm, ks_all, s_all)[1])
@@ -618,13 +655,68 @@ def _build_context() -> ForecastContext:  # noqa: PLR0915  (a single sweep of th
     )
 
 
+def _source_fingerprint() -> tuple:
+    """Changes whenever the attendance DB or the defaults CSV is written or replaced (see db_fingerprint)."""
+    defaults = Path(config.FORECAST_DEFAULTS_PATH)
+    try:
+        st = defaults.stat()
+        defaults_stat = (st.st_size, st.st_mtime_ns, st.st_ino)
+    except FileNotFoundError:
+        defaults_stat = None
+    return db_fingerprint(config.ATTENDANCE_DB_PATH), defaults_stat
+
+
+def _build_fingerprinted() -> ForecastContext:
+    # Taken before building (see attendance_db.db_fingerprint).
+    fingerprint = _source_fingerprint()
+    ctx = _build_context()
+    ctx.fingerprint = fingerprint
+    return ctx
+
+
+def _install(ctx: ForecastContext) -> None:
+    global _CONTEXT, _FAILED_FINGERPRINT
+    _CONTEXT, _FAILED_FINGERPRINT = ctx, None
+    clear_results()
+
+
+def _rebuild_in_background(fingerprint: tuple) -> None:
+    global _REBUILD, _FAILED_FINGERPRINT
+    try:
+        ctx = _build_fingerprinted()
+    except Exception:
+        # e.g. an upload still being copied into place: keep serving the old context until the files change
+        log.exception('Rebuilding the forecast context failed; keeping the previous one.')
+        with _LOCK:
+            _FAILED_FINGERPRINT, _REBUILD = fingerprint, None
+        return
+    with _LOCK:
+        _install(ctx)
+        _REBUILD = None
+    log.info(f'Forecast context rebuilt as version {ctx.version}.')
+
+
 def get_context(force_rebuild: bool = False) -> ForecastContext:
-    """Return the cached forecast context, building it from the DB + defaults on first use."""
-    global _CONTEXT
+    """Return the cached forecast context, building it from the DB + defaults on first use.
+
+    Once built, the context follows the attendance DB and the defaults CSV: when their fingerprint
+    changes, a rebuild starts in a background thread and the current context keeps serving until the
+    new one replaces it, so a forecast never waits on a rebuild. ``force_rebuild`` rebuilds in the
+    calling thread instead.
+    """
+    global _REBUILD
     with _LOCK:
         if _CONTEXT is None or force_rebuild:
-            _CONTEXT = _build_context()
-    return _CONTEXT
+            _install(_build_fingerprinted())
+            return _CONTEXT
+        fingerprint = _source_fingerprint()
+        if fingerprint not in (_CONTEXT.fingerprint, _FAILED_FINGERPRINT) and _REBUILD is None:
+            log.info('The forecast sources have changed; rebuilding the context in the background.')
+            _REBUILD = threading.Thread(
+                target=_rebuild_in_background, args=(fingerprint,), name='forecast-context', daemon=True
+            )
+            _REBUILD.start()
+        return _CONTEXT
 
 
 # --------------------------------------------------------------------------------------------------
@@ -640,8 +732,34 @@ def _pred_var(vals) -> float:
     return float(v.var(ddof=1) * (1 + 1 / len(v)))
 
 
+_MEMO_LOCK = threading.Lock()
+
+
+def _memoised(ctx: ForecastContext, key: tuple, compute):
+    """Return ``ctx.memo[key]``, computing it on first use (a racing thread at worst computes it twice).
+
+    The keys carry request parameters (the forecast year, the loyalty interval), so the memo keeps only
+    the FORECAST_CONTEXT_MEMO_SIZE most recently used entries.
+    """
+    with _MEMO_LOCK:
+        if key in ctx.memo:
+            ctx.memo.move_to_end(key)
+            return ctx.memo[key]
+    value = compute()
+    with _MEMO_LOCK:
+        value = ctx.memo.setdefault(key, value)
+        ctx.memo.move_to_end(key)
+        while len(ctx.memo) > config.FORECAST_CONTEXT_MEMO_SIZE:
+            ctx.memo.popitem(last=False)
+    return value
+
+
 def _l1_pred(ctx: ForecastContext, ay: int) -> list[tuple[float, float]]:
     """Predicted Level 1 interest (mean, predictive-sd) for each of the six terms at forecast year ``ay``."""
+    return _memoised(ctx, ('l1_pred', ay), lambda: _compute_l1_pred(ctx, ay))
+
+
+def _compute_l1_pred(ctx: ForecastContext, ay: int) -> list[tuple[float, float]]:
     out = []
     for pos in range(1, 7):
         x0 = np.array([1.0, ay - 2024, *[1.0 if pos == p else 0.0 for p in range(2, 7)]])
@@ -652,12 +770,21 @@ def _l1_pred(ctx: ForecastContext, ay: int) -> list[tuple[float, float]]:
 
 
 def _sigma_l1(ctx: ForecastContext, ay: int) -> np.ndarray:
+    return _memoised(ctx, ('sigma_l1', ay), lambda: _compute_sigma_l1(ctx, ay))
+
+
+def _compute_sigma_l1(ctx: ForecastContext, ay: int) -> np.ndarray:
     rows = [np.array([1.0, ay - 2024, *[1.0 if p == pp else 0.0 for pp in range(2, 7)]]) for p in range(1, 7)]
     return ctx.s2 * np.array([[xi @ ctx.xtxi @ xj for xj in rows] for xi in rows]) + np.eye(6) * ctx.s2
 
 
 def _loyalty_refunds(ctx: ForecastContext, loyalty_every: int, fc_l2_thu: int) -> float:
     """Projected yearly Level 2 loyalty refunds = n_dancers * sum_m S(every * m), stretched to the year."""
+    key = ('loyalty_refunds', loyalty_every, fc_l2_thu)
+    return _memoised(ctx, key, lambda: _compute_loyalty_refunds(ctx, loyalty_every, fc_l2_thu))
+
+
+def _compute_loyalty_refunds(ctx: ForecastContext, loyalty_every: int, fc_l2_thu: int) -> float:
     f = _FAMILIES[ctx.loyalty_family][0]
     thr_scale = ctx.loyalty_obs_thu / fc_l2_thu
     total, m = 0.0, 1
@@ -670,7 +797,7 @@ def _loyalty_refunds(ctx: ForecastContext, loyalty_every: int, fc_l2_thu: int) -
 
 
 # --------------------------------------------------------------------------------------------------
-# The money ledger (pure Python so 2n+1 sigma-point evaluations stay fast)
+# The money ledger, written out row by row (the readable reference for the compiled ledger below)
 # --------------------------------------------------------------------------------------------------
 def _blended(disc, ordinary, f_disc):
     return f_disc * disc + (1 - f_disc) * ordinary
@@ -852,17 +979,308 @@ def run_scenario(ctx: ForecastContext, p: dict, cal: dict, socials: list, x: np.
     return {'net': net, 'ledger': ledger, 'balance': balance, 'total_dc': total_dc, 'total_stripe': total_stripe}
 
 
-def _budget(scenario: dict) -> list[dict]:
+# --------------------------------------------------------------------------------------------------
+# The compiled ledger: the same money as run_scenario, evaluated for many input vectors at once
+# --------------------------------------------------------------------------------------------------
+# Columns of the quantity matrix a compiled ledger row draws its head-count from (see CompiledLedger).
+_Q_L1 = 0  # ... to 5: the six Level 1 terms' paying sign-ups (after the class-size cap)
+_Q_L2, _Q_SOC, _Q_XMAS, _Q_SOCIAL_ONLY, _Q_WK, _Q_MEMBERS = range(6, 12)
+# Columns of the discounted-share matrix a row's price blends on (x[12:16]).
+_F_L1, _F_L2, _F_SOC, _F_WK = range(4)
+
+
+@dataclass
+class LedgerEvaluation:
+    """The ledger totals for a batch of ``m`` input vectors (one row of each array per vector)."""
+
+    net: np.ndarray  # (m,)
+    total_dc: np.ndarray  # (m,)
+    total_stripe: np.ndarray  # (m,)
+    revenue: np.ndarray  # (m, n_categories) gross revenue per category
+    cost: np.ndarray  # (m, n_categories) costs per category
+    has_revenue: np.ndarray  # (m, n_categories) whether any row in the category earned anything
+    has_cost: np.ndarray  # (m, n_categories) ... or cost anything
+    balance: np.ndarray  # (m, n_days) closing bank balance on each ledger date
+
+
+@dataclass
+class CompiledLedger:
+    """``run_scenario``'s ledger with its structure fixed, as coefficient arrays over the ledger rows.
+
+    Which rows exist, their dates, categories, prices and fixed costs depend only on ``p``, the calendar
+    and the socials, never on the uncertain vector ``x``. Compiling them once per request leaves each
+    row's money as a short formula in ``x``::
+
+        qty   = Q[driver] * qty_mult                      (head-count; 0 for cost rows)
+        price = price_ord + F[frac] * (price_disc - price_ord)
+        gross = qty * price
+        dc    = round(qty) / per_pack * min(dc_rate * ticket_mult * price + dc_fixed, dc_cap)
+        cost  = cost_const + cost_band * band_fee + cost_loyalty * loyalty_refunds * price
+
+    where ``Q`` and ``F`` are the clipped head-counts and discounted shares taken from ``x``. ``evaluate``
+    applies these to a whole batch of input vectors with array operations, so the unscented transform's
+    sigma points cost one NumPy pass rather than one Python ledger rebuild each, and ``gradients``
+    differentiates the same formulas for the variance decomposition. ``run_scenario`` remains the readable
+    reference; the two agree.
+    """
+
+    dates: list[date]
+    categories: list[str]  # in order of first appearance in the ledger, as run_scenario adds them
+    row_day: np.ndarray
+    row_category: np.ndarray
+    driver: np.ndarray
+    qty_mult: np.ndarray
+    price_disc: np.ndarray
+    price_ord: np.ndarray
+    frac: np.ndarray
+    ticket_mult: np.ndarray
+    per_pack: np.ndarray
+    cost_const: np.ndarray
+    cost_band: np.ndarray
+    cost_loyalty: np.ndarray
+    is_loyalty: np.ndarray
+    signup_cap: float | None
+    fees: dict  # dc_rate, dc_fixed, dc_cap, stripe_rate, stripe_fixed
+    opening: float
+
+    def evaluate(self, xs: np.ndarray) -> LedgerEvaluation:
+        """Evaluate the ledger for each row of ``xs`` (shape ``(m, 18)``, or a single 18-vector)."""
+        xs = np.atleast_2d(np.asarray(xs, float))
+        pos = np.maximum(xs, 0.0)
+        signups = pos[:, :6] if self.signup_cap is None else np.minimum(pos[:, :6], self.signup_cap)
+        q = np.hstack([signups, pos[:, 6:12]])
+        f = np.clip(xs[:, 12:16], 0.0, 1.0)
+        loyalty, band = pos[:, 16:17], pos[:, 17:18]
+
+        qty = q[:, self.driver] * self.qty_mult
+        price = self.price_ord + f[:, self.frac] * (self.price_disc - self.price_ord)
+        gross = qty * price
+        fee = np.minimum(self.fees['dc_rate'] * self.ticket_mult * price + self.fees['dc_fixed'], self.fees['dc_cap'])
+        dc = np.round(qty) / self.per_pack * fee
+        cost = self.cost_const + self.cost_band * band + self.cost_loyalty * loyalty * price
+
+        days = self._one_hot(self.row_day, len(self.dates))
+        net_in = gross - dc
+        day_base = np.where(self.is_loyalty, -cost, net_in) @ days
+        stripe = np.where(day_base > 0, self.fees['stripe_rate'] * day_base + self.fees['stripe_fixed'], 0.0)
+        day_delta = (net_in - cost) @ days - stripe
+
+        cats = self._one_hot(self.row_category, len(self.categories))
+        total_dc, total_stripe = dc.sum(axis=1), stripe.sum(axis=1)
+        return LedgerEvaluation(
+            net=gross.sum(axis=1) - total_dc - total_stripe - cost.sum(axis=1),
+            total_dc=total_dc,
+            total_stripe=total_stripe,
+            revenue=gross @ cats,
+            cost=cost @ cats,
+            has_revenue=(gross != 0) @ cats > 0,
+            has_cost=(cost != 0) @ cats > 0,
+            balance=self.opening + np.cumsum(day_delta, axis=1),
+        )
+
+    @staticmethod
+    def _one_hot(index: np.ndarray, width: int) -> np.ndarray:
+        """A ``(len(index), width)`` matrix that sums row values into their day (or category) columns."""
+        m = np.zeros((len(index), width))
+        m[np.arange(len(index)), index] = 1.0
+        return m
+
+    def gradients(self, x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """The gradient of the year net with respect to the input vector ``x``, and its split by budget line.
+
+        Differentiates ``evaluate``'s formulas directly (forward mode, one column per input), with the
+        slope on the inside of each clip and half of it for an input sitting exactly on its zero floor.
+        ``round(qty)`` is a staircase whose slope is zero almost everywhere; it's given its average slope
+        of one, so the Dancecloud fees follow the head-counts as they do over any real change in attendance.
+        Returns ``(net_grad, line_grads)``: ``line_grads`` has a row per category (revenue less cost), then
+        the Dancecloud and the Stripe fees (as negatives), matching ``budget_lines``; its rows sum to
+        ``net_grad``.
+        """
+        x = np.asarray(x, float)
+        n, rows = len(x), np.arange(len(self.driver))
+        pos = np.maximum(x, 0.0)
+        d_pos = np.where(x > 0, 1.0, np.where(x == 0, 0.5, 0.0))  # an input sitting on its floor moves up only
+        cap = np.inf if self.signup_cap is None else self.signup_cap
+        q = np.concatenate([np.minimum(pos[:6], cap), pos[6:12]])
+        d_q = np.concatenate([d_pos[:6] * (pos[:6] < cap), d_pos[6:12]])
+        f = np.clip(x[12:16], 0.0, 1.0)
+        d_f = ((x[12:16] > 0) & (x[12:16] < 1)).astype(float)
+        loyalty = pos[16]
+
+        spread = self.price_disc - self.price_ord
+        qty = q[self.driver] * self.qty_mult
+        price = self.price_ord + f[self.frac] * spread
+        d_qty = np.zeros((len(rows), n))
+        d_qty[rows, self.driver] = d_q[self.driver] * self.qty_mult  # Q[i] is x[i] (floored, capped)
+        d_price = np.zeros((len(rows), n))
+        d_price[rows, 12 + self.frac] = d_f[self.frac] * spread  # F[k] is x[12 + k] (clipped)
+        d_gross = d_qty * price[:, None] + qty[:, None] * d_price
+
+        rate = self.fees['dc_rate'] * self.ticket_mult
+        raw_fee = rate * price + self.fees['dc_fixed']
+        fee = np.minimum(raw_fee, self.fees['dc_cap'])
+        d_fee = (rate * (raw_fee < self.fees['dc_cap']))[:, None] * d_price
+        d_dc = (d_qty * fee[:, None] + np.round(qty)[:, None] * d_fee) / self.per_pack[:, None]
+
+        d_cost = (self.cost_loyalty * loyalty)[:, None] * d_price
+        d_cost[:, 16] += self.cost_loyalty * price * d_pos[16]
+        d_cost[:, 17] += self.cost_band * d_pos[17]
+
+        # Stripe charges a share of each day's takings, on the days with any
+        days = self._one_hot(self.row_day, len(self.dates))
+        net_in = qty * price - np.round(qty) / self.per_pack * fee
+        cost = self.cost_const + self.cost_band * pos[17] + self.cost_loyalty * loyalty * price
+        day_base = np.where(self.is_loyalty, -cost, net_in) @ days
+        d_day_base = days.T @ np.where(self.is_loyalty[:, None], -d_cost, d_gross - d_dc)
+        d_stripe = (self.fees['stripe_rate'] * (day_base > 0))[:, None] * d_day_base
+
+        cats = self._one_hot(self.row_category, len(self.categories))
+        line_grads = np.vstack([cats.T @ (d_gross - d_cost), -d_dc.sum(axis=0), -d_stripe.sum(axis=0)])
+        return line_grads.sum(axis=0), line_grads
+
+    @property
+    def budget_lines(self) -> list[str]:
+        """The names of ``gradients``' line rows: the categories, then the two kinds of fee."""
+        return [*self.categories, 'Dancecloud fees', 'Stripe fees']
+
+
+def compile_ledger(ctx: ForecastContext, p: dict, cal: dict, socials: list) -> CompiledLedger:  # noqa: C901, PLR0912, PLR0915
+    """Lay out ``run_scenario``'s ledger rows (same order, dates and categories) as a CompiledLedger."""
+    rows: list[dict] = []
+
+    def add(dt, cat, **coef):
+        rows.append({'date': dt, 'cat': cat, **coef})
+
+    def revenue(dt, cat, driver, prices, frac=_F_L1, qty_mult=1.0, per_pack=1):  # noqa: PLR0913
+        disc, ordinary = prices
+        add(dt, cat, driver=driver, qty_mult=qty_mult, disc=disc, ord=ordinary, frac=frac, per_pack=per_pack)
+
+    def flat(price):
+        return price, price
+
+    fc_l2_thu = sum(t['weeks'] for t in cal['terms'])
+    class_venue = p['class_room_hour_a'] * p['room_per_hour'] + p['class_room_hour_b'] * p['room_per_hour_b']
+    class_teachers = (p['teacher_hours_a'] + p['teacher_hours_b'] + p['teacher_hours_c'] + p['teacher_hours_d']) * p[
+        'teacher_rate'
+    ]
+    class_prices = (p['price_class_disc'], p['price_class_ord'])
+    social_only_prices = (p['price_social_only_disc'], p['price_social_only_ord'])
+    cc = max(1, int(p.get('class_card_size', 1)))
+    curve = ctx.l1_attend_curve
+
+    revenue(cal['first_class'], 'Memberships', _Q_MEMBERS, flat(p['membership_fee']))
+    for t in cal['terms']:
+        term = _Q_L1 + t['term'] - 1
+        if not p['l1_per_night']:
+            block = (t['weeks'] * class_prices[0], t['weeks'] * class_prices[1])
+            revenue(t['start'], 'Level 1 classes', term, block)
+        for w, thu in enumerate(t['thursdays']):
+            if p['l1_per_night']:
+                revenue(thu, 'Level 1 classes', term, class_prices, qty_mult=curve[w] if w < len(curve) else curve[-1])
+            revenue(thu, 'Level 2 classes', _Q_L2, class_prices, frac=_F_L2, per_pack=cc)
+            revenue(thu, 'Social-only tickets', _Q_SOCIAL_ONLY, social_only_prices, frac=_F_SOC, per_pack=cc)
+            add(thu, 'Class venue', const=class_venue)
+            add(thu, 'Class teachers', const=class_teachers)
+            if p['loyalty_enabled']:
+                # loyalty_refunds * l2_price / fc_l2_thu: priced like a Level 2 ticket, so carry its prices
+                add(
+                    thu,
+                    'Loyalty refunds',
+                    loyalty=1 / fc_l2_thu,
+                    disc=class_prices[0],
+                    ord=class_prices[1],
+                    frac=_F_L2,
+                    is_loyalty=True,
+                )
+
+    retained = ctx.wk_mix['retained'] or 1
+    social_prices = (p['price_social_disc'], p['price_social_ord'])
+    for label, dt in socials:
+        if label == 'Weekender':
+            for share, prices in [
+                ('full', (p['price_wk_full_disc'], p['price_wk_full_ord'])),
+                ('partial', (p['price_wk_day_disc'], p['price_wk_day_ord'])),
+                ('single', social_prices),
+            ]:
+                revenue(dt, 'Weekender tickets', _Q_WK, prices, frac=_F_WK, qty_mult=ctx.wk_mix[share] / retained)
+            revenue(
+                dt, 'Weekender tickets', _Q_WK, flat(p['price_wk_social']), qty_mult=ctx.wk_mix['social'] / retained
+            )
+            add(dt, 'Weekender costs', band=p['weekender_bands'])
+            add(dt, 'Weekender costs', const=p['weekender_bands'] * p['social_snacks'])
+            add(dt, 'Weekender costs', const=p['weekender_room_hours'] * p['weekender_room_per_hour'])
+            add(
+                dt,
+                'Weekender costs',
+                const=p['weekender_teachers'] * p['weekender_teacher_rate'] * p['weekender_teacher_hours'],
+            )
+            add(dt, 'Weekender costs', const=p['weekender_teachers'] * p['weekender_flight'])
+            add(
+                dt,
+                'Weekender costs',
+                const=p['weekender_teachers'] * p['weekender_board_per_night'] * p['weekender_nights'],
+            )
+        else:
+            driver = _Q_XMAS if label == 'Christmas party' else _Q_SOC
+            revenue(dt, 'Social tickets', driver, social_prices, frac=_F_SOC)
+            add(dt, 'Social costs', band=1.0)
+            add(dt, 'Social costs', const=p['social_snacks'])
+            add(dt, 'Social costs', const=p['social_room_hours'] * p['social_room_per_hour'])
+
+    vol_heads = p['n_committee'] + p['n_safer_spaces'] + p['n_extra_volunteers']
+    n_vol_socials = int(p.get('n_volunteer_socials', 2))
+    start, eoy = cal['first_class'], cal['eoy_party']
+    for i in range(n_vol_socials):
+        dt = start + (eoy - start) * (i + 1) // (n_vol_socials + 1)
+        add(dt, 'Volunteer socials', const=vol_heads * p['volunteer_social_per_head'])
+
+    n_seats = p['n_committee'] + p['n_legacy_accounts'] + p['n_shared_accounts']
+    if p.get('safer_spaces_accounts', True):
+        n_seats += p['n_safer_spaces']
+    overheads = [p['oh_' + k] for k in OVERHEAD_KEYS]
+    overheads.append(n_seats * p['gsuite_seat_monthly'] * 12 + p['wix_reseller_annual'])
+    oh_months = [date(cal['ay'] if m >= _SEPTEMBER else cal['ay'] + 1, m, 1) for m in (9, 10, 11, 12, 1, 2, 3, 4, 5, 6)]
+    for amt in overheads:
+        for dt in oh_months:
+            add(dt, 'Overheads', const=amt / len(oh_months))
+
+    dates = sorted({r['date'] for r in rows})
+    day_of = {dt: i for i, dt in enumerate(dates)}
+    categories = list(dict.fromkeys(r['cat'] for r in rows))
+    cat_of = {c: i for i, c in enumerate(categories)}
+
+    def col(key, default=0.0, dtype=float):
+        return np.array([r.get(key, default) for r in rows], dtype=dtype)
+
+    per_pack = col('per_pack', 1)
+    return CompiledLedger(
+        dates=dates,
+        categories=categories,
+        row_day=np.array([day_of[r['date']] for r in rows]),
+        row_category=np.array([cat_of[r['cat']] for r in rows]),
+        driver=col('driver', 0, int),
+        qty_mult=col('qty_mult'),
+        price_disc=col('disc'),
+        price_ord=col('ord'),
+        frac=col('frac', _F_L1, int),
+        ticket_mult=per_pack,  # a class-card pack costs per_pack tickets, so its fee is on that amount
+        per_pack=per_pack,
+        cost_const=col('const'),
+        cost_band=col('band'),
+        cost_loyalty=col('loyalty'),
+        is_loyalty=col('is_loyalty', False, bool),
+        signup_cap=p.get('class_size_cap') or None,
+        fees={k: p[k] for k in ('dc_rate', 'dc_fixed', 'dc_cap', 'stripe_rate', 'stripe_fixed')},
+        opening=float(p['current_balance']),
+    )
+
+
+def _budget(ledger: CompiledLedger, point: LedgerEvaluation) -> list[dict]:
     """Aggregate the point-estimate ledger into revenue and cost lines, largest first."""
-    rev: dict[str, float] = {}
-    cost: dict[str, float] = {}
-    for _dt, cat, kind, gross, _dcfee, c, _loy in scenario['ledger']:
-        if gross:
-            rev[cat] = rev.get(cat, 0.0) + gross
-        if c:
-            cost[cat] = cost.get(cat, 0.0) + c
-    cost['Dancecloud fees'] = scenario['total_dc']
-    cost['Stripe fees'] = scenario['total_stripe']
+    rev = {c: float(point.revenue[0, i]) for i, c in enumerate(ledger.categories) if point.has_revenue[0, i]}
+    cost = {c: float(point.cost[0, i]) for i, c in enumerate(ledger.categories) if point.has_cost[0, i]}
+    cost['Dancecloud fees'] = float(point.total_dc[0])
+    cost['Stripe fees'] = float(point.total_stripe[0])
     lines = [
         {'category': k, 'amount': round(v), 'kind': 'revenue'} for k, v in sorted(rev.items(), key=lambda i: -i[1])
     ]
@@ -917,82 +1335,183 @@ def _mu_sigma(ctx: ForecastContext, p: dict, cal: dict) -> tuple[np.ndarray, np.
     return mu, sigma
 
 
-def _unscented(ctx, p, cal, socials, mu, sigma):
-    """Propagate (mu, sigma) through run_scenario with 2n+1 sigma points.
+def _unscented(ledger: CompiledLedger, mu: np.ndarray, sigma: np.ndarray) -> dict:
+    """Propagate (mu, sigma) through the compiled ledger with 2n+1 sigma points, evaluated as one batch.
 
     The sigma point at ``mu`` is the deterministic point estimate; we report standard deviations from
     the unscented weights but keep the *centre* on that point estimate, so the headline and the balance
     curve reconcile with the itemised budget (which is the point estimate) rather than drifting a few
-    pounds away through the transform's nonlinearity.
+    pounds away through the transform's nonlinearity. Every sigma point shares the ledger's dates, so
+    the balance curves line up column for column.
     """
+    pts, wm, wc = _sigma_points(mu, sigma)
+    with span('evaluate'):
+        ev = ledger.evaluate(pts)
+    bal_mean = wm @ ev.balance
+    bal_std = np.sqrt(np.clip(wc @ (ev.balance - bal_mean) ** 2, 0, None))
+    return {'net_std': _weighted_std(ev.net, wm, wc), 'bal_std': bal_std, 'point': _first(ev)}
+
+
+def _sigma_points(mu: np.ndarray, sigma: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """The 2n+1 sigma points (``mu`` first) and their mean and covariance weights."""
     n = len(mu)
     alpha, beta_, kappa = 0.5, 2.0, 0.0
     lam = alpha**2 * (n + kappa) - n
     # A toggle can zero an input's variance (e.g. disabling the loyalty scheme), leaving the covariance
     # only positive-semidefinite; a tiny jitter keeps the Cholesky well-defined. Such inputs don't move
     # the output, so the jitter is numerically negligible.
-    chol = np.linalg.cholesky((n + lam) * (sigma + np.eye(n) * 1e-6))
+    with span('cholesky'):
+        chol = np.linalg.cholesky((n + lam) * (sigma + np.eye(n) * 1e-6))
     pts = np.vstack([mu, mu + chol.T, mu - chol.T])
     wm = np.full(2 * n + 1, 1 / (2 * (n + lam)))
     wc = wm.copy()
     wm[0] = lam / (n + lam)
     wc[0] = wm[0] + (1 - alpha**2 + beta_)
+    return pts, wm, wc
 
-    scenarios = [run_scenario(ctx, p, cal, socials, x) for x in pts]
-    nets = np.array([s['net'] for s in scenarios])
-    net_mean = float(wm @ nets)
-    net_std = float(np.sqrt(max(wc @ (nets - net_mean) ** 2, 0.0)))
 
-    grid = [dt for dt, _ in scenarios[0]['balance']]  # point-estimate date grid
-    mat = np.array([_balance_on_grid(s['balance'], grid, float(p['current_balance'])) for s in scenarios])
-    bal_mean = wm @ mat
-    bal_std = np.sqrt(np.clip(wc @ (mat - bal_mean) ** 2, 0, None))
-    return {'net_std': net_std, 'grid': grid, 'bal_std': bal_std}
+def _weighted_std(values: np.ndarray, wm: np.ndarray, wc: np.ndarray) -> float:
+    mean = float(wm @ values)
+    return float(np.sqrt(max(wc @ (values - mean) ** 2, 0.0)))
 
 
-def _balance_on_grid(balance, grid, opening):
-    d = [dt for dt, _ in balance]
-    b = [v for _, v in balance]
-    out = []
-    for g in grid:
-        idx = -1
-        for i, dt in enumerate(d):
-            if dt <= g:
-                idx = i
-            else:
-                break
-        out.append(b[idx] if idx >= 0 else opening)
-    return out
+def _first(ev: LedgerEvaluation) -> LedgerEvaluation:
+    """The first vector's evaluation out of a batch (kept two-dimensional)."""
+    return LedgerEvaluation(**{k: v[:1] for k, v in vars(ev).items()})
 
 
-def _contributors(ctx, p, cal, socials, mu, sigma):
-    """Variance decomposition: share of year-net variance from each input (grouping the L1 block)."""
-    n = len(mu)
-    sd = np.sqrt(np.diag(sigma))
-    j = np.zeros(n)
-    for i in range(n):
-        step = sd[i] if sd[i] > 0 else 1.0
-        e = np.zeros(n)
-        e[i] = step
-        hi = run_scenario(ctx, p, cal, socials, mu + e)['net']
-        lo = run_scenario(ctx, p, cal, socials, mu - e)['net']
-        j[i] = (hi - lo) / (2 * step)
+def _unscented_bands(ledger: CompiledLedger, mu: np.ndarray, sigma: np.ndarray, conf: float) -> dict:
+    """The unscented engine: bands of ``z`` standard deviations either side of the point estimate."""
+    ut = _unscented(ledger, mu, sigma)
+    z = _z(conf)
+    point_bal = ut['point'].balance[0]
+    return {
+        'point': ut['point'],
+        'headline': _headline(float(ut['point'].net[0]), ut['net_std'], float(point_bal[-1]), z),
+        'bal_lo': point_bal - z * ut['bal_std'],
+        'bal_hi': point_bal + z * ut['bal_std'],
+        'engine': {'name': 'unscented', 'samples': 2 * len(mu) + 1},
+    }
+
+
+def _monte_carlo(ledger: CompiledLedger, mu: np.ndarray, sigma: np.ndarray, q: list[float]) -> dict:
+    """Sample the year net and the balance curve with randomised quasi-Monte Carlo.
+
+    FORECAST_MC_REPLICATES independently scrambled Sobol sequences are drawn side by side, each doubling
+    its points every round so it stays a balanced power-of-two prefix. Quasi-random points carry no
+    error estimate of their own; the spread between the replicates does. Sampling stops once the standard
+    error of the net's mean and of its ``q`` percentiles (the band ends) is within FORECAST_MC_TARGET_SE,
+    or at FORECAST_MC_MAX_SAMPLES. The scrambles are seeded, so a scenario always gets the same samples
+    and its result can be memoised.
+    """
+    n, reps = len(mu), config.FORECAST_MC_REPLICATES
+    chol = np.linalg.cholesky(sigma + np.eye(n) * 1e-6)  # the same jitter as the sigma points
+    samplers = [qmc.Sobol(n, seed=np.random.default_rng(s)) for s in np.random.SeedSequence(_MC_SEED).spawn(reps)]
+    nets = [np.empty(0) for _ in samplers]
+    balances: list[np.ndarray] = []
+    drawn, block = 0, config.FORECAST_MC_MIN_SAMPLES // reps
+    while True:
+        for r, sampler in enumerate(samplers):
+            normal = stats.norm.ppf(np.clip(sampler.random(block), 1e-12, 1 - 1e-12))
+            ev = ledger.evaluate(mu + normal @ chol.T)
+            nets[r] = np.concatenate([nets[r], ev.net])
+            balances.append(ev.balance)
+        drawn += block
+        # per replicate: the mean and the band ends; their spread across replicates gives the errors
+        estimates = np.array([[rep.mean(), *np.percentile(rep, q)] for rep in nets])
+        stderr = float(np.max(estimates.std(axis=0, ddof=1)) / np.sqrt(reps))
+        if stderr <= config.FORECAST_MC_TARGET_SE or drawn * reps >= config.FORECAST_MC_MAX_SAMPLES:
+            break
+        block = drawn
+    return {'net': np.concatenate(nets), 'balance': np.vstack(balances), 'stderr': stderr}
+
+
+def _monte_carlo_bands(ledger: CompiledLedger, mu: np.ndarray, sigma: np.ndarray, conf: float) -> dict:
+    """The Monte Carlo engine: percentile bands around the point estimate, and a histogram of the net.
+
+    The headline stays centred on the point estimate, as with the unscented engine, so it still
+    reconciles with the budget; the ranges and the chance of a surplus come from the samples, so the
+    clipped inputs (sign-ups floored at zero or held at the class-size cap, capped fees) skew them as
+    they would in reality.
+    """
+    q = [50 * (1 - conf), 50 * (1 + conf)]
+    point = _first(ledger.evaluate(mu))
+    mc = _monte_carlo(ledger, mu, sigma, q)
+    bal_lo, bal_hi = np.percentile(mc['balance'], q, axis=0)
+    net_lo, net_hi = np.percentile(mc['net'], q)
+    net_mean, ye_mean = float(point.net[0]), float(point.balance[0, -1])
+    counts, edges = np.histogram(mc['net'], bins=config.FORECAST_MC_HISTOGRAM_BINS)
+    return {
+        'point': point,
+        'headline': {
+            'net': {'mean': round(net_mean), 'lo': round(net_lo), 'hi': round(net_hi), 'std': round(mc['net'].std())},
+            'year_end_balance': {'mean': round(ye_mean), 'lo': round(bal_lo[-1]), 'hi': round(bal_hi[-1])},
+            'p_green': round(float(np.mean(mc['net'] > 0)), 3),
+        },
+        'bal_lo': bal_lo,
+        'bal_hi': bal_hi,
+        'engine': {'name': 'monte_carlo', 'samples': len(mc['net']), 'stderr': round(mc['stderr'], 2)},
+        'histogram': {'edges': [round(e) for e in edges], 'counts': counts.tolist()},
+    }
+
+
+# How predict propagates the input uncertainty: the unscented transform by default, or quasi-Monte Carlo.
+ENGINES = {'unscented': _unscented_bands, 'monte_carlo': _monte_carlo_bands}
+
+
+def _contributors(ledger: CompiledLedger, mu: np.ndarray, sigma: np.ndarray) -> tuple[list[dict], list[dict]]:
+    """Variance decomposition of the year net, by input (grouping the L1 block) and by budget line.
+
+    Both use the linearisation around ``mu``: with gradient ``j``, the net's variance is ``j' Σ j``. A
+    budget line's share is its own gradient row against ``Σ j``; the shares sum to the total, and a line
+    that moves against the rest (a fee that grows with the takings) gets a negative share.
+    """
+    j, line_j = ledger.gradients(mu)
     var_total = float(j @ sigma @ j) or 1.0
     contrib = {'Level 1 sign-ups': float(j[:6] @ sigma[:6, :6] @ j[:6])}
-    for i in range(6, n):
+    for i in range(6, len(mu)):
         contrib[INPUT_NAMES[i]] = float(j[i] ** 2 * sigma[i, i])
     ranked = sorted(contrib.items(), key=lambda kv: -kv[1])
-    return [{'name': k, 'pct': round(100 * v / var_total, 1)} for k, v in ranked if v > 0]
+    by_input = [{'name': k, 'pct': round(100 * v / var_total, 1)} for k, v in ranked if v > 0]
+    shares = 100 * (line_j @ sigma @ j) / var_total
+    by_line = [
+        {'name': name, 'pct': round(float(pct), 1)}
+        for name, pct in sorted(zip(ledger.budget_lines, shares), key=lambda kv: -abs(kv[1]))
+        if round(float(pct), 1) != 0
+    ]
+    return by_input, by_line
 
 
 # --------------------------------------------------------------------------------------------------
 # The public entry point
 # --------------------------------------------------------------------------------------------------
-def _merge_params(ctx: ForecastContext, overrides: dict) -> dict:
-    """Start from the spreadsheet defaults and apply the caller's overrides, coercing types."""
-    p = dict(ctx.defaults)
-    bool_keys = {'have_weekender', 'loyalty_enabled', 'l1_per_night', 'safer_spaces_accounts'}
-    int_keys = {
+def _headline(net_mean: float, net_std: float, ye_mean: float, z: float) -> dict:
+    """The year net and year-end balance with their confidence ranges, and the chance of a surplus."""
+    # the year-end balance is the opening balance plus the net, so it shares the net's spread
+    return {
+        'net': {
+            'mean': round(net_mean),
+            'lo': round(net_mean - z * net_std),
+            'hi': round(net_mean + z * net_std),
+            'std': round(net_std),
+        },
+        'year_end_balance': {
+            'mean': round(ye_mean),
+            'lo': round(ye_mean - z * net_std),
+            'hi': round(ye_mean + z * net_std),
+        },
+        'p_green': round(_p_green(net_mean, net_std), 3),
+    }
+
+
+def _p_green(net_mean: float, net_std: float) -> float:
+    """The chance of a surplus, taking the net as normal."""
+    return float(stats.norm.cdf(net_mean / net_std)) if net_std > 0 else (1.0 if net_mean > 0 else 0.0)
+
+
+_BOOL_PARAMS = frozenset({'have_weekender', 'loyalty_enabled', 'l1_per_night', 'safer_spaces_accounts'})
+_INT_PARAMS = frozenset(
+    {
         'forecast_ay',
         'n_tea_dances',
         'loyalty_every',
@@ -1007,12 +1526,18 @@ def _merge_params(ctx: ForecastContext, overrides: dict) -> dict:
         'weekender_teachers',
         'weekender_nights',
     }
+)
+
+
+def _merge_params(ctx: ForecastContext, overrides: dict) -> dict:
+    """Start from the spreadsheet defaults and apply the caller's overrides, coercing types."""
+    p = dict(ctx.defaults)
     for k, v in (overrides or {}).items():
         if k not in p or v is None:
             continue
-        if k in bool_keys:
+        if k in _BOOL_PARAMS:
             p[k] = bool(v) if not isinstance(v, str) else v.lower() in ('true', '1', 'yes', 'on')
-        elif k in int_keys:
+        elif k in _INT_PARAMS:
             p[k] = int(round(float(v)))
         elif k == 'class_size_cap':
             p[k] = None if v in ('', None) else int(round(float(v)))
@@ -1021,57 +1546,112 @@ def _merge_params(ctx: ForecastContext, overrides: dict) -> dict:
     return p
 
 
-def predict(overrides: dict | None = None, confidence: float | None = None) -> dict:
+def _confidence(p: dict, confidence: float | None) -> float:
+    conf = float(confidence if confidence is not None else p.get('confidence', 0.95))
+    return min(0.999, max(0.5, conf))
+
+
+def _engine(engine: str | None) -> str:
+    if engine is None:
+        return 'unscented'
+    if engine not in ENGINES:
+        raise ValueError(f'Unknown forecast engine {engine!r}.')
+    return engine
+
+
+def _scenario_key(ctx: ForecastContext, p: dict, conf: float, engine: str = 'unscented') -> str:
+    """A canonical hash of the merged parameters, the confidence, the engine and the context they ran on."""
+    canonical = json.dumps([ctx.version, conf, engine, p], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def clear_results() -> None:
+    """Forget every memoised forecast result (and goal seek)."""
+    with _RESULTS_LOCK:
+        _RESULTS.clear()
+        _SOLVES.clear()
+
+
+def predict(overrides: dict | None = None, confidence: float | None = None, engine: str | None = None) -> dict:
     """Run the forecast for the given parameter overrides and confidence level.
 
     Returns the budget breakdown, the net and year-end balance with a confidence interval, the balance
     curve with an uncertainty band, the variance decomposition, and the detailed attendance models.
+    ``engine`` names one of ENGINES to propagate the uncertainty: ``'unscented'`` (the default) or
+    ``'monte_carlo'``, which also returns a ``histogram`` of the year net.
+
+    The last FORECAST_RESULT_CACHE_SIZE results are memoised by their merged parameters, so dragging a
+    slider back to a value seen moments ago costs a dict lookup. Results are shared: don't modify them.
+    Each carries a ``scenario`` token that ``to_workbook`` accepts to export it without re-running it.
     """
-    ctx = get_context()
-    p = _merge_params(ctx, overrides)
-    conf = float(confidence if confidence is not None else p.get('confidence', 0.95))
-    conf = min(0.999, max(0.5, conf))
-    z = _z(conf)
+    return _scenario(overrides, confidence, engine)[1]
+
+
+def _scenario(overrides: dict | None, confidence: float | None, engine: str | None = None) -> tuple[dict, dict]:
+    engine = _engine(engine)
+    with span('context'):
+        ctx = get_context()
+        p = _merge_params(ctx, overrides)
+        conf = _confidence(p, confidence)
+        key = _scenario_key(ctx, p, conf, engine)
+    with _RESULTS_LOCK:
+        cached = _RESULTS.get(key)
+        if cached is not None:
+            _RESULTS.move_to_end(key)
+            return cached
+
+    with span('forecast'):
+        cached = (p, {**_forecast(ctx, p, conf, engine), 'scenario': key})
+    with _RESULTS_LOCK:
+        _RESULTS[key] = cached
+        while len(_RESULTS) > config.FORECAST_RESULT_CACHE_SIZE:
+            _RESULTS.popitem(last=False)
+    return cached
+
+
+def _cached_scenario(scenario: str | None) -> tuple[dict, dict] | None:
+    if not isinstance(scenario, str):  # the token comes from a request body: anything else is a miss
+        return None
+    with _RESULTS_LOCK:
+        return _RESULTS.get(scenario)
 
-    cal = build_calendar(int(p['forecast_ay']))
-    socials = place_socials(cal, int(p['n_tea_dances']), bool(p['have_weekender']))
-    mu, sigma = _mu_sigma(ctx, p, cal)
 
-    point = run_scenario(ctx, p, cal, socials, mu)
-    ut = _unscented(ctx, p, cal, socials, mu, sigma)
+def _forecast(ctx: ForecastContext, p: dict, conf: float, engine: str = 'unscented') -> dict:
+    z = _z(conf)
+    with span('calendar'):
+        cal = build_calendar(int(p['forecast_ay']))
+        socials = _socials_for(cal['ay'], int(p['n_tea_dances']), bool(p['have_weekender']))
+    with span('mu_sigma'):
+        mu, sigma = _mu_sigma(ctx, p, cal)
+    with span('compile_ledger'):
+        ledger = compile_ledger(ctx, p, cal, socials)
+    with span(engine):
+        bands = ENGINES[engine](ledger, mu, sigma, conf)
+    point = bands['point']
 
     # Centre on the deterministic point estimate (which the itemised budget reconciles with); the
-    # unscented transform supplies the standard deviations for the confidence band.
-    net_mean, net_std = float(point['net']), ut['net_std']
-    p_green = float(stats.norm.cdf(net_mean / net_std)) if net_std > 0 else (1.0 if net_mean > 0 else 0.0)
-    point_bal = _balance_on_grid(point['balance'], ut['grid'], float(p['current_balance']))
-    ye_mean, ye_std = point_bal[-1], net_std
+    # engine supplies the confidence band around it.
+    point_bal = point.balance[0]
 
     balance = {
-        'dates': [dt.isoformat() for dt in ut['grid']],
+        'dates': [dt.isoformat() for dt in ledger.dates],
         'mean': [round(v) for v in point_bal],
-        'lo': [round(v - z * s) for v, s in zip(point_bal, ut['bal_std'])],
-        'hi': [round(v + z * s) for v, s in zip(point_bal, ut['bal_std'])],
+        'lo': [round(v) for v in bands['bal_lo']],
+        'hi': [round(v) for v in bands['bal_hi']],
         'opening': round(float(p['current_balance'])),
     }
     l1 = _l1_pred(ctx, cal['ay'])
+    with span('contributors'):
+        contributors, contributors_by_line = _contributors(ledger, mu, sigma)
     return {
         'confidence': conf,
-        'net': {
-            'mean': round(net_mean),
-            'lo': round(net_mean - z * net_std),
-            'hi': round(net_mean + z * net_std),
-            'std': round(net_std),
-        },
-        'year_end_balance': {
-            'mean': round(ye_mean),
-            'lo': round(ye_mean - z * ye_std),
-            'hi': round(ye_mean + z * ye_std),
-        },
-        'p_green': round(p_green, 3),
-        'budget': _budget(point),
+        'engine': bands['engine'],
+        **bands['headline'],
+        **({'histogram': bands['histogram']} if 'histogram' in bands else {}),
+        'budget': _budget(ledger, point),
         'balance': balance,
-        'contributors': _contributors(ctx, p, cal, socials, mu, sigma),
+        'contributors': contributors,
+        'contributors_by_line': contributors_by_line,
         'calendar': {
             'ay': cal['ay'],
             'n_class_nights': sum(t['weeks'] for t in cal['terms']),
@@ -1105,17 +1685,237 @@ def predict(overrides: dict | None = None, confidence: float | None = None) -> d
 
 
 # --------------------------------------------------------------------------------------------------
-# Download the whole scenario as a timestamped workbook
+# Compare many scenarios in one call
+# --------------------------------------------------------------------------------------------------
+def sweep(param: str, values: list | None = None, start=None, stop=None, steps: int | None = None) -> list[dict]:
+    """Overrides stepping ``param`` through ``values``, or ``steps`` evenly spaced from ``start`` to ``stop``."""
+    if param not in PARAM_LABELS:
+        raise ValueError(f'Unknown parameter {param!r}.')
+    if values is None:
+        if start is None or stop is None or not steps:
+            raise ValueError('A sweep needs either values or start, stop and steps.')
+        n = int(steps)
+    elif isinstance(values, list):
+        n = len(values)
+    else:
+        raise ValueError("A sweep's values must be a list.")
+    if not 0 < n <= config.FORECAST_COMPARE_MAX_SCENARIOS:
+        raise ValueError(f'A sweep takes between 1 and {config.FORECAST_COMPARE_MAX_SCENARIOS} steps.')
+    if values is None:
+        values = np.linspace(float(start), float(stop), n).tolist()
+    return [{param: v} for v in values]
+
+
+def compare(base: dict | None, scenarios: list[dict], confidence: float | None = None) -> list[dict]:
+    """The headline figures (net, year-end balance, p_green) for each of ``scenarios`` applied to ``base``.
+
+    One call shares the context, the memoised calendars and Level 1 model, and skips everything predict
+    computes for the page but a comparison table doesn't need (the budget lines, the balance band and
+    the variance decomposition): each scenario is one compiled ledger and one batch of sigma points.
+    Scenarios already in the result cache are read from there. Each row repeats its overrides so the
+    table can be read on its own.
+    """
+    if len(scenarios) > config.FORECAST_COMPARE_MAX_SCENARIOS:
+        raise ValueError(f'At most {config.FORECAST_COMPARE_MAX_SCENARIOS} scenarios can be compared at once.')
+    ctx = get_context()
+    rows = []
+    for overrides in scenarios:
+        p = _merge_params(ctx, {**(base or {}), **(overrides or {})})
+        conf = _confidence(p, confidence)
+        cached = _cached_scenario(_scenario_key(ctx, p, conf))
+        if cached is not None:
+            headline = {k: cached[1][k] for k in ('net', 'year_end_balance', 'p_green')}
+        else:
+            headline = _headline(*_summary(ctx, p), _z(conf))
+        rows.append({'overrides': overrides, 'confidence': conf, **headline})
+    return rows
+
+
+def _summary(ctx: ForecastContext, p: dict) -> tuple[float, float, float]:
+    """The point-estimate net, its unscented standard deviation and the year-end balance, and nothing else."""
+    cal = build_calendar(int(p['forecast_ay']))
+    socials = _socials_for(cal['ay'], int(p['n_tea_dances']), bool(p['have_weekender']))
+    pts, wm, wc = _sigma_points(*_mu_sigma(ctx, p, cal))
+    ev = compile_ledger(ctx, p, cal, socials).evaluate(pts)
+    return float(ev.net[0]), _weighted_std(ev.net, wm, wc), float(ev.balance[0, -1])
+
+
+# --------------------------------------------------------------------------------------------------
+# Goal seek: the smallest change to some parameters that meets a target
 # --------------------------------------------------------------------------------------------------
-def to_workbook(overrides: dict | None, confidence: float | None) -> bytes:
-    """Serialise the current scenario (inputs + results) to an .xlsx for saving a what-if variant."""
+# What solve can aim at: the label, and a typical size used to scale the constraint for the optimiser.
+SOLVE_METRICS = {
+    'p_green': ('chance of a surplus', 0.1),
+    'net': ('year net', 1000.0),
+    'net_lo': ('low end of the year net', 1000.0),
+    'year_end_balance': ('year-end balance', 1000.0),
+}
+_SOLVES: 'OrderedDict[str, dict]' = OrderedDict()
+_SOLVE_TOLERANCE = 1e-6  # SLSQP may stop a hair short of the constraint
+
+
+def _metrics(ctx: ForecastContext, p: dict, z: float) -> dict[str, float]:
+    """SOLVE_METRICS for one parameter set, unrounded so the optimiser sees a smooth surface."""
+    net, std, year_end = _summary(ctx, p)
+    return {'p_green': _p_green(net, std), 'net': net, 'net_lo': net - z * std, 'year_end_balance': year_end}
+
+
+def _check_solve(free: dict, target: dict) -> tuple[list[str], np.ndarray, np.ndarray, str, float]:
+    if not isinstance(free, dict) or not isinstance(target, dict):
+        raise ValueError('free and target must each map names to values.')
+    if not free or len(free) > config.FORECAST_SOLVE_MAX_FREE:
+        raise ValueError(f'Choose between 1 and {config.FORECAST_SOLVE_MAX_FREE} parameters to solve for.')
+    for k in free:
+        if k not in PARAM_LABELS or k in _BOOL_PARAMS | _INT_PARAMS | {'class_size_cap', 'confidence'}:
+            raise ValueError(f'{k!r} is not a continuous parameter the solver can vary.')
+    bounds = np.array([[float(lo), float(hi)] for lo, hi in free.values()])
+    if not np.all(bounds[:, 0] < bounds[:, 1]):
+        raise ValueError('Each parameter needs bounds [low, high] with low < high.')
+    metric = target.get('metric')
+    if metric not in SOLVE_METRICS:
+        raise ValueError(f'The target metric must be one of {", ".join(SOLVE_METRICS)}.')
+    return list(free), bounds[:, 0], bounds[:, 1], metric, float(target['at_least'])
+
+
+class _Seeker:
+    """One goal seek's objective: ``metric`` at each point of the free parameters, memoised for the solve."""
+
+    def __init__(self, ctx: ForecastContext, p: dict, z: float, names: list[str], metric: str, at_least: float):  # noqa: PLR0913
+        self.ctx, self.p, self.z, self.names = ctx, p, z, names
+        self.metric, self.at_least = metric, at_least
+        self.scale = SOLVE_METRICS[metric][1]
+        self.memo: dict[tuple, float] = {}
+
+    def __call__(self, x: np.ndarray) -> float:
+        key = tuple(np.round(np.asarray(x, float), 9))
+        if key not in self.memo:
+            p = {**self.p, **dict(zip(self.names, map(float, key)))}
+            self.memo[key] = _metrics(self.ctx, p, self.z)[self.metric]
+        return self.memo[key]
+
+    def slack(self, x: np.ndarray) -> float:
+        """How far ``x`` clears the target, in units of the metric's typical size (>= 0 means met)."""
+        return (self(x) - self.at_least) / self.scale
+
+    def seek(self, x0: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray | None:
+        """The point nearest ``x0`` (relative to each range) meeting the target, or None if none does."""
+        if self.slack(x0) >= 0:
+            return x0
+        if len(x0) == 1:
+            return self._seek_scalar(x0[0], lo[0], hi[0])
+        span = hi - lo
+        result = optimize.minimize(
+            lambda u: float(np.sum((u - (x0 - lo) / span) ** 2)),
+            (x0 - lo) / span,
+            method='SLSQP',
+            bounds=[(0.0, 1.0)] * len(x0),
+            constraints=[{'type': 'ineq', 'fun': lambda u: self.slack(lo + u * span)}],
+            options={'maxiter': 100, 'ftol': 1e-9},
+        )
+        x = np.clip(lo + result.x * span, lo, hi)
+        return x if self.slack(x) >= -_SOLVE_TOLERANCE else None
+
+    def _seek_scalar(self, x0: float, lo: float, hi: float) -> np.ndarray | None:
+        """In one dimension: the nearer of the two crossings of the target either side of ``x0``, if any."""
+        found = []
+        for edge in (lo, hi):
+            if edge != x0 and self.slack([edge]) >= 0:
+                root = optimize.brentq(lambda v: self.slack([v]), min(x0, edge), max(x0, edge), xtol=1e-6)
+                # step onto the side that meets the target
+                found.append(root if self.slack([root]) >= 0 else root + np.sign(edge - x0) * 1e-6)
+        return np.array([min(found, key=lambda v: abs(v - x0))]) if found else None
+
+    def best(self, x0: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        """The point within the bounds scoring highest on the metric, for a target that can't be met."""
+        if len(x0) == 1:
+            result = optimize.minimize_scalar(lambda v: -self([v]), bounds=(lo[0], hi[0]), method='bounded')
+            return np.array([result.x])
+        result = optimize.minimize(lambda x: -self(x), x0, method='L-BFGS-B', bounds=list(zip(lo, hi)))
+        return result.x
+
+
+def _trade_off(seeker: _Seeker, x0: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> list[dict]:
+    """The metric across the first parameter's range, or with several, the others' solution at each step."""
+    first, rest = seeker.names[0], seeker.names[1:]
+    rows = []
+    for v in np.linspace(lo[0], hi[0], config.FORECAST_SOLVE_CURVE_STEPS):
+        if not rest:
+            rows.append({first: round(float(v), 2), 'metric': round(seeker([v]), 3)})
+            continue
+        inner = _Seeker(seeker.ctx, {**seeker.p, first: float(v)}, seeker.z, rest, seeker.metric, seeker.at_least)
+        x = inner.seek(x0[1:], lo[1:], hi[1:])
+        solved = dict.fromkeys(rest) if x is None else {k: round(float(xi), 2) for k, xi in zip(rest, x)}
+        rows.append({first: round(float(v), 2), **solved})
+    return rows
+
+
+def solve(base: dict | None, free: dict, target: dict, confidence: float | None = None) -> dict:
+    """Goal seek: the smallest change to the ``free`` parameters, within their bounds, that meets ``target``.
+
+    ``free`` maps each continuous parameter to vary onto its ``[low, high]`` bounds; ``target`` is
+    ``{"metric": <one of SOLVE_METRICS>, "at_least": value}``, e.g. ``{"metric": "p_green", "at_least":
+    0.8}`` for "break even with 80% confidence". "Smallest" is measured relative to each parameter's
+    range from its value in ``base``. One parameter is solved by root-finding on its own (``brentq``),
+    several with SLSQP under the target as a constraint. If no point meets the target, the one scoring
+    best on the metric is returned with ``feasible`` false.
+
+    Every evaluation is a compiled ledger and a batch of sigma points (as in ``compare``), memoised for
+    the solve, and whole results are kept for FORECAST_SOLVE_CACHE_SIZE solves. The ``curve`` shows the
+    trade-off: the metric across the first parameter's range, or with several, the others' solution at
+    each of FORECAST_SOLVE_CURVE_STEPS values of the first.
+    """
+    names, lo, hi, metric, at_least = _check_solve(free, target)
     ctx = get_context()
-    p = _merge_params(ctx, overrides)
-    result = predict(overrides, confidence)
+    p = _merge_params(ctx, base or {})
+    conf = _confidence(p, confidence)
+    canonical = json.dumps([ctx.version, conf, p, free, metric, at_least], sort_keys=True, default=str)
+    key = hashlib.sha256(canonical.encode()).hexdigest()
+    with _RESULTS_LOCK:
+        if key in _SOLVES:
+            _SOLVES.move_to_end(key)
+            return _SOLVES[key]
+
+    seeker = _Seeker(ctx, p, _z(conf), names, metric, at_least)
+    x0 = np.clip([float(p[k]) for k in names], lo, hi)
+    x = seeker.seek(x0, lo, hi)
+    feasible = x is not None
+    if x is None:
+        x = seeker.best(x0, lo, hi)
+    result = {
+        'metric': metric,
+        'at_least': at_least,
+        'confidence': conf,
+        'feasible': feasible,
+        'base': {k: round(float(v), 2) for k, v in zip(names, x0)},
+        'optimum': {k: round(float(v), 4) for k, v in zip(names, x)},  # pennies could miss the target
+        'achieved': round(seeker(x), 3) + 0.0,  # + 0.0 turns a -0.0 into 0.0
+        'curve': _trade_off(seeker, x0, lo, hi),
+    }
+    with _RESULTS_LOCK:
+        _SOLVES[key] = result
+        while len(_SOLVES) > config.FORECAST_SOLVE_CACHE_SIZE:
+            _SOLVES.popitem(last=False)
+    return result
+
+
+# --------------------------------------------------------------------------------------------------
+# Download the whole scenario as a timestamped workbook
+# --------------------------------------------------------------------------------------------------
+def to_workbook(
+    overrides: dict | None, confidence: float | None, scenario: str | None = None, engine: str | None = None
+) -> bytes:
+    """Serialise a scenario (inputs + results) to an .xlsx for saving a what-if variant.
+
+    ``scenario`` is the token from a ``predict`` result: while that result is still memoised it is
+    exported exactly as shown, without re-running the forecast. Otherwise (the token has been evicted, or
+    another worker served the prediction) the scenario is rebuilt from ``overrides``, ``confidence`` and
+    ``engine``.
+    """
+    p, result = _cached_scenario(scenario) or _scenario(overrides, confidence, engine)
 
-    wb = openpyxl.Workbook()
-    meta = wb.active
-    meta.title = 'summary'
+    # write-only mode streams each row straight to the sheet's XML rather than building a cell tree
+    wb = openpyxl.Workbook(write_only=True)
+    meta = wb.create_sheet('summary')
     meta.append(['ESDS forecast scenario'])
     meta.append(['generated', datetime.datetime.now().isoformat(timespec='seconds')])
     meta.append(['confidence', result['confidence']])
@@ -1131,6 +1931,7 @@ def to_workbook(overrides: dict | None, confidence: float | None) -> bytes:
         ]
     )
     meta.append(['probability of surplus', result['p_green']])
+    meta.append(['uncertainty engine', result['engine']['name'], result['engine']['samples']])
 
     budget = wb.create_sheet('budget')
     budget.append(['category', 'kind', 'amount'])
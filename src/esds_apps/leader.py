@@ -0,0 +1,76 @@
+"""Elect one worker process to run the background pollers.
+
+When uvicorn runs several workers, each one goes through ``lifespan_manager``. The Dancecloud card
+poller must only run once, otherwise every worker would email each new member. Workers compete for
+an exclusive ``flock`` on a file in CACHE_ROOT. The holder runs the pollers and the others retry now
+and then. The kernel drops the lock when its holder exits, even after a crash, so another worker
+takes over within one retry interval and no lease ever goes stale.
+"""
+
+import asyncio
+import fcntl
+import logging
+import os
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from esds_apps import config
+
+log = logging.getLogger(__name__)
+
+
+class LeaderLease:
+    """A non-blocking, process-wide exclusive lock on ``{lock_root}/{name}.leader.lock``."""
+
+    def __init__(self, name: str, lock_root: str = config.CACHE_ROOT):
+        self.name = name
+        self.path = Path(lock_root) / f'{name}.leader.lock'
+        os.makedirs(self.path.parent, exist_ok=True)
+        self._fd: Optional[int] = None
+
+    @property
+    def is_held(self) -> bool:
+        """Whether this process currently holds the lease."""
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        """Take the lease if no other process holds it. Returns whether this process now holds it."""
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        log.info(f'Process {os.getpid()} is now the {self.name} leader.')
+        return True
+
+    def release(self) -> None:
+        """Give up the lease, if held, so another worker can take over."""
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+            log.info(f'Process {os.getpid()} released the {self.name} leadership.')
+
+
+async def run_as_leader(
+    lease: LeaderLease,
+    task: Callable[[], Awaitable[None]],
+    retry_interval_s: float = config.LEADER_RETRY_INTERVAL_S,
+) -> None:
+    """Wait until this process holds ``lease``, then run ``task`` while holding it.
+
+    Meant to be started as an asyncio task from the lifespan and cancelled on shutdown; the lease is
+    released however ``task`` ends, so a standby worker can pick the job up.
+    """
+    while not lease.try_acquire():
+        await asyncio.sleep(retry_interval_s)
+    try:
+        await task()
+    finally:
+        lease.release()
@@ -1,20 +1,20 @@
 import asyncio
 import csv
 import io
+import json
 import logging
 import re
 import sqlite3
 import uuid
 from contextlib import asynccontextmanager
 from dataclasses import asdict
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from http import HTTPStatus
 from io import BytesIO
 from pathlib import Path
-from typing import List
+from typing import Any, Callable, List
 from urllib.parse import urlparse
 
-import httpx
 import pytz
 import segno
 from fastapi import Depends, FastAPI, Form, HTTPException, Query, Request
@@ -22,8 +22,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
-from esds_apps import config, forecast
-from esds_apps.attendance import analysis
+from esds_apps import card_bundle, card_check_proxy, config, executors, forecast, timing
+from esds_apps.attendance import analysis, result_cache
+from esds_apps.attendance.attendance_db import read_connection
 from esds_apps.auth import build_login_redirect, handle_oauth_callback, login_required, require_valid_cookie
 from esds_apps.classes import MembershipCardStatus, PrintablePdfError
 from esds_apps.dancecloud_interface import (
@@ -35,6 +36,8 @@ from esds_apps.dancecloud_interface import (
     remove_pos_permissions,
     set_membership_card_status,
 )
+from esds_apps.executors import ATTENDANCE_POOL, FORECAST_POOL, RENDER_POOL, ExecutorOverloaded
+from esds_apps.leader import LeaderLease, run_as_leader
 from esds_apps.membership_cards import auto_issue_unissued_cards, generate_card_front_png, printable_pdf
 from esds_apps.pass2u_interface import (
     MAP_CARD_NUMBER_TO_WALLET_PASS_ID_CACHE,
@@ -58,6 +61,11 @@ _SAFE_FILENAME_RE = re.compile(r'[^\w\-.]')
 # Responses carrying name ciphertext (or the salt/sentinel used to decrypt it) must not be cached,
 # so nothing that could be decrypted to PII survives in the browser cache after the tab is closed.
 _NO_STORE = {'Cache-Control': 'no-store'}
+# Everything else under /attendance may be kept, but only by the signed-in browser, which revalidates it
+# with the ETag each time (a 304 while the attendance DB is unchanged).
+_REVALIDATE = {'Cache-Control': 'private, no-cache'}
+# The scatter payload's dates count days from here.
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
 
 
 def _safe_filename(name: str) -> str:
@@ -86,44 +94,80 @@ def _attendance_activity_rows() -> list[dict]:
     if not Path(config.ATTENDANCE_DB_PATH).exists():
         raise FileNotFoundError(config.ATTENDANCE_DB_PATH)
 
-    conn = sqlite3.connect(config.ATTENDANCE_DB_PATH)
-    try:
-        conn.row_factory = sqlite3.Row
-        rows = conn.execute(
-            """
-            SELECT av.activity_id,
-                   av.date,
-                   e.name   AS event_name,
-                   av.event_type,
-                   act.name AS activity_name,
-                   av.activity_type,
-                   av.difficulty,
-                   av.named_total,
-                   av.aggregate_total,
-                   av.total,
-                   av.named_unknown,
-                   av.named_registered,
-                   COALESCE(wl.n, 0) AS waitlisted
-            FROM activity_attendance av
-            JOIN event e    ON e.event_id      = av.event_id
-            JOIN activity act ON act.activity_id = av.activity_id
-            LEFT JOIN (SELECT event_id, COUNT(*) AS n FROM waitlist GROUP BY event_id) wl
-                   ON wl.event_id = av.event_id
-            ORDER BY av.date
-            """
-        ).fetchall()
-    finally:
-        conn.close()
+    cur = read_connection(config.ATTENDANCE_DB_PATH).cursor()
+    cur.row_factory = sqlite3.Row
+    rows = cur.execute(
+        """
+        SELECT av.activity_id,
+               av.date,
+               e.name   AS event_name,
+               av.event_type,
+               act.name AS activity_name,
+               av.activity_type,
+               av.difficulty,
+               av.named_total,
+               av.aggregate_total,
+               av.total,
+               av.named_unknown,
+               av.named_registered,
+               COALESCE(wl.n, 0) AS waitlisted
+        FROM activity_attendance av
+        JOIN event e    ON e.event_id      = av.event_id
+        JOIN activity act ON act.activity_id = av.activity_id
+        LEFT JOIN (SELECT event_id, COUNT(*) AS n FROM waitlist GROUP BY event_id) wl
+               ON wl.event_id = av.event_id
+        ORDER BY av.date
+        """
+    ).fetchall()
     return [dict(r) for r in rows]
 
 
+def _dictionary_encode(values) -> tuple[list, list[int]]:
+    """(the distinct values in order of first appearance, each value's index into them)."""
+    codes: dict = {}
+    indices = [codes.setdefault(v, len(codes)) for v in values]
+    return list(codes), indices
+
+
+def _activity_columns(rows: list[dict]) -> dict:
+    """The scatter rows of ``_attendance_activity_rows`` column by column, for a far smaller payload.
+
+    Each column is one list over the rows, so no key name is repeated per activity. Repeating strings
+    (activity name, activity type, difficulty) are dictionary-encoded as ``{'values': [...], 'index':
+    [...]}``, and the per-event fields (name, type, waitlist) are stored once per event in ``events``
+    and referenced by ``event``. ``day`` holds whole days, the first since 1970-01-01 and each of the
+    rest since the row before (the rows are in date order), so the browser rebuilds the dates with a
+    running sum.
+    """
+    events, event_index = _dictionary_encode((r['event_name'], r['event_type'], r['waitlisted']) for r in rows)
+    days = [date.fromisoformat(r['date'][:10]).toordinal() - _EPOCH_ORDINAL for r in rows]
+    columns = {
+        'n': len(rows),
+        'activity_id': [r['activity_id'] for r in rows],
+        'day': [b - a for a, b in zip([0, *days], days)],
+        'event': event_index,
+        'events': {field: [e[i] for e in events] for i, field in enumerate(('name', 'event_type', 'waitlisted'))},
+    }
+    for field in ('activity_name', 'activity_type', 'difficulty'):
+        values, index = _dictionary_encode(r[field] for r in rows)
+        columns[field] = {'values': values, 'index': index}
+    for field in ('named_total', 'aggregate_total', 'total', 'named_unknown', 'named_registered'):
+        columns[field] = [r[field] for r in rows]
+    return columns
+
+
 @asynccontextmanager
 async def lifespan_manager(_: FastAPI):
-    """Create an async task that periodically issues unissued cards."""
-    dc_poller = asyncio.create_task(auto_issue_unissued_cards())
+    """Create an async task that periodically issues unissued cards.
+
+    With several workers, only the one holding the poller lease runs it; the others stand by in case
+    the leader exits, so each new card is still emailed exactly once.
+    """
+    dc_poller = asyncio.create_task(run_as_leader(LeaderLease('dc_poller'), auto_issue_unissued_cards))
     try:
         yield
     finally:
+        await card_check_proxy.close_client()
         dc_poller.cancel()
         try:
             await dc_poller
@@ -146,6 +190,16 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(ExecutorOverloaded)
+async def executor_overloaded_handler(request: Request, exc: ExecutorOverloaded):
+    """Turn a rejected pool submission into a 503 the client can back off and retry."""
+    return JSONResponse(
+        {'error': str(exc)},
+        status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+        headers={'Retry-After': str(exc.retry_after_s)},
+    )
+
+
 @app.exception_handler(Exception)
 async def internal_server_error_handler(request: Request, exc: Exception):
     log.exception(f'Unhandled exception on {request.method} {request.url}: {exc}')
@@ -163,23 +217,44 @@ async def attendance_overview(request: Request):
     return config.TEMPLATES.TemplateResponse(request, 'attendance.html')
 
 
-@app.get('/attendance/activities.json')
-async def attendance_activities(request: Request, _: None = Depends(require_valid_cookie)):
-    """Serve the all-activities scatter data as JSON for the client-side ECharts chart.
+async def _attendance_json(request: Request, key: tuple, compute: Callable[[], Any], headers: dict) -> Response:
+    """Serve ``compute()`` as JSON through the attendance result cache, with its ETag.
 
-    Guarded by the cookie dependency (not the redirecting login_required) so an unauthenticated
-    fetch gets a clean 401 rather than a 302 into Google's OAuth flow.
+    A request whose ``If-None-Match`` already names the current ETag gets a bodiless 304; a cache hit never
+    leaves the event loop. The body goes gzipped to clients that accept it. A missing attendance database
+    is a 503.
     """
     try:
-        return JSONResponse(
-            {'activities': _attendance_activity_rows(), 'early_term_means': analysis.early_term_means()}
-        )
+        cached = result_cache.lookup(key) or await ATTENDANCE_POOL.run(result_cache.get, key, compute)
     except FileNotFoundError:
         log.warning('Attendance database not found at %s', config.ATTENDANCE_DB_PATH)
         return JSONResponse(
             {'error': 'The attendance database has not been built yet.'},
             status_code=HTTPStatus.SERVICE_UNAVAILABLE,
         )
+    body, encoding = cached.encoded(request.headers.get('accept-encoding'))
+    headers = {**headers, **encoding}
+    if cached.matches(request.headers.get('if-none-match')):
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+    return Response(body, media_type='application/json', headers=headers)
+
+
+@app.get('/attendance/activities.json')
+async def attendance_activities(request: Request, _: None = Depends(require_valid_cookie)):
+    """Serve the all-activities scatter data as JSON for the client-side ECharts chart.
+
+    ``activities`` is columnar (see ``_activity_columns``). Guarded by the cookie dependency (not the
+    redirecting login_required) so an unauthenticated fetch gets a clean 401 rather than a 302 into
+    Google's OAuth flow.
+    """
+
+    def compute() -> dict:
+        return {
+            'activities': _activity_columns(_attendance_activity_rows()),
+            'early_term_means': analysis.early_term_means(),
+        }
+
+    return await _attendance_json(request, ('activities',), compute, _REVALIDATE)
 
 
 @app.get('/attendance/summaries.json')
@@ -189,14 +264,7 @@ async def attendance_summaries(request: Request, _: None = Depends(require_valid
     Sent ``no-store`` because the retention dataset carries teacher-name ciphertext for the
     browser to decrypt: nothing derived from it should linger in the disk cache.
     """
-    try:
-        return JSONResponse(analysis.summaries(), headers=_NO_STORE)
-    except FileNotFoundError:
-        log.warning('Attendance database not found at %s', config.ATTENDANCE_DB_PATH)
-        return JSONResponse(
-            {'error': 'The attendance database has not been built yet.'},
-            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
-        )
+    return await _attendance_json(request, ('summaries',), analysis.summaries, _NO_STORE)
 
 
 @app.get('/attendance/decrypt-params')
@@ -205,14 +273,7 @@ async def attendance_decrypt_params(request: Request, _: None = Depends(require_
 
     Neither value is secret; the passphrase and the key derived from it never leave the browser.
     """
-    try:
-        return JSONResponse(analysis.decrypt_params(), headers=_NO_STORE)
-    except FileNotFoundError:
-        log.warning('Attendance database not found at %s', config.ATTENDANCE_DB_PATH)
-        return JSONResponse(
-            {'error': 'The attendance database has not been built yet.'},
-            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
-        )
+    return await _attendance_json(request, ('decrypt_params',), analysis.decrypt_params, _NO_STORE)
 
 
 @app.get('/attendance/activity/{activity_id}/records.json')
@@ -224,15 +285,65 @@ async def attendance_activity_records(request: Request, activity_id: int, _: Non
     plaintext names. Guarded by the cookie dependency so an unauthenticated request gets a clean
     401 rather than a redirect into Google's OAuth flow; ``no-store`` so the ciphertext isn't cached.
     """
+
+    def compute() -> dict:
+        return {'activity_id': activity_id, 'rows': analysis.activity_records(activity_id)}
+
+    return await _attendance_json(request, ('activity_records', activity_id), compute, _NO_STORE)
+
+
+def _ndjson_line(item: dict) -> bytes:
+    return json.dumps(item, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode() + b'\n'
+
+
+async def _activity_records_ndjson(activity_ids: list[int]) -> Response:
+    """Stream the records of ``activity_ids`` as NDJSON, one ``analysis.activity_record_chunk`` after another.
+
+    Each activity is read on the attendance pool as the stream reaches it, so the browser can decrypt
+    the first rows while later ones are still being read. The last line is ``{"end": {"activities": n}}``;
+    a stream without it was cut short. The first activity is read before the response starts, so a
+    missing database is still a 503.
+    """
     try:
-        rows = analysis.activity_records(activity_id)
+        first = await ATTENDANCE_POOL.run(analysis.activity_record_chunk, activity_ids[0])
     except FileNotFoundError:
         log.warning('Attendance database not found at %s', config.ATTENDANCE_DB_PATH)
         return JSONResponse(
             {'error': 'The attendance database has not been built yet.'},
             status_code=HTTPStatus.SERVICE_UNAVAILABLE,
         )
-    return JSONResponse({'activity_id': activity_id, 'rows': rows}, headers=_NO_STORE)
+
+    async def lines():
+        chunk = first
+        for i, activity_id in enumerate(activity_ids):
+            if i:
+                chunk = await ATTENDANCE_POOL.run(analysis.activity_record_chunk, activity_id)
+            yield b''.join(_ndjson_line(item) for item in chunk)
+        yield _ndjson_line({'end': {'activities': len(activity_ids)}})
+
+    return StreamingResponse(lines(), media_type='application/x-ndjson', headers=_NO_STORE)
+
+
+@app.get('/attendance/activity/{activity_id}/records.ndjson')
+async def attendance_activity_records_ndjson(activity_id: int, _: None = Depends(require_valid_cookie)):
+    """One activity's records as streamed NDJSON: the context once, then slim records (see ``records.json``).
+
+    ``no-store`` so the ciphertext isn't cached.
+    """
+    return await _activity_records_ndjson([activity_id])
+
+
+@app.get('/attendance/activities/records.ndjson')
+async def attendance_activities_records_ndjson(
+    activity_id: list[int] = Query(min_length=1, max_length=config.ATTENDANCE_RECORDS_EXPORT_MAX_ACTIVITIES),
+    _: None = Depends(require_valid_cookie),
+):
+    """The records of several activities (e.g. every activity of an event) in one NDJSON stream.
+
+    Takes ``activity_id`` repeated in the query string; each activity's context line is followed by
+    its records. Unknown ids are skipped. ``no-store`` so the ciphertext isn't cached.
+    """
+    return await _activity_records_ndjson(activity_id)
 
 
 @app.get('/attendance/community/dancers.json')
@@ -249,15 +360,12 @@ async def attendance_community_dancers(
     'incl' or 'excl' for whether the 30th anniversary weekender counts. ``no-store`` so the
     ciphertext isn't cached.
     """
-    try:
+
+    def compute() -> dict:
         dancers = analysis.community_2026_dancer_rows(scope, min_dates)
-    except FileNotFoundError:
-        log.warning('Attendance database not found at %s', config.ATTENDANCE_DB_PATH)
-        return JSONResponse(
-            {'error': 'The attendance database has not been built yet.'},
-            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
-        )
-    return JSONResponse({'scope': scope, 'min_dates': min_dates, 'dancers': dancers}, headers=_NO_STORE)
+        return {'scope': scope, 'min_dates': min_dates, 'dancers': dancers}
+
+    return await _attendance_json(request, ('community_dancers', scope, min_dates), compute, _NO_STORE)
 
 
 @app.get('/attendance/community/term-dancers.json')
@@ -275,18 +383,19 @@ async def attendance_community_term_dancers(
     weekender counts. Each row is ``{dancer_id, enc_name}``; the browser decrypts ``enc_name`` into
     the CSV's name columns. ``no-store`` so the ciphertext isn't cached.
     """
-    try:
+
+    def compute() -> dict:
         dancers = analysis.termly_active_dancer_rows(term_start, scope, min_activities)
-    except FileNotFoundError:
-        log.warning('Attendance database not found at %s', config.ATTENDANCE_DB_PATH)
-        return JSONResponse(
-            {'error': 'The attendance database has not been built yet.'},
-            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
-        )
-    return JSONResponse(
-        {'term_start': term_start, 'scope': scope, 'min_activities': min_activities, 'dancers': dancers},
-        headers=_NO_STORE,
-    )
+        return {'term_start': term_start, 'scope': scope, 'min_activities': min_activities, 'dancers': dancers}
+
+    key = ('community_term_dancers', term_start, scope, min_activities)
+    return await _attendance_json(request, key, compute, _NO_STORE)
+
+
+def _forecast_page_data() -> tuple[dict, dict]:
+    """The forecast defaults and the prediction they give, for the initial render of /forecast."""
+    ctx = forecast.get_context()
+    return forecast.default_params(ctx), forecast.predict()
 
 
 @app.get('/forecast', response_class=HTMLResponse)
@@ -298,9 +407,7 @@ async def forecast_page(request: Request):
     numbers immediately; the browser only re-predicts when the operator changes a control.
     """
     try:
-        ctx = forecast.get_context()
-        initial = forecast.predict()
-        defaults = forecast.default_params(ctx)
+        defaults, initial = await FORECAST_POOL.run(_forecast_page_data)
     except FileNotFoundError as e:
         log.warning('Forecast unavailable, missing %s', e)
         return config.TEMPLATES.TemplateResponse(
@@ -312,32 +419,117 @@ async def forecast_page(request: Request):
 
 
 @app.post('/forecast/predict.json')
-async def forecast_predict(request: Request, _: None = Depends(require_valid_cookie)):
+async def forecast_predict(
+    request: Request,
+    debug: str | None = Query(None, pattern='^timing$'),
+    _: None = Depends(require_valid_cookie),
+):
     """Re-run the forecast for the operator's current control values and return the updated result.
 
     Guarded by the cookie dependency (not the redirecting login_required) so an expired session gets a
-    clean 401 the frontend can surface, rather than a 302 into Google's OAuth flow.
+    clean 401 the frontend can surface, rather than a 302 into Google's OAuth flow. The body's optional
+    ``engine`` picks how the uncertainty is propagated (see ``forecast.ENGINES``).
+
+    The time each stage took is sent as a ``Server-Timing`` header (shown in the browser's network
+    panel); ``?debug=timing`` also adds it to the payload as ``timing``, in milliseconds.
+    """
+    body = await request.json()
+    with timing.record() as timings:
+        try:
+            with timing.span('forecast_pool'):
+                result = await FORECAST_POOL.run(
+                    forecast.predict, body.get('params') or {}, body.get('confidence'), body.get('engine')
+                )
+        except FileNotFoundError:
+            return JSONResponse(
+                {'error': 'The forecast data has not been set up yet.'}, status_code=HTTPStatus.SERVICE_UNAVAILABLE
+            )
+        except ValueError as e:
+            return JSONResponse({'error': str(e)}, status_code=HTTPStatus.BAD_REQUEST)
+        if debug == 'timing':
+            result = {**result, 'timing': timings.as_dict()}  # results are shared with the cache: copy
+        with timing.span('encode'):
+            response = JSONResponse(result)
+    response.headers['Server-Timing'] = timings.header()
+    return response
+
+
+@app.post('/forecast/compare.json')
+async def forecast_compare(request: Request, _: None = Depends(require_valid_cookie)):
+    """Headline figures for many what-ifs in one round-trip, e.g. the net across a sweep of class prices.
+
+    The body holds the base ``params`` and ``confidence`` as for predict.json, plus either ``scenarios``
+    (a list of overrides applied on top of the base) or ``sweep`` (``{"param": .., "values": [..]}`` or
+    ``{"param": .., "start": .., "stop": .., "steps": ..}``).
+    """
+    body = await request.json()
+    spec = body.get('sweep')
+    if spec is not None and not isinstance(spec, dict):
+        return JSONResponse({'error': 'sweep must be an object.'}, status_code=HTTPStatus.BAD_REQUEST)
+
+    def compare() -> list[dict]:
+        scenarios = forecast.sweep(**spec) if spec else body.get('scenarios') or []
+        return forecast.compare(body.get('params') or {}, scenarios, body.get('confidence'))
+
+    try:
+        rows = await FORECAST_POOL.run(compare)
+    except FileNotFoundError:
+        return JSONResponse(
+            {'error': 'The forecast data has not been set up yet.'}, status_code=HTTPStatus.SERVICE_UNAVAILABLE
+        )
+    except (TypeError, ValueError) as e:
+        return JSONResponse({'error': str(e)}, status_code=HTTPStatus.BAD_REQUEST)
+    return JSONResponse({'scenarios': rows})
+
+
+@app.post('/forecast/solve.json')
+async def forecast_solve(request: Request, _: None = Depends(require_valid_cookie)):
+    """Goal seek, e.g. the class price that gives an 80% chance of breaking even.
+
+    The body holds the base ``params`` and ``confidence`` as for predict.json, ``free`` (the parameters
+    to vary, each mapped to its ``[low, high]`` bounds) and ``target`` (``{"metric": "p_green",
+    "at_least": 0.8}``); see ``forecast.solve`` for the result.
     """
     body = await request.json()
     try:
-        result = forecast.predict(body.get('params') or {}, body.get('confidence'))
+        result = await FORECAST_POOL.run(
+            forecast.solve,
+            body.get('params') or {},
+            body.get('free') or {},
+            body.get('target') or {},
+            body.get('confidence'),
+        )
     except FileNotFoundError:
         return JSONResponse(
             {'error': 'The forecast data has not been set up yet.'}, status_code=HTTPStatus.SERVICE_UNAVAILABLE
         )
+    except (KeyError, TypeError, ValueError) as e:
+        return JSONResponse({'error': f'Bad goal seek: {e}'}, status_code=HTTPStatus.BAD_REQUEST)
     return JSONResponse(result)
 
 
 @app.post('/forecast/download.xlsx')
 async def forecast_download(request: Request, _: None = Depends(require_valid_cookie)):
-    """Download the current what-if scenario (inputs + results) as a timestamped workbook."""
+    """Download the current what-if scenario (inputs + results) as a timestamped workbook.
+
+    The body carries the ``scenario`` token of the forecast on screen, so the download reuses it rather
+    than re-running the forecast; ``params`` and ``confidence`` are the fallback if it has been evicted.
+    """
     body = await request.json()
     try:
-        content = forecast.to_workbook(body.get('params') or {}, body.get('confidence'))
+        content = await FORECAST_POOL.run(
+            forecast.to_workbook,
+            body.get('params') or {},
+            body.get('confidence'),
+            body.get('scenario'),
+            body.get('engine'),
+        )
     except FileNotFoundError:
         return JSONResponse(
             {'error': 'The forecast data has not been set up yet.'}, status_code=HTTPStatus.SERVICE_UNAVAILABLE
         )
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=HTTPStatus.BAD_REQUEST)
     stamp = datetime.now(pytz.timezone('Europe/London')).strftime('%Y%m%d_%H%M%S')
     return Response(
         content=content,
@@ -351,6 +543,12 @@ async def health():
     return {'status': 'ok'}
 
 
+@app.get('/health/metrics')
+async def health_metrics(_: None = Depends(require_valid_cookie)):
+    """Load and latency counters for the blocking-work pools and the card-check proxy."""
+    return {'executors': executors.metrics(), 'card_check_proxy': card_check_proxy.metrics()}
+
+
 @app.get('/auth/login')
 async def auth_login(request: Request, next: str = '/'):
     return build_login_redirect(next)
@@ -411,16 +609,26 @@ async def scanner(request: Request):
     return config.TEMPLATES.TemplateResponse(request, 'rapid_scanner.html')
 
 
+@app.get('/membership-cards/scanner/bundle.json')
+async def scanner_card_bundle(since: str | None = None):
+    """The valid-card bundle the rapid scanner checks scans against locally.
+
+    Public, like the scanner and its proxy: entries are keyed by a hash of each card's check URL and
+    carry only an expiry date and status, so the bundle reveals nothing about a card that hasn't been
+    scanned. Pass the ``version`` of a bundle already held as ``since`` to get only what changed.
+    """
+    return JSONResponse(await card_bundle.bundle(since), headers={'Cache-Control': 'no-cache'})
+
+
 @app.get('/proxy-card-check')
 async def proxy_card_check(url: str):
     """Prevent CORS from blocking access between the client and Dancecloud.
 
-    Used together with the /membership-cards/scanner route.
+    Used together with the /membership-cards/scanner route. Responses are streamed through a shared
+    keep-alive client, and repeat scans of the same card within a few seconds are served from memory.
     """
-    if url.startswith(config.DC_HOST):
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            resp = await client.get(url)
-        return Response(content=resp.content, status_code=resp.status_code, media_type=resp.headers.get('content-type'))
+    if url.startswith(config.DC_HOST + '/'):
+        return await card_check_proxy.proxy(url)
     else:
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail='URL not permitted.')
 
@@ -508,6 +716,7 @@ async def reissue_card(
 
     # reissue the card via dancecloud - this will cause the periodic check to pick it up and issue an email later on.
     await reissue_membership_card(card_uuid, reason)
+    card_bundle.expire()
     log.info(f'Reissued card with UUID {card_uuid} because it was {reason}')
 
     # Redirect back to the table view
@@ -530,6 +739,7 @@ async def cancel_card(
 
     # reissue the card via dancecloud - this will cause the periodic check to pick it up and issue an email later on.
     await set_membership_card_status(card_uuid, MembershipCardStatus.CANCELLED)
+    card_bundle.expire()
     log.info(f'Cancelled card with UUID {card_uuid}')
 
     # Redirect back to the table view
@@ -547,7 +757,7 @@ async def fetch_card_front(request: Request, card_number: int, _: None = Depends
             f'found {len(matching_cards)} card(s), but expected exactly one.',
         )
 
-    return Response(content=generate_card_front_png(matching_cards[0]), media_type='image/png')
+    return Response(content=await RENDER_POOL.run(generate_card_front_png, matching_cards[0]), media_type='image/png')
 
 
 @app.get('/membership-cards/{card_uuid}/wallet-pass', response_class=RedirectResponse)
@@ -664,6 +874,12 @@ async def qr_codes_table(request: Request):
     )
 
 
+def _render_qr_code(url: str, kind: str, scale: int) -> bytes:
+    buf = io.BytesIO()
+    segno.make(url).save(buf, kind=kind, scale=scale)
+    return buf.getvalue()
+
+
 # Endpoint to serve the QR code image (SVG or PNG)
 @app.get('/qr-codes/{code_id}/qr.{fmt}')
 @login_required
@@ -672,24 +888,18 @@ async def serve_tracked_qr_code(request: Request, code_id: str, fmt: str):
     if not qr_info:
         return Response('QR code not found', status_code=404)
     qr_url = f'{config.BASE_URL}/s/{code_id}'
-    qr = segno.make(qr_url)
-    buf = io.BytesIO()
     # Use description for filename, fallback to code_id
     desc = qr_info.get('description') or code_id
     safe_desc = _safe_filename(desc)
     if fmt == 'svg':
-        qr.save(buf, kind='svg', scale=4)
-        buf.seek(0)
         return Response(
-            content=buf.read(),
+            content=await RENDER_POOL.run(_render_qr_code, qr_url, 'svg', 4),
             media_type='image/svg+xml',
             headers={'Content-Disposition': f'attachment; filename="{safe_desc}.svg"'},
         )
     elif fmt == 'png':
-        qr.save(buf, kind='png', scale=32)
-        buf.seek(0)
         return Response(
-            content=buf.read(),
+            content=await RENDER_POOL.run(_render_qr_code, qr_url, 'png', 32),
             media_type='image/png',
             headers={'Content-Disposition': f'attachment; filename="{safe_desc}.png"'},
         )
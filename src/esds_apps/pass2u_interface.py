@@ -52,13 +52,10 @@ async def create_wallet_pass(card: MembershipCard) -> str:
 
         # save the mapping of {card_number: pass_id} in a very long term cache
         # (yes, this should obviously be a db), as we will need it later to void cards.
-        current_cache_content = MAP_CARD_NUMBER_TO_WALLET_PASS_ID_CACHE.read()
-        if current_cache_content:
-            current_cache_content[card.card_number] = result['passId']
-        else:
-            current_cache_content = {card.card_number: result['passId']}
-        MAP_CARD_NUMBER_TO_WALLET_PASS_ID_CACHE.clear()
-        MAP_CARD_NUMBER_TO_WALLET_PASS_ID_CACHE.write(current_cache_content)
+        # The update is atomic, so passes created at the same time by other workers aren't lost.
+        MAP_CARD_NUMBER_TO_WALLET_PASS_ID_CACHE.update(
+            lambda current: {**(current or {}), str(card.card_number): result['passId']}
+        )
 
     return result['passId']
 
@@ -87,9 +84,9 @@ async def void_wallet_pass_if_exists(card: MembershipCard) -> None:
         log.info(f'wallet pass for card number {card_number} voided.')
 
         # remove voided wallet pass from cache
-        del current_cache_content[str(card_number)]
-        MAP_CARD_NUMBER_TO_WALLET_PASS_ID_CACHE.clear()
-        MAP_CARD_NUMBER_TO_WALLET_PASS_ID_CACHE.write(current_cache_content)
+        MAP_CARD_NUMBER_TO_WALLET_PASS_ID_CACHE.update(
+            lambda current: {k: v for k, v in (current or {}).items() if k != str(card_number)}
+        )
     else:
         log.info(
             f'Could not void wallet pass for card number {card_number} as no wallet pass was found in the local cache.'
@@ -0,0 +1,19 @@
+"""Production entrypoint: ``python -m esds_apps.serve``.
+
+Runs uvicorn with config.WORKERS worker processes. The workers share everything that has to stay
+consistent between them through files in CACHE_ROOT: the QR code database, the SimpleCache files
+(flock-guarded) and the leader lease that keeps the background pollers to one worker.
+Per-process caches (the forecast context, Google tokens) are rebuilt independently by each worker.
+"""
+
+import uvicorn
+
+from esds_apps import config
+
+
+def main() -> None:
+    uvicorn.run('esds_apps.main:app', host='0.0.0.0', port=8080, workers=config.WORKERS)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,12 @@
+import fcntl
 import json
 import logging
 import os
+import tempfile
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Union
+from typing import Callable, Iterator, Optional, Union
 
 from esds_apps.config import CACHE_ROOT
 
@@ -15,6 +18,10 @@ class SimpleCache:
 
     Being file-based means it persists between restarts.
     It also awkwardly means it counts as a global, but don't tell the linter that...
+
+    Several worker processes may share one cache directory, so every operation holds an flock on
+    ``{name}.lock`` (shared for reads, exclusive otherwise) and files are written to a temporary name and
+    renamed into place, so readers never see a half-written file. Use ``update`` for read-modify-write.
     """
 
     def __init__(self, name: str, max_age_s: float, cache_root: str = CACHE_ROOT):
@@ -26,12 +33,34 @@ class SimpleCache:
 
         assert self.max_age_s >= 0
 
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        with open(self.cache_root / f'{self.name}.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
     def read(self) -> Optional[Union[dict, list]]:
         """Read the cache.
 
         If a sufficiently new cache file is available, load and return it.
         Otherwise, delete any old cache files and return None.
         """
+        with self._locked(exclusive=False):
+            data = self._read_current()
+        if data is None:
+            # expired or corrupt files are removed under the exclusive lock, re-checking first in case
+            # another worker wrote a fresh file in between.
+            with self._locked(exclusive=True):
+                data = self._read_current()
+                if data is None:
+                    log.info(f'{self.name} cache is empty or out of date.')
+                    self._clear()
+        return data
+
+    def _read_current(self) -> Optional[Union[dict, list]]:
         current_dt = datetime.now()
         for path in self.cache_root.glob(f'{self.file_prefix}*.json'):
             log.debug(f'found {path}')
@@ -43,27 +72,50 @@ class SimpleCache:
                         return json.load(f)
                 except (json.JSONDecodeError, OSError) as e:
                     log.warning(f'Cache file {path} is corrupt or unreadable ({e}); discarding.')
-                    os.remove(path)
                     return None
-
-        log.info(f'{self.name} cache is empty or out of date.')
-        self.clear()
         return None
 
     def write(self, data: Union[dict, list]) -> None:
         """Write new data to the cache."""
-        with open(
-            self.cache_root / f'{self.file_prefix}{self.to_os_safe_iso_timestamp(datetime.now())}.json', 'w'
-        ) as fh:
-            json.dump(data, fh)
-            log.debug(f'New data added to {self.name} cache.')
+        with self._locked(exclusive=True):
+            self._write(data)
+
+    def _write(self, data: Union[dict, list]) -> Path:
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_root, prefix=f'.{self.file_prefix}', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as fh:
+                json.dump(data, fh)
+            path = self.cache_root / f'{self.file_prefix}{self.to_os_safe_iso_timestamp(datetime.now())}.json'
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        log.debug(f'New data added to {self.name} cache.')
+        return path
 
     def clear(self) -> None:
         """Clear the cache."""
+        with self._locked(exclusive=True):
+            self._clear()
+
+    def _clear(self, keep: Optional[Path] = None) -> None:
         for path in self.cache_root.glob(f'{self.file_prefix}*.json'):
-            os.remove(path)
+            if path != keep:
+                os.remove(path)
         log.debug(f'{self.name} cache cleared.')
 
+    def update(self, fn: Callable[[Optional[Union[dict, list]]], Union[dict, list]]) -> Union[dict, list]:
+        """Replace the cached data with ``fn(current data or None)`` atomically, and return the new data.
+
+        The exclusive lock is held throughout, so concurrent updates from other workers are applied one
+        after another rather than overwriting each other. The old files are only removed once the new one
+        is in place, so a failed write leaves the previous data cached.
+        """
+        with self._locked(exclusive=True):
+            data = fn(self._read_current())
+            self._clear(keep=self._write(data))
+        return data
+
     @staticmethod
     def to_os_safe_iso_timestamp(dt: datetime) -> str:
         """Return a filename-safe ISO 8601 timestamp string.
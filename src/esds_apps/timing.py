@@ -0,0 +1,61 @@
+"""Per-request stage timings, reported to the browser as a ``Server-Timing`` header.
+
+A route opens a recording with ``record()``; the code it calls wraps its stages in ``span('name')``,
+including work handed to an executor pool (which copies context variables, so the spans land in the
+same recording). Outside a recording ``span`` only looks up a context variable, so library code can be
+instrumented freely. Repeated spans of the same name add up, and nested spans are each reported in
+full, so a parent's time includes its children's.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+
+@dataclass
+class Timings:
+    started_at: float = field(default_factory=time.perf_counter)
+    spans: dict[str, float] = field(default_factory=dict)  # name -> seconds, in order of first use
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add ``seconds`` to the span ``name``."""
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def as_dict(self) -> dict[str, float]:
+        """Every span, then ``total`` (the time since the recording began), in milliseconds."""
+        total = time.perf_counter() - self.started_at
+        return {name: round(1000 * s, 3) for name, s in {**self.spans, 'total': total}.items()}
+
+    def header(self) -> str:
+        """The spans as a ``Server-Timing`` header value, e.g. ``mu_sigma;dur=1.2, total;dur=9.8``."""
+        return ', '.join(f'{name};dur={ms}' for name, ms in self.as_dict().items())
+
+
+_current: ContextVar[Optional[Timings]] = ContextVar('timings', default=None)
+
+
+@contextmanager
+def record() -> Iterator[Timings]:
+    """Collect the spans opened (in this context) until the block exits."""
+    timings = Timings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the block as the span ``name`` of the current recording, if there is one."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started_at)
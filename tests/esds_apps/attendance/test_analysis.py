@@ -1,10 +1,12 @@
 import datetime
 import sqlite3
 
+import pandas as pd
 import pytest
 
 from esds_apps.attendance import analysis
 from esds_apps.attendance.attendance_db import ActivityType, AttendanceStatus, EventType, open_db
+from esds_apps.attendance.terms import store_terms, stored_terms_current, term_calendar
 
 
 def _add_course(db, name, difficulty, start, n_lessons, dancers, teachers=None, social_with=None):  # noqa: PLR0913
@@ -227,6 +229,15 @@ def test_cohort_retention_matrix_and_teams(built_db):
     assert 'AAAA1111+BBBB2222' in labels
 
 
+def test_retention_counts_dedupe_presences_and_offset_from_the_cohort_term():
+    # a: present in terms 0, 2 and 3 (term 0 twice); b: term 1 twice; c: terms 1 and 2.
+    dancers = pd.Series(['a', 'b', 'a', 'c', 'a', 'c', 'b', 'a'])
+    terms = pd.Series([2, 1, 0, 1, 0, 2, 1, 3])
+    counts, totals = analysis._retention_counts(dancers, terms, 4)
+    assert counts.tolist() == [[1, 0, 1, 1], [2, 1, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]]
+    assert totals.tolist() == [1, 2, 0, 0]
+
+
 def test_community_2026_size_and_commitment(built_db):
     c = analysis.summaries()['community_2026']
     # 4 spring L2 dates + 1 anniversary date, the fixed denominator for both series.
@@ -293,6 +304,26 @@ def test_community_2026_dancers_scope(built_db):
     assert all('enc_name' in r for r in analysis.community_2026_dancer_rows('incl', 1))
 
 
+def test_click_throughs_answer_from_memory_until_the_database_changes(built_db, monkeypatch):
+    assert _ids(analysis.community_2026_dancer_rows('incl', 5)) == ['f1']
+    with monkeypatch.context() as m:
+        m.setattr(sqlite3, 'connect', pytest.fail)  # a hit must not open the database
+        assert _ids(analysis.community_2026_dancer_rows('excl', 1)) == ['e1', 'f1', 'f2']
+
+    db = open_db(built_db, enforce_foreign_keys=False)
+    party = db.conn.execute("SELECT activity_id FROM activity WHERE name = '30th party'").fetchone()[0]
+    db.record_attendance(party, 'z1', AttendanceStatus.ATTENDED)
+    db.close()
+    assert 'z1' in _ids(analysis.community_2026_dancer_rows('incl', 1))
+
+
+def test_at_least_matches_a_plain_filter():
+    per_dancer = pd.Series([3, 1, 4, 1, 5, 9, 2, 6], index=['h', 'c', 'a', 'g', 'e', 'b', 'f', 'd'])
+    ranked = analysis._AtLeast.of(per_dancer)
+    for k in range(11):
+        assert ranked.dancers(k) == sorted(per_dancer[per_dancer >= k].index)
+
+
 def test_activity_records(built_db):
     conn = sqlite3.connect(built_db)
     activity_id = conn.execute("SELECT activity_id FROM activity WHERE name = '30th party'").fetchone()[0]
@@ -314,6 +345,19 @@ def test_activity_records(built_db):
     assert all('enc_name' in r for r in rows)
 
 
+def test_activity_record_chunk_sends_the_context_once(built_db):
+    conn = sqlite3.connect(built_db)
+    activity_id = conn.execute("SELECT activity_id FROM activity WHERE name = '30th party'").fetchone()[0]
+    conn.close()
+    context, *records = analysis.activity_record_chunk(activity_id)
+    assert context['activity']['activity_id'] == activity_id
+    assert context['activity']['event_name'] == '30 Years of ESDS'
+    assert [r['record_type'] for r in records] == ['named', 'named', 'aggregate']
+    assert set(records[0]) == {'record_type', 'dancer_id', 'status', 'ticket_type', 'enc_name'}
+    assert records[-1] == {'record_type': 'aggregate', 'ticket_type': records[-1]['ticket_type'], 'head_count': 5}
+    assert analysis.activity_record_chunk(99999) == []
+
+
 def test_activity_records_unknown_activity(built_db):
     assert analysis.activity_records(99999) == []
 
@@ -350,3 +394,20 @@ def test_decrypt_params_shape(built_db):
     # them unset, so the values are None but the keys are always present.
     params = analysis.decrypt_params()
     assert set(params) == {'salt', 'sentinel'}
+
+
+def test_summaries_are_unchanged_by_materialising_activity_attendance(built_db):
+    before = analysis.summaries(), analysis.early_term_means()
+    db = open_db(built_db, enforce_foreign_keys=False)
+    db.materialise_activity_attendance()
+    db.close()
+    assert (analysis.summaries(), analysis.early_term_means()) == before
+
+
+def test_summaries_are_unchanged_by_storing_the_terms(built_db):
+    before = analysis.summaries()
+    db = open_db(built_db, enforce_foreign_keys=False)
+    store_terms(db.conn)
+    assert stored_terms_current(db.conn, term_calendar(db.conn))
+    db.close()
+    assert analysis.summaries() == before
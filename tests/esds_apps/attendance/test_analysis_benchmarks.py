@@ -0,0 +1,67 @@
+"""pytest-benchmark timings of the /attendance builders against synthetic histories.
+
+Run and compared like ``test_forecast_benchmarks``.
+"""
+
+import timeit
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from esds_apps import config
+from esds_apps.attendance import analysis
+from esds_apps.attendance.attendance_db import read_connection
+
+_DANCERS = 50_000
+_TERMS = 40
+
+
+@pytest.fixture(scope='module')
+def presences():
+    """(dancer_id, term_idx) rows for a 50k-dancer, 40-term history, in no particular order.
+
+    Each dancer joins in a random term, stays a geometric number of terms (skipping some) and turns up
+    to a handful of activities in each.
+    """
+    rng = np.random.default_rng(0)
+    joined = rng.integers(0, _TERMS, _DANCERS)
+    stay = rng.geometric(0.35, _DANCERS)
+    dancer = np.repeat(np.arange(_DANCERS), stay)
+    term = joined[dancer] + np.concatenate([np.arange(k) for k in stay]) * rng.integers(1, 3, len(dancer))
+    keep = term < _TERMS
+    dancer, term = dancer[keep], term[keep]
+    visits = rng.integers(1, 8, len(dancer))
+    dancer, term = np.repeat(dancer, visits), np.repeat(term, visits)
+    order = rng.permutation(len(dancer))  # rows arrive in activity order, not grouped by dancer
+    return pd.Series([f'DNC-{d:08X}' for d in dancer[order]]), pd.Series(term[order])
+
+
+def test_bench_retention_counts(benchmark, presences):
+    dancers, terms = presences
+    counts, totals = benchmark(analysis._retention_counts, dancers, terms, _TERMS)
+    assert totals.sum() == dancers.nunique()
+    assert (counts[:, 0] == totals).all()  # every dancer is present in the term they joined
+
+
+@pytest.fixture(scope='module')
+def synthetic_db(tmp_path_factory, forecast_sources):
+    db, _ = forecast_sources(tmp_path_factory.mktemp('analysis-benchmarks'), years=4)
+    return db
+
+
+def test_bench_click_through(benchmark, synthetic_db, monkeypatch):
+    monkeypatch.setattr(config, 'ATTENDANCE_DB_PATH', synthetic_db)
+    term_start = analysis.summaries()['termly_active'][0]['term_start']
+    analysis.community_2026_dancer_rows('incl', 1)  # builds the index; the benchmark times the clicks
+
+    def click():
+        return analysis.termly_active_dancer_rows(term_start, 'excl', 2), analysis.community_2026_dancer_rows('incl', 3)
+
+    conn = read_connection(synthetic_db)
+    rebuild = min(timeit.repeat(lambda: analysis._ClickThrough.derive(conn), number=1, repeat=3))
+
+    termly, community = benchmark(click)
+    assert termly and community
+    if benchmark.stats is not None:  # None under --benchmark-disable
+        assert benchmark.stats.stats.median < rebuild / 10  # two clicks answered from the index, not rebuilding it
@@ -292,6 +292,64 @@ def test_view_named_registered_counts_every_named_row(db):
     assert row == (1, 1, 3, 1)  # registered = attended+absent+unknown; total stays attended-only
 
 
+# ---- the materialised table ----
+
+
+def _materialised_matches_live(db) -> bool:
+    table = db.conn.execute('SELECT * FROM activity_attendance ORDER BY activity_id').fetchall()
+    live = db.conn.execute('SELECT * FROM activity_attendance_live ORDER BY activity_id').fetchall()
+    return table == live
+
+
+def test_materialise_turns_the_view_into_an_indexed_table(db):
+    eid = db.upsert_event('E', EventType.COURSE)
+    act = db.upsert_activity(eid, 'W1', date(2025, 5, 22), ActivityType.LESSON, 'Level 1')
+    db.record_attendance(act, 'DNC-1', status=AttendanceStatus.ATTENDED)
+    db.record_count(act, TicketType.MEMBER, 5)
+    db.materialise_activity_attendance()
+    kind = db.conn.execute("SELECT type FROM sqlite_master WHERE name = 'activity_attendance'").fetchone()[0]
+    assert kind == 'table'
+    indexes = {r[1] for r in db.conn.execute("PRAGMA index_list('activity_attendance')")}
+    assert {'idx_activity_attendance_difficulty_date', 'idx_activity_attendance_event'} <= indexes
+    assert _materialised_matches_live(db)
+    db.materialise_activity_attendance()  # idempotent
+    assert _materialised_matches_live(db)
+
+
+def test_materialised_table_follows_each_write(db):
+    db.materialise_activity_attendance()
+    eid = db.upsert_event('E', EventType.COURSE)
+    act = db.upsert_activity(eid, 'W1', date(2025, 5, 22))
+    db.record_attendance(act, 'DNC-1', status=AttendanceStatus.UNKNOWN)
+    db.record_attendance(act, 'DNC-1', status=AttendanceStatus.ATTENDED)  # upgraded in place
+    db.record_count(act, TicketType.MEMBER, 5)
+    db.record_count(act, TicketType.MEMBER, 3)  # replace semantics
+    db.upsert_activity(eid, 'W1', date(2025, 5, 22), ActivityType.LESSON, 'Level 1')  # difficulty filled in
+    row = db.conn.execute(
+        'SELECT difficulty, named_total, aggregate_total, total FROM activity_attendance WHERE activity_id=?', (act,)
+    ).fetchone()
+    assert row == ('Level 1', 1, 3, 4)
+    assert _materialised_matches_live(db)
+
+
+def test_deferred_refresh_rebuilds_once_on_exit(db):
+    db.materialise_activity_attendance()
+    eid = db.upsert_event('E', EventType.COURSE)
+    with db.deferred_refresh():
+        act = db.upsert_activity(eid, 'W1', date(2025, 5, 22))
+        db.record_attendance(act, 'DNC-1', status=AttendanceStatus.ATTENDED)
+        assert db.conn.execute('SELECT COUNT(*) FROM activity_attendance').fetchone()[0] == 0
+    assert db.conn.execute('SELECT total FROM activity_attendance WHERE activity_id=?', (act,)).fetchone() == (1,)
+
+
+def test_reopening_keeps_the_materialised_table(db, tmp_path):
+    db.materialise_activity_attendance()
+    reopened = open_db(tmp_path / 'attendance.sqlite', enforce_foreign_keys=False)  # reruns the schema script
+    kind = reopened.conn.execute("SELECT type FROM sqlite_master WHERE name = 'activity_attendance'").fetchone()[0]
+    reopened.close()
+    assert kind == 'table'
+
+
 # ---- reassign_dancer (de-duplication merge) ----
 
 
@@ -313,6 +371,22 @@ def test_reassign_moves_attendance_when_no_clash(db):
     assert holders == ['DNC-NEW']
 
 
+def test_reassign_refreshes_a_materialised_table(db):
+    from esds_apps.attendance.attendance_db import reassign_dancer
+
+    _seed_two_dancers(db)
+    db.materialise_activity_attendance()
+    eid = db.upsert_event('E', EventType.COURSE)
+    act = db.upsert_activity(eid, 'W1', date(2026, 1, 6))
+    db.record_attendance(act, 'DNC-OLD', status=AttendanceStatus.ATTENDED)
+    db.record_attendance(act, 'DNC-NEW', status=AttendanceStatus.UNKNOWN)
+    reassign_dancer(db.conn, 'DNC-OLD', 'DNC-NEW')
+    db.conn.commit()
+    row = db.conn.execute('SELECT total, named_unknown, named_registered FROM activity_attendance').fetchone()
+    assert row == (1, 0, 1)  # the collapsed pair is one attended dancer
+    assert _materialised_matches_live(db)
+
+
 def test_reassign_collapses_attendance_keeping_more_informative_status(db):
     """Both ids attended the same activity: one row survives, 'attended' beating 'unknown'."""
     from esds_apps.attendance.attendance_db import reassign_dancer
@@ -379,3 +453,109 @@ def test_reassign_leaves_anonymous_waitlist_untouched(db):
     assert moved['waitlist'] == 0
     row = db.conn.execute('SELECT dancer_id, head_count FROM waitlist WHERE event_id=?', (eid,)).fetchone()
     assert row == (None, 5)
+
+
+# ---- fingerprint ----
+
+
+def test_db_fingerprint_tracks_writes_but_not_reads(tmp_path, db):
+    from esds_apps.attendance.attendance_db import db_fingerprint
+
+    path = tmp_path / 'attendance.sqlite'
+    assert db_fingerprint(tmp_path / 'missing.sqlite') == (None, None)
+    before = db_fingerprint(path)
+    reader = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    reader.execute('SELECT COUNT(*) FROM event').fetchone()
+    reader.close()
+    assert db_fingerprint(path) == before
+    db.upsert_event('E', EventType.COURSE)
+    assert db_fingerprint(path) != before
+
+
+def test_db_version_memo_derives_once_per_version(tmp_path, db):
+    from esds_apps.attendance.attendance_db import DbVersionMemo
+
+    path = tmp_path / 'attendance.sqlite'
+    memo, calls = DbVersionMemo(), []
+
+    def count_events(conn):
+        calls.append(1)
+        return conn.execute('SELECT COUNT(*) FROM event').fetchone()[0]
+
+    assert memo.of(db.conn, count_events) == 0
+    assert memo.get(path, lambda: pytest.fail('derived again for the same version')) == 0
+    db.upsert_event('E', EventType.COURSE)
+    assert memo.of(db.conn, count_events) == 1
+    assert len(calls) == 2
+
+    memory = sqlite3.connect(':memory:')
+    memory.execute('CREATE TABLE event (name TEXT)')
+    memo.of(memory, count_events)
+    memo.of(memory, count_events)  # no file, so no version to key on
+    assert len(calls) == 4
+    memory.close()
+
+
+# ---- read-only connections ----
+
+
+@pytest.fixture
+def reader_db(tmp_path, db):
+    """The ``db`` fixture's file with one event in it, and no pooled reader before or after."""
+    from esds_apps.attendance.attendance_db import close_read_connection
+
+    db.upsert_event('E', EventType.COURSE)
+    close_read_connection()
+    yield tmp_path / 'attendance.sqlite'
+    close_read_connection()
+
+
+def test_read_connection_is_read_only_and_tuned(reader_db):
+    from esds_apps.attendance.attendance_db import read_connection
+
+    conn = read_connection(reader_db)
+    assert conn.execute('PRAGMA query_only').fetchone() == (1,)
+    assert conn.execute('PRAGMA temp_store').fetchone() == (2,)  # MEMORY
+    assert conn.execute('PRAGMA cache_size').fetchone()[0] < -2000  # larger than SQLite's 2 MiB default
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("INSERT INTO event (name, event_type) VALUES ('F', 'course')")
+
+
+def test_read_connection_is_pooled_per_thread(reader_db):
+    import threading
+
+    from esds_apps.attendance.attendance_db import read_connection
+
+    conn = read_connection(reader_db)
+    assert read_connection(reader_db) is conn
+    other = []
+    thread = threading.Thread(target=lambda: other.append(read_connection(reader_db)))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+
+
+def test_read_connection_sees_writes_and_reopens_a_replaced_file(reader_db, db, tmp_path):
+    from esds_apps.attendance.attendance_db import open_db, read_connection
+
+    conn = read_connection(reader_db)
+    db.upsert_event('F', EventType.COURSE)
+    assert read_connection(reader_db) is conn
+    assert conn.execute('SELECT COUNT(*) FROM event').fetchone() == (2,)
+
+    db.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')  # the writer is done before a new file is swapped in
+    staged = tmp_path / 'staged.sqlite'
+    new = open_db(staged, enforce_foreign_keys=False)
+    new.conn.execute('PRAGMA journal_mode = DELETE')  # a self-contained file, as an upload would be
+    new.close()
+    staged.replace(reader_db)
+    replaced = read_connection(reader_db)
+    assert replaced is not conn
+    assert replaced.execute('SELECT COUNT(*) FROM event').fetchone() == (0,)
+
+
+def test_read_connection_of_a_missing_database(tmp_path):
+    from esds_apps.attendance.attendance_db import read_connection
+
+    with pytest.raises(FileNotFoundError):
+        read_connection(tmp_path / 'missing.sqlite')
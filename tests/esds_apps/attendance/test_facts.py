@@ -0,0 +1,65 @@
+import datetime
+import sqlite3
+
+import pytest
+
+from esds_apps.attendance import facts
+from esds_apps.attendance.attendance_db import ActivityType, AttendanceStatus, EventType, open_db
+
+
+@pytest.fixture
+def facts_db(tmp_path):
+    """One four-week Level 1 term with a 30th anniversary party in it, and a social before it."""
+    path = tmp_path / 'attendance.sqlite'
+    db = open_db(path, enforce_foreign_keys=False)
+    course = db.upsert_event('L1 Autumn 2025', EventType.COURSE)
+    for week in range(4):
+        lesson = db.upsert_activity(
+            course,
+            f'wk{week}',
+            datetime.date(2025, 9, 4) + datetime.timedelta(weeks=week),
+            ActivityType.LESSON,
+            'Level 1',
+        )
+        db.record_attendance(lesson, 'DNC-A', AttendanceStatus.ATTENDED)
+    db.record_attendance(lesson, 'DNC-B', AttendanceStatus.UNKNOWN)
+    party = db.upsert_activity(
+        db.upsert_event('30 Years of ESDS', EventType.SOCIAL), 'party', '2025-09-20', ActivityType.SOCIAL, None
+    )
+    db.record_attendance(party, 'DNC-B', AttendanceStatus.ATTENDED)
+    summer = db.upsert_activity(
+        db.upsert_event('Summer social', EventType.SOCIAL), 'party', '2025-07-01', ActivityType.SOCIAL, None
+    )
+    db.record_attendance(summer, 'DNC-C', AttendanceStatus.ATTENDED)
+    db.close()
+    return path
+
+
+def test_one_typed_row_per_record(facts_db):
+    conn = sqlite3.connect(facts_db)
+    frame = facts.fact_frame(conn)
+    conn.close()
+    assert len(frame) == 7
+    assert {c: str(frame[c].dtype) for c in ('dancer_id', 'status', 'activity_type')} == dict.fromkeys(
+        ('dancer_id', 'status', 'activity_type'), 'category'
+    )
+    assert str(frame['date'].dtype).startswith('datetime64')
+    by_dancer = frame.groupby('dancer_id', observed=True)
+    assert by_dancer['term_idx'].max().to_dict() == {'DNC-A': 0, 'DNC-B': 0, 'DNC-C': -1}  # C only before term 1
+    assert frame.loc[frame['is_30th'], 'dancer_id'].tolist() == ['DNC-B']
+
+
+def test_loaded_once_per_database_version(facts_db):
+    conn = sqlite3.connect(facts_db)
+    first = facts.fact_frame(conn)
+    assert facts.fact_frame(conn) is first
+    conn.close()
+
+    db = open_db(facts_db, enforce_foreign_keys=False)
+    db.record_attendance(1, 'DNC-D', AttendanceStatus.ATTENDED)
+    db.close()
+    conn = sqlite3.connect(facts_db)
+    second = facts.fact_frame(conn)
+    conn.close()
+    assert second is not first
+    assert 'DNC-D' in set(second['dancer_id'])
@@ -67,6 +67,24 @@ def test_ingest_folder_dispatches_and_reports_unhandled(tmp_path, db):
     assert db.conn.execute("SELECT COUNT(*) FROM activity WHERE name='Level 1 (2025-05-22)'").fetchone() == (1,)
 
 
+def _activity_attendance_kind(db) -> str:
+    return db.conn.execute("SELECT type FROM sqlite_master WHERE name = 'activity_attendance'").fetchone()[0]
+
+
+def test_ingest_folder_materialises_activity_attendance(tmp_path, db):
+    root = tmp_path / 'outputs'
+    root.mkdir()
+    _roster_ws().parent.save(root / 'May-Jun 2025 Attendance_pseudonymised.xlsx')
+
+    ingest.ingest_folder(root, db, materialise=False)
+    assert _activity_attendance_kind(db) == 'view'
+
+    ingest.ingest_folder(root, db)  # materialised by default
+    assert _activity_attendance_kind(db) == 'table'
+    table = db.conn.execute('SELECT * FROM activity_attendance ORDER BY activity_id').fetchall()
+    assert table and table == db.conn.execute('SELECT * FROM activity_attendance_live ORDER BY activity_id').fetchall()
+
+
 def test_ingest_folder_routes_swingout_to_its_own_parser(tmp_path, db):
     """The Stockbridge tab is claimed by the event-specific parser, not the roster, in dispatch."""
     root = tmp_path / 'outputs'
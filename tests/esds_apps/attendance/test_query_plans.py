@@ -0,0 +1,142 @@
+"""Query-plan regression tests: no /attendance or forecast query may scan a fact table in full.
+
+Every SELECT that ``analysis`` and ``forecast._build_context`` issue is captured from a run against a
+small synthetic DB, then planned (EXPLAIN QUERY PLAN) against the same schema grown to a million
+attendance rows. A plan may scan the small dimension tables (``event``, ``activity``) and may walk a
+covering index end to end, but a ``SCAN`` of ``attendance``, ``attendance_count``, ``waitlist`` or
+``dancer`` that reads the table itself means a missing index, and fails here rather than as a slow page.
+The only exceptions are the deliberate whole-table loads made once per database version into an in-memory
+index (``_ONCE_PER_VERSION``).
+"""
+
+import re
+import shutil
+import sqlite3
+
+import pytest
+
+from esds_apps import config, forecast
+from esds_apps.attendance import analysis
+from esds_apps.attendance.attendance_db import close_read_connection, open_db
+
+_FACT_TABLES = {'attendance', 'attendance_count', 'waitlist', 'dancer'}
+_ATTENDANCE_ROWS = 1_000_000
+# Read in full once per database version to build an in-memory index, never per request.
+_ONCE_PER_VERSION = {'SELECT dancer_id, enc_name FROM dancer'}  # analysis._ClickThrough's enc_name lookup
+# FROM/JOIN <table> [alias], to map the aliases in a plan's SCAN lines back to tables.
+_TABLE_REF = re.compile(r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?!(?:JOIN|USING|ON|WHERE|GROUP|ORDER|LEFT)\b)(\w+))?', re.I)
+_SCAN = re.compile(r'SCAN (\w+)')
+
+
+def _capture_queries(db, defaults) -> list[str]:
+    statements: list[str] = []
+    close_read_connection()  # so the pooled reader is opened, and traced, here
+    connect = sqlite3.connect
+
+    def tracing_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    with pytest.MonkeyPatch.context() as m:
+        m.setattr(config, 'ATTENDANCE_DB_PATH', db)
+        m.setattr(config, 'FORECAST_DEFAULTS_PATH', defaults)
+        m.setattr(sqlite3, 'connect', tracing_connect)
+        analysis.summaries()
+        analysis.early_term_means()
+        analysis.community_2026_dancer_rows('incl', 1)
+        analysis.termly_active_dancer_rows('2025-09-11', 'incl', 1)
+        analysis.activity_records(1)
+        analysis.decrypt_params()
+        forecast._build_context()
+    close_read_connection()  # opened under the trace, so not to be reused
+    return list(dict.fromkeys(s for s in statements if s.lstrip().upper().startswith(('SELECT', 'WITH'))))
+
+
+def _amplify(path, rows: int) -> None:
+    # Spread ~rows synthetic dancers' attendance evenly over the existing activities, in one statement.
+    # The secondary indexes are dropped for the load and rebuilt by open_db, which is several times faster.
+    conn = sqlite3.connect(path)
+    for (index,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'attendance' AND sql IS NOT NULL"
+    ).fetchall():
+        conn.execute(f'DROP INDEX {index}')
+    n_activities = conn.execute('SELECT COUNT(*) FROM activity').fetchone()[0]
+    conn.execute(
+        'WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i + 1 < ?) '
+        'INSERT OR IGNORE INTO attendance (activity_id, dancer_id, status, ticket_type) '
+        "SELECT a.activity_id, 'S' || ((a.activity_id * 7919 + n.i) % 100000), "
+        "CASE n.i % 10 WHEN 0 THEN 'unknown' WHEN 1 THEN 'registered' ELSE 'attended' END, "
+        "CASE n.i % 4 WHEN 0 THEN 'ordinary' WHEN 1 THEN 'member' WHEN 2 THEN 'concession' "
+        "ELSE 'member_or_concession' END "
+        'FROM activity a, n',
+        (rows // n_activities,),
+    )
+    conn.commit()
+    conn.close()
+    open_db(path, enforce_foreign_keys=False).close()
+
+
+@pytest.fixture(scope='module')
+def planned(tmp_path_factory, forecast_sources):
+    """(the captured queries, a million-attendance-row copy of the DB they were captured from)."""
+    root = tmp_path_factory.mktemp('query-plans')
+    small, defaults = forecast_sources(root)
+    big = root / 'big.sqlite'
+    queries = _capture_queries(small, defaults)
+    shutil.copy(small, big)
+    _amplify(big, _ATTENDANCE_ROWS)
+    return queries, big
+
+
+def _full_scans(conn: sqlite3.Connection, query: str) -> list[str]:
+    aliases = {alias or table: table for table, alias in _TABLE_REF.findall(query)}
+    scans = []
+    for *_, detail in conn.execute('EXPLAIN QUERY PLAN ' + query):
+        m = _SCAN.match(detail)
+        if m and aliases.get(m[1], m[1]) in _FACT_TABLES and 'COVERING INDEX' not in detail:
+            scans.append(detail)
+    return scans
+
+
+def _assert_no_full_scans(db, queries) -> None:
+    conn = sqlite3.connect(db)
+    try:
+        checked = (q for q in queries if q not in _ONCE_PER_VERSION)
+        offenders = {' '.join(q.split()): scans for q in checked if (scans := _full_scans(conn, q))}
+    finally:
+        conn.close()
+    assert not offenders
+
+
+def test_the_fixture_is_at_scale(planned):
+    queries, big = planned
+    conn = sqlite3.connect(big)
+    assert conn.execute('SELECT COUNT(*) FROM attendance').fetchone()[0] >= 0.9 * _ATTENDANCE_ROWS
+    conn.close()
+    assert len(queries) > 20  # the capture saw the analysis and forecast queries, not just a handful
+
+
+def test_no_query_scans_a_fact_table(planned):
+    _assert_no_full_scans(planned[1], planned[0])
+
+
+def test_no_query_scans_a_fact_table_once_materialised(planned, tmp_path):
+    queries, big = planned
+    db_path = tmp_path / 'materialised.sqlite'
+    shutil.copy(big, db_path)
+    db = open_db(db_path, enforce_foreign_keys=False)
+    db.materialise_activity_attendance()
+    db.close()
+    _assert_no_full_scans(db_path, queries)
+
+
+def test_a_missing_index_is_caught(planned, tmp_path):
+    queries, big = planned
+    db_path = tmp_path / 'unindexed.sqlite'
+    shutil.copy(big, db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute('DROP INDEX idx_attendance_ticket_activity')
+    conn.commit()
+    assert any(_full_scans(conn, q) for q in queries)
+    conn.close()
@@ -0,0 +1,151 @@
+import gzip
+
+import pytest
+
+from esds_apps import config
+from esds_apps.attendance import result_cache
+
+
+@pytest.fixture
+def db_file(tmp_path, monkeypatch):
+    """Stands in for the attendance DB: the cache only ever stats the file."""
+    path = tmp_path / 'attendance.sqlite'
+    path.write_bytes(b'v1')
+    monkeypatch.setattr(config, 'ATTENDANCE_DB_PATH', path)
+    result_cache.clear()
+    yield path
+    result_cache.clear()
+
+
+def _counter(payloads):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return payloads[len(calls) - 1]
+
+    return compute, calls
+
+
+def _replace_db(path, content: bytes) -> None:
+    path.write_bytes(content)  # a different size, so the fingerprint changes whatever the mtime resolution
+
+
+def test_computes_once_per_database_version(db_file):
+    compute, calls = _counter([{'n': 1}])
+    first = result_cache.get(('summaries',), compute)
+    assert result_cache.get(('summaries',), compute) is first
+    assert result_cache.lookup(('summaries',)) is first
+    assert len(calls) == 1
+    assert first.body == b'{"n":1}'
+    assert first.etag.startswith('"') and first.etag.endswith('"')
+
+
+def test_keys_are_separate(db_file):
+    a = result_cache.get(('community_dancers', 'incl', 1), lambda: {'scope': 'incl'})
+    b = result_cache.get(('community_dancers', 'excl', 1), lambda: {'scope': 'excl'})
+    assert a.body != b.body and a.etag != b.etag
+
+
+def test_lookup_never_computes(db_file):
+    assert result_cache.lookup(('summaries',)) is None
+
+
+def test_the_etag_follows_the_content_not_the_version(db_file):
+    first = result_cache.get(('summaries',), lambda: {'n': 1})
+    result_cache.clear()
+    assert result_cache.get(('summaries',), lambda: {'n': 1}).etag == first.etag
+
+
+def test_a_new_database_is_warmed_in_the_background(db_file):
+    compute, calls = _counter([{'n': 1}, {'n': 2}])
+    old = result_cache.get(('summaries',), compute)
+    _replace_db(db_file, b'version 2')
+
+    served = result_cache.lookup(('summaries',))
+    warm = result_cache._WARM
+    assert warm is not None
+    warm.join(timeout=5)
+    assert served is old  # the previous version serves while the new one is computed
+    new = result_cache.lookup(('summaries',))
+    assert new.body == b'{"n":2}' and new.etag != old.etag
+    assert len(calls) == 2
+
+
+def test_a_failed_warm_keeps_serving_the_previous_result(db_file):
+    payloads = iter([{'n': 1}])
+
+    def compute():
+        return next(payloads)  # StopIteration the second time round, as if the new file were unreadable
+
+    old = result_cache.get(('summaries',), compute)
+    _replace_db(db_file, b'half-copied')
+    result_cache.lookup(('summaries',))
+    result_cache._WARM.join(timeout=5)
+    assert result_cache.lookup(('summaries',)) is old
+
+
+def test_nothing_is_cached_without_a_database(db_file):
+    db_file.unlink()
+    compute, calls = _counter([{'n': 1}, {'n': 2}])
+    assert result_cache.get(('summaries',), compute).body == b'{"n":1}'
+    assert result_cache.get(('summaries',), compute).body == b'{"n":2}'
+    assert result_cache.lookup(('summaries',)) is None
+
+
+def test_the_cache_is_bounded(db_file, monkeypatch):
+    monkeypatch.setattr(config, 'ATTENDANCE_RESULT_CACHE_SIZE', 2)
+    for i in range(3):
+        result_cache.get(('activity_records', i), lambda i=i: {'activity_id': i})
+    assert result_cache.lookup(('activity_records', 0)) is None
+    assert result_cache.lookup(('activity_records', 2)) is not None
+
+
+def test_one_dataset_cannot_evict_another(db_file, monkeypatch):
+    monkeypatch.setattr(config, 'ATTENDANCE_RESULT_CACHE_SIZE', 2)
+    summaries = result_cache.get(('summaries',), lambda: {'n': 1})
+    for i in range(10):
+        result_cache.get(('activity_records', i), lambda: [])
+    assert result_cache.lookup(('summaries',)) is summaries
+    assert result_cache.lookup(('activity_records', 7)) is None
+    assert result_cache.lookup(('activity_records', 9)) is not None
+
+
+@pytest.mark.parametrize(
+    'header, expected',
+    [(None, False), ('"other"', False), ('"other", "tag"', True), ('W/"tag"', True), ('*', True)],
+)
+def test_if_none_match(header, expected):
+    assert result_cache.CachedJson(b'{}', '"tag"').matches(header) is expected
+
+
+def test_big_bodies_are_gzipped_once(db_file):
+    payload = {'rows': [{'activity_id': i, 'event_name': 'Level 1 autumn'} for i in range(200)]}
+    cached = result_cache.get(('activities',), lambda: payload)
+    assert gzip.decompress(cached.gzipped) == cached.body
+    body, headers = cached.encoded('gzip, deflate, br')
+    assert body is cached.gzipped
+    assert headers == {'ETag': cached.gzip_etag, 'Content-Encoding': 'gzip', 'Vary': 'Accept-Encoding'}
+    assert cached.encoded('gzip;q=0')[0] is cached.body
+    assert cached.matches(cached.gzip_etag) and cached.matches(cached.etag)
+
+
+def test_small_bodies_are_sent_as_they_are(db_file):
+    cached = result_cache.get(('decrypt_params',), lambda: {'salt': None})
+    assert cached.gzipped is None
+    assert cached.encoded('gzip') == (cached.body, {'ETag': cached.etag})
+
+
+@pytest.mark.parametrize(
+    'header, expected',
+    [
+        (None, False),
+        ('identity', False),
+        ('gzip', True),
+        ('deflate, GZIP;q=0.5', True),
+        ('gzip;q=0', False),
+        ('*', True),
+    ],
+)
+def test_accepts_gzip(header, expected):
+    assert result_cache._accepts_gzip(header) is expected
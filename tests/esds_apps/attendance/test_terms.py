@@ -0,0 +1,101 @@
+import datetime
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from esds_apps.attendance import terms
+from esds_apps.attendance.attendance_db import ActivityType, EventType, open_db
+
+
+def _course(db, name: str, difficulty: str, start: datetime.date, weeks: int, teachers=()) -> list[int]:
+    event_id = db.upsert_event(name, EventType.COURSE)
+    db.set_event_teachers(event_id, list(teachers))
+    return [
+        db.upsert_activity(event_id, f'wk{w + 1}', start + datetime.timedelta(weeks=w), ActivityType.LESSON, difficulty)
+        for w in range(weeks)
+    ]
+
+
+@pytest.fixture
+def calendar_db(tmp_path):
+    """Three Level 1 terms: autumn and winter 2024/25, and autumn 2025/26.
+
+    Plus a twice-weekly strand that mustn't split the first, a two-week L1 one-off that mustn't
+    anchor a term, and a summer social before the first term.
+    """
+    path = tmp_path / 'attendance.sqlite'
+    db = open_db(path, enforce_foreign_keys=False)
+    social = db.upsert_event('Summer social', EventType.SOCIAL)
+    db.upsert_activity(social, 'party', '2024-07-01', ActivityType.SOCIAL, None)
+    _course(db, 'L1 Autumn 2024', 'Level 1', datetime.date(2024, 9, 2), 4, teachers=['DNC-AAAA1111'])
+    _course(db, 'L1 Autumn 2024 Thu', 'Level 1', datetime.date(2024, 9, 5), 4, teachers=['DNC-BBBB2222'])
+    _course(db, 'L1 Winter 2024', 'Level 1', datetime.date(2024, 11, 4), 4)
+    _course(db, 'L1 taster', 'Level 1', datetime.date(2025, 3, 3), 2)
+    _course(db, 'L1 Autumn 2025', 'Level 1', datetime.date(2025, 9, 1), 4, teachers=['DNC-AAAA1111'])
+    db.close()
+    return path
+
+
+def test_terms_and_labels(calendar_db):
+    conn = sqlite3.connect(calendar_db)
+    calendar = terms.TermCalendar.derive(conn)
+    conn.close()
+    t = calendar.terms
+    assert t['label'].tolist() == ['24/25 T1', '24/25 T2', '25/26 T1']
+    assert t['acad_year'].tolist() == [2024, 2024, 2025]
+    assert t['teacher_label'].tolist() == ['AAAA1111+BBBB2222', 'unknown', 'AAAA1111']
+    assert t['teacher_id'].tolist() == [0, -1, 1]
+
+
+def test_assign_and_activity_terms_agree(calendar_db):
+    conn = sqlite3.connect(calendar_db)
+    calendar = terms.TermCalendar.derive(conn)
+    activities = pd.read_sql_query('SELECT activity_id, date FROM activity', conn)
+    conn.close()
+    by_date = calendar.assign(activities['date'])
+    assert by_date.isna().sum() == 1  # only the summer social falls before the first term
+    expected = dict(zip(activities['activity_id'][by_date.notna()], by_date.dropna().astype(int)))
+    assert calendar.activity_terms.to_dict() == expected
+    taster = activities.loc[activities['date'] == '2025-03-03', 'activity_id'].item()
+    assert calendar.activity_terms[taster] == 1  # the one-off falls in the winter term rather than opening one
+
+
+def test_term_calendar_is_derived_once_per_database_version(calendar_db):
+    conn = sqlite3.connect(calendar_db)
+    first = terms.term_calendar(conn)
+    assert terms.term_calendar(conn) is first
+    conn.close()
+
+    db = open_db(calendar_db, enforce_foreign_keys=False)
+    _course(db, 'L1 Winter 2025', 'Level 1', datetime.date(2025, 11, 3), 4)
+    db.close()
+    conn = sqlite3.connect(calendar_db)
+    second = terms.term_calendar(conn)
+    conn.close()
+    assert second is not first
+    assert second.terms['label'].tolist()[-1] == '25/26 T2'
+
+
+def test_store_terms_lets_sql_join_on_term(calendar_db):
+    db = open_db(calendar_db, enforce_foreign_keys=False)
+    calendar = terms.store_terms(db.conn)
+    rows = db.conn.execute(
+        'SELECT t.label, COUNT(*) FROM activity_term at JOIN term t USING(term_idx) GROUP BY t.term_idx'
+    ).fetchall()
+    assert rows == [('24/25 T1', 8), ('24/25 T2', 6), ('25/26 T1', 4)]
+    assert db.conn.execute('SELECT term_start FROM term WHERE term_idx = 0').fetchone() == ('2024-09-02',)
+
+    terms.store_terms(db.conn)  # rewritten wholesale, not appended to
+    assert db.conn.execute('SELECT COUNT(*) FROM activity_term').fetchone()[0] == len(calendar.activity_terms)
+    db.close()
+
+
+def test_stored_terms_are_current_until_the_activities_change(calendar_db):
+    db = open_db(calendar_db, enforce_foreign_keys=False)
+    assert not terms.stored_terms_current(db.conn, terms.TermCalendar.derive(db.conn))
+    terms.store_terms(db.conn)
+    assert terms.stored_terms_current(db.conn, terms.TermCalendar.derive(db.conn))
+    _course(db, 'L1 Winter 2025', 'Level 1', datetime.date(2025, 11, 3), 4)
+    assert not terms.stored_terms_current(db.conn, terms.TermCalendar.derive(db.conn))
+    db.close()
@@ -0,0 +1,211 @@
+"""Fixtures shared by the forecast tests, its benchmarks and the attendance query-plan tests.
+
+``forecast_sources`` writes a synthetic attendance DB and a defaults CSV to stand in for the private data
+``forecast._build_context`` reads. The DB is schema-valid and has enough history for every fit: six Level 1
+terms a year (with waitlists), Level 2 nights with named and aggregate ticket counts, social-only nights,
+socials, a Christmas party and a workshop each year, and a yearly weekender whose crowd partly comes back.
+Everything is drawn from a seeded RNG, so a given ``(years, seed)`` always produces the same file; ``years``
+scales the size for benchmarks.
+"""
+
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from esds_apps.attendance.attendance_db import open_db
+from esds_apps.attendance.terms import store_terms
+
+# A full set of financial defaults, standing in for the private spreadsheet.
+_FORECAST_DEFAULTS = {
+    'forecast_ay': 2026,
+    'n_tea_dances': 2,
+    'have_weekender': True,
+    'loyalty_enabled': True,
+    'loyalty_every': 8,
+    'class_size_cap': None,
+    'l1_per_night': False,
+    'class_card_size': 1,
+    'confidence': 0.95,
+    'price_class_disc': 7,
+    'price_class_ord': 8,
+    'price_social_disc': 9,
+    'price_social_ord': 10,
+    'price_social_only_disc': 3.5,
+    'price_social_only_ord': 4.5,
+    'price_wk_full_disc': 100,
+    'price_wk_full_ord': 120,
+    'price_wk_day_disc': 40,
+    'price_wk_day_ord': 45,
+    'price_wk_social': 40,
+    'membership_fee': 12,
+    'room_per_hour': 35,
+    'room_per_hour_b': 20,
+    'class_room_hour_a': 2.75,
+    'class_room_hour_b': 2.0,
+    'teacher_rate': 15,
+    'teacher_hours_a': 2,
+    'teacher_hours_b': 2,
+    'teacher_hours_c': 1,
+    'teacher_hours_d': 1,
+    'social_snacks': 65,
+    'social_room_hours': 4,
+    'social_room_per_hour': 35,
+    'band_cost_mean': 717.0,
+    'band_cost_std': 97.0,
+    'weekender_bands': 3,
+    'weekender_room_hours': 40,
+    'weekender_room_per_hour': 40,
+    'weekender_teachers': 2,
+    'weekender_teacher_rate': 60,
+    'weekender_teacher_hours': 12,
+    'weekender_flight': 250,
+    'weekender_board_per_night': 90,
+    'weekender_nights': 2,
+    'n_committee': 9,
+    'n_safer_spaces': 4,
+    'safer_spaces_accounts': True,
+    'n_extra_volunteers': 4,
+    'n_legacy_accounts': 2,
+    'n_shared_accounts': 1,
+    'gsuite_seat_monthly': 5.9,
+    'wix_reseller_annual': 157.44,
+    'volunteer_social_per_head': 35,
+    'n_volunteer_socials': 2,
+    'oh_website': 129.6,
+    'oh_email_marketing': 237.6,
+    'oh_insurance': 109.6,
+    'oh_storage_container': 516.66,
+    'oh_spotify': 127.3,
+    'oh_survey_monkey': 148.5,
+    'oh_pat_testing': 110.4,
+    'oh_equipment_recap': 150,
+    'oh_society_phone': 96,
+    'oh_posters': 120,
+    'oh_stationery': 120,
+    'oh_canva': 110,
+    'n_members': 72,
+    'membership_std': 11.6,
+    'current_balance': 19498,
+    'dc_rate': 0.025,
+    'dc_fixed': 0.5,
+    'dc_cap': 5.0,
+    'stripe_rate': 0.015,
+    'stripe_fixed': 0.2,
+}
+
+_LAST_AY = 2025  # the newest academic year; its spring terms fall in 2026, which the loyalty fit reads
+_TICKETS = ['ordinary', 'member', 'concession', 'member_or_concession']
+
+
+def _thursday_on_or_after(d: date) -> date:
+    return d + timedelta(days=(3 - d.weekday()) % 7)
+
+
+def _build_forecast_db(path, years: int = 4, seed: int = 0) -> None:  # noqa: PLR0915
+    """Write a synthetic attendance DB covering the ``years`` academic years up to 2025/26 to ``path``."""
+    rng = random.Random(seed)
+    db = open_db(path, enforce_foreign_keys=False)
+    conn = db.conn
+    regulars = [f'R{i:04d}' for i in range(300)]
+    keenness = {d: rng.uniform(0.05, 0.9) for d in regulars}  # spreads the loyalty survival curve
+    ids = {'event': 0, 'activity': 0}
+
+    def event(name: str, event_type: str) -> int:
+        ids['event'] += 1
+        conn.execute(
+            'INSERT INTO event (event_id, name, event_type) VALUES (?, ?, ?)', (ids['event'], name, event_type)
+        )
+        return ids['event']
+
+    def activity(event_id: int, name: str, activity_type: str, difficulty, day: date) -> int:
+        ids['activity'] += 1
+        conn.execute(
+            'INSERT INTO activity (activity_id, event_id, name, activity_type, difficulty, date) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (ids['activity'], event_id, name, activity_type, difficulty, day.isoformat()),
+        )
+        return ids['activity']
+
+    def attend(activity_id: int, dancers, status: str = 'attended') -> None:
+        conn.executemany(
+            'INSERT OR IGNORE INTO attendance (activity_id, dancer_id, status, ticket_type) VALUES (?, ?, ?, ?)',
+            [(activity_id, d, status, rng.choice(_TICKETS)) for d in dancers],
+        )
+
+    def crowd(size: int) -> list[str]:
+        return [d for d in rng.sample(regulars, size) if rng.random() < 0.5 + keenness[d] / 2]
+
+    for ay in range(_LAST_AY - years + 1, _LAST_AY + 1):
+        first = _thursday_on_or_after(date(ay, 9, 8))
+        for term in range(1, 7):
+            start = first + timedelta(weeks=6 * term - 6 + (2 if term > 2 else 0))  # a gap for Christmas
+            nights = [start + timedelta(weeks=w) for w in range(5)]
+
+            l1 = event(f'Level 1 {ay} term {term}', 'course')
+            signups = [f'N{ay}-{term}-{i}' for i in range(rng.randint(35, 60) - 4 * (term % 3))]
+            for week, night in enumerate(nights):
+                aid = activity(l1, 'Level 1', 'lesson', 'Level 1', night)
+                turnout = 0.75 - 0.07 * week
+                attend(aid, [d for d in signups if rng.random() < turnout])
+                attend(aid, [d for d in signups[:3] if rng.random() < 0.5], status='unknown')
+            conn.execute('INSERT INTO waitlist (event_id, head_count) VALUES (?, ?)', (l1, rng.randint(0, 8)))
+
+            l2 = event(f'Level 2 {ay} term {term}', 'course')
+            for night in nights:
+                aid = activity(l2, 'Level 2', 'lesson', 'Level 2', night)
+                attend(aid, [d for d in regulars[:80] if rng.random() < keenness[d]])
+                conn.executemany(
+                    'INSERT INTO attendance_count (activity_id, ticket_type, head_count) VALUES (?, ?, ?)',
+                    [(aid, 'member', rng.randint(2, 6)), (aid, 'ordinary', rng.randint(1, 4))],
+                )
+                only = activity(l2, 'Social only', 'social', None, night)
+                conn.execute(
+                    'INSERT INTO attendance_count (activity_id, ticket_type, head_count) VALUES (?, ?, ?)',
+                    (only, 'ordinary', rng.randint(2, 9)),
+                )
+
+            social = event(f'Social {ay} term {term}', 'social')
+            attend(activity(social, 'Social', 'social', None, nights[-1] + timedelta(days=3)), crowd(90))
+
+        xmas_day = _thursday_on_or_after(date(ay, 12, 11))
+        xmas = event(f'Christmas party {ay}', 'social')
+        attend(activity(xmas, 'Christmas party', 'social', None, xmas_day), crowd(150))
+        workshop_day = first + timedelta(weeks=3, days=3)  # paired with a social, which the fit drops
+        workshop = event(f'Workshop {ay}', 'workshop')
+        activity(workshop, 'Workshop', 'lesson', None, workshop_day)
+        paired = event(f'Workshop social {ay}', 'social')
+        attend(activity(paired, 'Social', 'social', None, workshop_day), crowd(120))
+
+        wk_fri = _thursday_on_or_after(date(ay + 1, 3, 1)) + timedelta(days=1)
+        wk = event(f'Weekender {ay}', 'weekender')
+        wk_crowd = crowd(200)
+        for offset, kind in [(0, 'social'), (1, 'lesson'), (1, 'social'), (2, 'lesson')]:
+            aid = activity(wk, f'Weekender {kind} {offset}', kind, None, wk_fri + timedelta(days=offset))
+            attend(aid, [d for d in wk_crowd if rng.random() < 0.6])
+
+    conn.commit()
+    store_terms(conn)  # as the ingest does at the end of a run
+    db.close()
+
+
+@pytest.fixture
+def forecast_defaults() -> dict:
+    """A full set of financial defaults, standing in for the private spreadsheet."""
+    return dict(_FORECAST_DEFAULTS)
+
+
+@pytest.fixture(scope='session')
+def forecast_sources():
+    """Write the synthetic attendance DB and defaults CSV into a directory; returns their paths."""
+
+    def write(root: Path, years: int = 4, seed: int = 0) -> tuple[Path, Path]:
+        root.mkdir(parents=True, exist_ok=True)
+        db, defaults = root / 'attendance.sqlite', root / 'forecast_defaults.csv'
+        _build_forecast_db(db, years=years, seed=seed)
+        rows = ''.join(f'{k},{"" if v is None else v}\n' for k, v in _FORECAST_DEFAULTS.items())
+        defaults.write_text('key,value\n' + rows, encoding='utf-8')
+        return db, defaults
+
+    return write
@@ -1,11 +1,15 @@
 from http import HTTPStatus
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
+import respx
 from fastapi import HTTPException
 from fastapi.responses import RedirectResponse
 
+from esds_apps import auth
 from esds_apps.auth import (
+    _is_group_member,
     _safe_next_path,
     build_login_redirect,
     handle_oauth_callback,
@@ -187,3 +191,109 @@ async def test_oauth_callback_bad_state():
         await handle_oauth_callback(request)
     assert exc.value.status_code == HTTPStatus.FORBIDDEN
     assert 'CSRF' in exc.value.detail
+
+
+# ---------------------------------------------------------------------------
+# service account token and group membership caching
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def fresh_auth_caches():
+    auth._SA_TOKENS.clear()
+    auth._SA_TOKEN_REFRESHES.clear()
+    auth._GROUP_MEMBERSHIP.clear()
+    yield
+    auth._SA_TOKENS.clear()
+    auth._SA_TOKEN_REFRESHES.clear()
+    auth._GROUP_MEMBERSHIP.clear()
+
+
+def _token(access_token='tok', lifetime_s=3600):
+    return auth._ServiceAccountToken(access_token, auth.time.monotonic() + lifetime_s)
+
+
+def _has_member_route(is_member=True, status=HTTPStatus.OK):
+    return respx.get(url__startswith=f'{auth._GOOGLE_ADMIN_API}/groups/').mock(
+        return_value=httpx.Response(status, json={'isMember': is_member})
+    )
+
+
+@pytest.mark.asyncio
+async def test_service_account_token_is_reused(fresh_auth_caches):
+    fetch = AsyncMock(return_value=_token())
+    with patch('esds_apps.auth._fetch_service_account_token', fetch):
+        assert await auth._get_service_account_token(['b', 'a']) == 'tok'
+        assert await auth._get_service_account_token(['a', 'b']) == 'tok'
+    fetch.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_service_account_token_refetched_when_nearly_expired(fresh_auth_caches):
+    auth._SA_TOKENS[('a',)] = _token('old', lifetime_s=auth._SA_TOKEN_EXPIRY_MARGIN_S - 1)
+    fetch = AsyncMock(return_value=_token('new'))
+    with patch('esds_apps.auth._fetch_service_account_token', fetch):
+        assert await auth._get_service_account_token(['a']) == 'new'
+
+
+@pytest.mark.asyncio
+async def test_service_account_token_refreshed_in_background(fresh_auth_caches):
+    auth._SA_TOKENS[('a',)] = _token('old', lifetime_s=auth._SA_TOKEN_REFRESH_WINDOW_S - 1)
+    fetch = AsyncMock(return_value=_token('new'))
+    with patch('esds_apps.auth._fetch_service_account_token', fetch):
+        assert await auth._get_service_account_token(['a']) == 'old'
+        await auth._SA_TOKEN_REFRESHES[('a',)]
+    assert auth._SA_TOKENS[('a',)].access_token == 'new'
+
+
+@pytest.mark.asyncio
+async def test_failed_background_refresh_keeps_current_token(fresh_auth_caches):
+    auth._SA_TOKENS[('a',)] = _token('old', lifetime_s=auth._SA_TOKEN_REFRESH_WINDOW_S - 1)
+    fetch = AsyncMock(side_effect=httpx.ConnectError('down'))
+    with patch('esds_apps.auth._fetch_service_account_token', fetch):
+        assert await auth._get_service_account_token(['a']) == 'old'
+        await auth._SA_TOKEN_REFRESHES[('a',)]
+    assert auth._SA_TOKENS[('a',)].access_token == 'old'
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_group_membership_is_cached(fresh_auth_caches):
+    route = _has_member_route(is_member=True)
+    with patch('esds_apps.auth._get_service_account_token', AsyncMock(return_value='tok')):
+        assert await _is_group_member('Alice@example.org') is True
+        assert await _is_group_member('alice@example.org') is True
+    assert route.call_count == 1
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_group_non_membership_expires_sooner(fresh_auth_caches):
+    _has_member_route(is_member=False)
+    with patch('esds_apps.auth._get_service_account_token', AsyncMock(return_value='tok')):
+        assert await _is_group_member('bob@example.org') is False
+    is_member, expires_at = auth._GROUP_MEMBERSHIP['bob@example.org']
+    assert is_member is False
+    assert expires_at - auth.time.monotonic() <= auth.config.GROUP_NON_MEMBERSHIP_CACHE_TIMEOUT_S
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_group_membership_cache_is_bounded(fresh_auth_caches, monkeypatch):
+    monkeypatch.setattr('esds_apps.auth.config.GROUP_MEMBERSHIP_CACHE_MAX_ENTRIES', 2)
+    route = _has_member_route(is_member=False)
+    with patch('esds_apps.auth._get_service_account_token', AsyncMock(return_value='tok')):
+        for email in ['a@example.org', 'b@example.org', 'a@example.org', 'c@example.org']:
+            await _is_group_member(email)
+    assert list(auth._GROUP_MEMBERSHIP) == ['a@example.org', 'c@example.org']  # b was least recently used
+    assert route.call_count == 3
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_group_membership_errors_are_not_cached(fresh_auth_caches):
+    auth._SA_TOKENS[tuple(sorted(auth._GROUP_MEMBER_SCOPES))] = _token()
+    _has_member_route(status=HTTPStatus.UNAUTHORIZED)
+    assert await _is_group_member('carol@example.org') is False
+    assert 'carol@example.org' not in auth._GROUP_MEMBERSHIP
+    assert not auth._SA_TOKENS  # a rejected token is dropped so the next login fetches a new one
@@ -0,0 +1,97 @@
+import dataclasses
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from esds_apps import card_bundle
+from esds_apps.classes import MembershipCardStatus
+
+
+@pytest.fixture(autouse=True)
+def fresh_bundle():
+    card_bundle.reset()
+    yield
+    card_bundle.reset()
+
+
+@pytest.fixture
+def cards(sample_card):
+    future = datetime.now() + timedelta(days=90)
+    valid = dataclasses.replace(sample_card, expires_at=future)
+    other = dataclasses.replace(valid, card_uuid='card-789', card_number='54321')
+    cancelled = dataclasses.replace(valid, card_uuid='card-000', status=MembershipCardStatus.CANCELLED)
+    expired = dataclasses.replace(valid, card_uuid='card-111', expires_at=datetime(2020, 1, 1))
+    return [valid, other, cancelled, expired]
+
+
+def _fetch(*card_lists):
+    return patch('esds_apps.card_bundle.fetch_membership_cards', AsyncMock(side_effect=list(card_lists)))
+
+
+@pytest.mark.asyncio
+async def test_full_bundle_has_only_valid_cards_keyed_by_check_url_hash(cards):
+    with _fetch(cards):
+        result = await card_bundle.bundle()
+    assert result['full'] is True
+    assert set(result['cards']) == {card_bundle.card_key(c.check_url) for c in cards[:2]}
+    assert result['cards'][card_bundle.card_key(cards[0].check_url)] == [
+        cards[0].expires_at.date().isoformat(),
+        'issued',
+    ]
+    assert 'card-456' not in str(result)  # no raw UUIDs
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_reused_until_it_expires(cards):
+    with _fetch(cards, cards) as fetch:
+        await card_bundle.bundle()
+        await card_bundle.bundle()
+        assert fetch.await_count == 1
+        card_bundle.expire()
+        await card_bundle.bundle()
+        assert fetch.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_delta_since_known_version(cards):
+    valid, other, _, _ = cards
+    renewed = dataclasses.replace(valid, expires_at=valid.expires_at + timedelta(days=365))
+    with _fetch(cards, [renewed]):
+        first = await card_bundle.bundle()
+        card_bundle.expire()
+        delta = await card_bundle.bundle(since=first['version'])
+    assert delta['full'] is False
+    assert delta['upserts'] == {
+        card_bundle.card_key(valid.check_url): [renewed.expires_at.date().isoformat(), 'issued']
+    }
+    assert delta['removals'] == [card_bundle.card_key(other.check_url)]
+    assert delta['version'] != first['version']
+
+
+@pytest.mark.asyncio
+async def test_unchanged_bundle_gives_empty_delta(cards):
+    with _fetch(cards):
+        first = await card_bundle.bundle()
+        delta = await card_bundle.bundle(since=first['version'])
+    assert delta['full'] is False
+    assert delta['upserts'] == {}
+    assert delta['removals'] == []
+    assert delta['version'] == first['version']
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('since', ['unknown-version', '0' * 64])
+async def test_unknown_version_gets_full_snapshot(cards, since):
+    with _fetch(cards):
+        result = await card_bundle.bundle(since=since)
+    assert result['full'] is True
+
+
+@pytest.mark.asyncio
+async def test_empty_upstream_keeps_previous_bundle(cards):
+    with _fetch(cards, []):
+        first = await card_bundle.bundle()
+        card_bundle.expire()
+        second = await card_bundle.bundle()
+    assert second['cards'] == first['cards']
@@ -0,0 +1,80 @@
+import httpx
+import pytest
+import respx
+
+from esds_apps import card_check_proxy, config
+
+CHECK_URL = config.DC_HOST + '/members/cards/abc/check'
+
+
+@pytest.fixture(autouse=True)
+def fresh_proxy():
+    card_check_proxy.clear_cache()
+    yield
+    card_check_proxy.clear_cache()
+
+
+async def _body(response):
+    return b''.join([chunk async for chunk in response.body_iterator])
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_proxy_streams_upstream_body():
+    respx.get(CHECK_URL).mock(
+        return_value=httpx.Response(200, content=b'<html>ok</html>', headers={'content-type': 'text/html'})
+    )
+    response = await card_check_proxy.proxy(CHECK_URL)
+    assert response.status_code == 200
+    assert response.media_type == 'text/html'
+    assert await _body(response) == b'<html>ok</html>'
+    await card_check_proxy.close_client()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_repeat_scan_is_served_from_cache():
+    route = respx.get(CHECK_URL).mock(return_value=httpx.Response(200, content=b'valid'))
+    await _body(await card_check_proxy.proxy(CHECK_URL))
+    again = await card_check_proxy.proxy(CHECK_URL)
+    assert again.body == b'valid'
+    assert route.call_count == 1
+    assert card_check_proxy.metrics()['cache_hits'] >= 1
+    await card_check_proxy.close_client()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_expired_or_failed_checks_are_refetched(monkeypatch):
+    route = respx.get(CHECK_URL).mock(return_value=httpx.Response(502, content=b'bad gateway'))
+    await _body(await card_check_proxy.proxy(CHECK_URL))
+    await _body(await card_check_proxy.proxy(CHECK_URL))
+    assert route.call_count == 2  # errors aren't cached
+
+    route.mock(return_value=httpx.Response(200, content=b'valid'))
+    monkeypatch.setattr(config, 'CARD_CHECK_CACHE_TTL_S', 0)
+    await _body(await card_check_proxy.proxy(CHECK_URL))
+    await _body(await card_check_proxy.proxy(CHECK_URL))
+    assert route.call_count == 4
+    await card_check_proxy.close_client()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_client_is_reused_between_scans():
+    respx.get(url__startswith=config.DC_HOST).mock(return_value=httpx.Response(200, content=b'valid'))
+    await _body(await card_check_proxy.proxy(CHECK_URL))
+    client = card_check_proxy._client
+    await _body(await card_check_proxy.proxy(CHECK_URL + '?other'))
+    assert card_check_proxy._client is client
+    await card_check_proxy.close_client()
+    assert card_check_proxy._client is None
+
+
+def test_metrics_report_latency_percentiles(monkeypatch):
+    monkeypatch.setattr(card_check_proxy, '_latencies_s', [0.001 * i for i in range(1, 101)])
+    metrics = card_check_proxy.metrics()
+    assert metrics['latency_samples'] == 100
+    assert metrics['p50_ms'] == pytest.approx(51.0)
+    assert metrics['p95_ms'] == pytest.approx(96.0)
+    assert metrics['max_ms'] == pytest.approx(100.0)
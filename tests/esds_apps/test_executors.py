@@ -0,0 +1,63 @@
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from esds_apps import executors
+from esds_apps.executors import BoundedPool, ExecutorOverloaded
+
+
+@pytest.fixture
+def pool():
+    return BoundedPool('test', max_workers=1, max_queued=1, retry_after_s=3)
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result_off_the_event_loop(pool):
+    loop_thread = threading.get_ident()
+    result, worker_thread = await pool.run(lambda x: (x * 2, threading.get_ident()), 21)
+    assert result == 42
+    assert worker_thread != loop_thread
+
+
+@pytest.mark.asyncio
+async def test_run_propagates_exceptions(pool):
+    def _boom():
+        raise FileNotFoundError('no db')
+
+    with pytest.raises(FileNotFoundError):
+        await pool.run(_boom)
+    assert pool.metrics()['failed'] == 1
+
+
+@pytest.mark.asyncio
+async def test_run_copies_context_variables(pool):
+    var = contextvars.ContextVar('var', default='unset')
+    var.set('request-scoped')
+    assert await pool.run(var.get) == 'request-scoped'
+
+
+@pytest.mark.asyncio
+async def test_full_pool_rejects_instead_of_queueing(pool):
+    release = threading.Event()
+    running = asyncio.ensure_future(pool.run(release.wait))
+    queued = asyncio.ensure_future(pool.run(lambda: 'queued'))
+    await asyncio.sleep(0)
+
+    with pytest.raises(ExecutorOverloaded) as exc:
+        await pool.run(lambda: 'rejected')
+    assert exc.value.retry_after_s == 3
+
+    release.set()
+    assert await running is True
+    assert await queued == 'queued'
+    metrics = pool.metrics()
+    assert metrics['submitted'] == 2
+    assert metrics['rejected'] == 1
+    assert metrics['completed'] == 2
+    assert metrics['in_flight'] == 0
+
+
+def test_module_pools_are_reported():
+    assert set(executors.metrics()) == set(executors.config.EXECUTOR_POOLS)
@@ -2,10 +2,12 @@
 
 The behavioural context is normally fitted from the attendance database; here we build a small synthetic
 ``ForecastContext`` so the ledger, the unscented transform and the response shape can be tested without a
-database. A complete defaults dict stands in for the private spreadsheet.
+database. The ``forecast_defaults`` fixture (conftest.py) stands in for the private spreadsheet.
 """
 
 import io
+import sqlite3
+import threading
 from datetime import date
 from http import HTTPStatus
 
@@ -17,86 +19,8 @@ from fastapi.testclient import TestClient
 from esds_apps import forecast
 from esds_apps.main import app
 
-# A full set of financial defaults, standing in for the private spreadsheet.
-DEFAULTS = {
-    'forecast_ay': 2026,
-    'n_tea_dances': 2,
-    'have_weekender': True,
-    'loyalty_enabled': True,
-    'loyalty_every': 8,
-    'class_size_cap': None,
-    'l1_per_night': False,
-    'class_card_size': 1,
-    'confidence': 0.95,
-    'price_class_disc': 7,
-    'price_class_ord': 8,
-    'price_social_disc': 9,
-    'price_social_ord': 10,
-    'price_social_only_disc': 3.5,
-    'price_social_only_ord': 4.5,
-    'price_wk_full_disc': 100,
-    'price_wk_full_ord': 120,
-    'price_wk_day_disc': 40,
-    'price_wk_day_ord': 45,
-    'price_wk_social': 40,
-    'membership_fee': 12,
-    'room_per_hour': 35,
-    'room_per_hour_b': 20,
-    'class_room_hour_a': 2.75,
-    'class_room_hour_b': 2.0,
-    'teacher_rate': 15,
-    'teacher_hours_a': 2,
-    'teacher_hours_b': 2,
-    'teacher_hours_c': 1,
-    'teacher_hours_d': 1,
-    'social_snacks': 65,
-    'social_room_hours': 4,
-    'social_room_per_hour': 35,
-    'band_cost_mean': 717.0,
-    'band_cost_std': 97.0,
-    'weekender_bands': 3,
-    'weekender_room_hours': 40,
-    'weekender_room_per_hour': 40,
-    'weekender_teachers': 2,
-    'weekender_teacher_rate': 60,
-    'weekender_teacher_hours': 12,
-    'weekender_flight': 250,
-    'weekender_board_per_night': 90,
-    'weekender_nights': 2,
-    'n_committee': 9,
-    'n_safer_spaces': 4,
-    'safer_spaces_accounts': True,
-    'n_extra_volunteers': 4,
-    'n_legacy_accounts': 2,
-    'n_shared_accounts': 1,
-    'gsuite_seat_monthly': 5.9,
-    'wix_reseller_annual': 157.44,
-    'volunteer_social_per_head': 35,
-    'n_volunteer_socials': 2,
-    'oh_website': 129.6,
-    'oh_email_marketing': 237.6,
-    'oh_insurance': 109.6,
-    'oh_storage_container': 516.66,
-    'oh_spotify': 127.3,
-    'oh_survey_monkey': 148.5,
-    'oh_pat_testing': 110.4,
-    'oh_equipment_recap': 150,
-    'oh_society_phone': 96,
-    'oh_posters': 120,
-    'oh_stationery': 120,
-    'oh_canva': 110,
-    'n_members': 72,
-    'membership_std': 11.6,
-    'current_balance': 19498,
-    'dc_rate': 0.025,
-    'dc_fixed': 0.5,
-    'dc_cap': 5.0,
-    'stripe_rate': 0.015,
-    'stripe_fixed': 0.2,
-}
-
-
-def make_context():
+
+def make_context(defaults: dict):
     """A small but internally consistent context (positive-definite covariance, valid survival fit)."""
     return forecast.ForecastContext(
         beta=np.array([30.0, -7.0, 5.0, 20.0, 0.0, -8.0, -18.0]),
@@ -131,13 +55,13 @@ def make_context():
             'r2': 0.99,
             'family': 'weibull',
         },
-        defaults=dict(DEFAULTS),
+        defaults=defaults,
     )
 
 
 @pytest.fixture
-def ctx(monkeypatch):
-    c = make_context()
+def ctx(monkeypatch, forecast_defaults):
+    c = make_context(forecast_defaults)
     monkeypatch.setattr(forecast, '_CONTEXT', c)
     monkeypatch.setattr(forecast, 'get_context', lambda force_rebuild=False: c)
     return c
@@ -293,6 +217,386 @@ def test_class_card_reduces_dancecloud_fees(ctx):
     assert rev_single == rev_pack
 
 
+@pytest.mark.parametrize(
+    'overrides',
+    [
+        {},
+        {'l1_per_night': True},
+        {'class_size_cap': 20},
+        {'class_card_size': 10},
+        {'loyalty_enabled': False},
+        {'have_weekender': False, 'n_volunteer_socials': 0},
+    ],
+)
+def test_compiled_ledger_matches_run_scenario(ctx, overrides):
+    """The batched ledger reproduces the reference ledger for any input vector, clipping included."""
+    p = forecast._merge_params(ctx, overrides)
+    cal = forecast.build_calendar(int(p['forecast_ay']))
+    socials = forecast.place_socials(cal, int(p['n_tea_dances']), bool(p['have_weekender']))
+    mu, sigma = forecast._mu_sigma(ctx, p, cal)
+    xs = np.random.default_rng(0).multivariate_normal(mu, sigma + np.eye(len(mu)) * 1e-6, size=40)
+    xs[0] = mu
+    xs[1] = -mu  # everything floored at zero
+
+    ledger = forecast.compile_ledger(ctx, p, cal, socials)
+    ev = ledger.evaluate(xs)
+    for i, x in enumerate(xs):
+        ref = forecast.run_scenario(ctx, p, cal, socials, x)
+        assert ev.net[i] == pytest.approx(ref['net'], abs=1e-6)
+        assert ev.total_dc[i] == pytest.approx(ref['total_dc'], abs=1e-6)
+        assert ev.total_stripe[i] == pytest.approx(ref['total_stripe'], abs=1e-6)
+        assert ledger.dates == [dt for dt, _ in ref['balance']]
+        assert ev.balance[i] == pytest.approx([b for _, b in ref['balance']], abs=1e-6)
+
+
+def test_compiled_ledger_category_totals(ctx):
+    p = forecast._merge_params(ctx, {})
+    cal = forecast.build_calendar(int(p['forecast_ay']))
+    socials = forecast.place_socials(cal, int(p['n_tea_dances']), bool(p['have_weekender']))
+    mu, _ = forecast._mu_sigma(ctx, p, cal)
+    ledger = forecast.compile_ledger(ctx, p, cal, socials)
+    ev = ledger.evaluate(mu)
+    ref = forecast.run_scenario(ctx, p, cal, socials, mu)
+    for cat in ledger.categories:
+        k = ledger.categories.index(cat)
+        assert ev.revenue[0, k] == pytest.approx(sum(r[3] for r in ref['ledger'] if r[1] == cat))
+        assert ev.cost[0, k] == pytest.approx(sum(r[5] for r in ref['ledger'] if r[1] == cat))
+
+
+@pytest.mark.parametrize(
+    'overrides',
+    [{}, {'l1_per_night': True}, {'class_size_cap': 20}, {'class_card_size': 10}, {'dc_cap': 0.6}],
+)
+def test_ledger_gradients_match_finite_differences(ctx, monkeypatch, overrides):
+    """Away from the clips the analytic gradient is the slope of evaluate, with round() taken as smooth."""
+    p = forecast._merge_params(ctx, overrides)
+    cal = forecast.build_calendar(int(p['forecast_ay']))
+    socials = forecast.place_socials(cal, int(p['n_tea_dances']), bool(p['have_weekender']))
+    mu, _ = forecast._mu_sigma(ctx, p, cal)
+    mu[5] = 3.0  # keep the sixth term's sign-ups off their zero floor
+    ledger = forecast.compile_ledger(ctx, p, cal, socials)
+    monkeypatch.setattr(forecast.np, 'round', lambda a: a)
+
+    grad, line_grads = ledger.gradients(mu)
+    h, eye = 1e-4, np.eye(len(mu))
+    fd = np.array([(ledger.evaluate(mu + h * e).net[0] - ledger.evaluate(mu - h * e).net[0]) / (2 * h) for e in eye])
+    assert grad == pytest.approx(fd, rel=1e-6, abs=1e-6)
+    assert line_grads.shape == (len(ledger.budget_lines), len(mu))
+    assert line_grads.sum(axis=0) == pytest.approx(grad)
+
+
+def test_contributors_by_line_sum_to_the_whole(ctx):
+    r = forecast.predict()
+    assert r['contributors'] and r['contributors_by_line']
+    assert sum(c['pct'] for c in r['contributors_by_line']) == pytest.approx(100, abs=1)
+    assert sum(c['pct'] for c in r['contributors']) == pytest.approx(100, abs=1)
+    budget_lines = {b['category'] for b in r['budget']}
+    assert {c['name'] for c in r['contributors_by_line']} <= budget_lines
+
+
+# ---------------------------------------------------------------- engines
+def test_monte_carlo_engine_shape(ctx):
+    r = forecast.predict(engine='monte_carlo')
+    assert r['engine']['name'] == 'monte_carlo'
+    assert forecast.config.FORECAST_MC_MIN_SAMPLES <= r['engine']['samples'] <= forecast.config.FORECAST_MC_MAX_SAMPLES
+    assert r['net']['lo'] < r['net']['mean'] < r['net']['hi']
+    assert r['year_end_balance']['mean'] == r['balance']['mean'][-1]
+    assert all(lo <= hi for lo, hi in zip(r['balance']['lo'], r['balance']['hi']))
+    hist = r['histogram']
+    assert sum(hist['counts']) == r['engine']['samples']
+    assert len(hist['edges']) == len(hist['counts']) + 1 == forecast.config.FORECAST_MC_HISTOGRAM_BINS + 1
+    # the itemised budget is the same point estimate whichever engine draws the bands
+    assert r['budget'] == forecast.predict()['budget']
+    assert 'histogram' not in forecast.predict()
+
+
+def test_monte_carlo_engine_is_repeatable_and_cached_apart(ctx):
+    first = forecast.predict(engine='monte_carlo')
+    forecast.clear_results()
+    again = forecast.predict(engine='monte_carlo')
+    assert again['net'] == first['net'] and again['histogram'] == first['histogram']
+    assert forecast.predict()['scenario'] != again['scenario']
+
+
+def test_unknown_engine_rejected(ctx):
+    with pytest.raises(ValueError, match='engine'):
+        forecast.predict(engine='tarot')
+
+
+def test_monte_carlo_stops_early_once_converged(ctx, monkeypatch):
+    monkeypatch.setattr('esds_apps.forecast.config.FORECAST_MC_TARGET_SE', 1e6)
+    assert forecast.predict(engine='monte_carlo')['engine']['samples'] == forecast.config.FORECAST_MC_MIN_SAMPLES
+    forecast.clear_results()
+    monkeypatch.setattr('esds_apps.forecast.config.FORECAST_MC_TARGET_SE', 0)
+    assert forecast.predict(engine='monte_carlo')['engine']['samples'] == forecast.config.FORECAST_MC_MAX_SAMPLES
+
+
+def test_monte_carlo_follows_a_skewed_net(ctx):
+    """Both engines' 95% bands against 32k plain Monte Carlo draws, where the Level 1 floors skew the net.
+
+    The unscented transform's symmetric band misses by over £100 at each end here; the quasi-Monte Carlo
+    percentiles land within a few tens of pounds of the reference. (test_forecast_benchmarks compares the
+    engines on the default scenario, and times them.)
+    """
+    p = forecast._merge_params(ctx, {})
+    cal = forecast.build_calendar(int(p['forecast_ay']))
+    mu, sigma = forecast._mu_sigma(ctx, p, cal)
+    ledger = forecast.compile_ledger(ctx, p, cal, forecast.place_socials(cal, int(p['n_tea_dances']), True))
+    xs = np.random.default_rng(1).multivariate_normal(mu, sigma, size=32768)
+    nets = np.concatenate([ledger.evaluate(chunk).net for chunk in np.array_split(xs, 16)])
+    ref_lo, ref_hi = np.percentile(nets, [2.5, 97.5])
+
+    def error(engine):
+        net = forecast.predict(confidence=0.95, engine=engine)['net']
+        return max(abs(net['lo'] - ref_lo), abs(net['hi'] - ref_hi))
+
+    assert error('monte_carlo') < 60 < error('unscented')
+
+
+# ---------------------------------------------------------------- memoisation
+def test_predict_memoises_repeat_scenarios(ctx, monkeypatch):
+    first = forecast.predict({'teacher_rate': 20}, 0.9)
+    monkeypatch.setattr(forecast, '_forecast', lambda *a: pytest.fail('recomputed a memoised scenario'))
+    # the same merged parameters however they were spelled
+    assert forecast.predict({'teacher_rate': '20.0', 'not_a_param': 1}, 0.9) is first
+
+
+def test_predict_cache_key_covers_confidence_and_context(ctx, monkeypatch, forecast_defaults):
+    base = forecast.predict({}, 0.9)
+    assert forecast.predict({}, 0.8) is not base
+    rebuilt = make_context(forecast_defaults)
+    monkeypatch.setattr(forecast, 'get_context', lambda force_rebuild=False: rebuilt)
+    assert forecast.predict({}, 0.9) is not base
+
+
+def test_predict_cache_is_bounded(ctx, monkeypatch):
+    monkeypatch.setattr('esds_apps.forecast.config.FORECAST_RESULT_CACHE_SIZE', 2)
+    forecast.clear_results()
+    first = forecast.predict({'teacher_rate': 10})
+    forecast.predict({'teacher_rate': 11})
+    assert forecast.predict({'teacher_rate': 10}) is first  # refreshes its place in the LRU
+    forecast.predict({'teacher_rate': 12})
+    assert len(forecast._RESULTS) == 2
+    assert forecast.predict({'teacher_rate': 10}) is first
+
+
+def test_context_derived_quantities_are_memoised(ctx):
+    assert forecast._l1_pred(ctx, 2026) is forecast._l1_pred(ctx, 2026)
+    assert forecast._sigma_l1(ctx, 2026) is forecast._sigma_l1(ctx, 2026)
+    assert forecast.build_calendar(2026) is forecast.build_calendar(2026)
+    assert forecast._l1_pred(ctx, 2027) != forecast._l1_pred(ctx, 2026)
+
+
+def test_context_memo_is_bounded(ctx, monkeypatch):
+    monkeypatch.setattr('esds_apps.forecast.config.FORECAST_CONTEXT_MEMO_SIZE', 2)
+    first = forecast._l1_pred(ctx, 2026)
+    forecast._l1_pred(ctx, 2027)
+    assert forecast._l1_pred(ctx, 2026) is first  # used again, so 2027 is now the least recent
+    forecast._l1_pred(ctx, 2028)
+    assert list(ctx.memo) == [('l1_pred', 2026), ('l1_pred', 2028)]
+
+
+# ---------------------------------------------------------------- comparing scenarios
+def test_compare_matches_predict_for_each_scenario(ctx):
+    scenarios = [
+        {},
+        {'price_class_ord': 10},
+        {'teacher_rate': 25, 'n_members': 90},
+        {'class_size_cap': 20},
+        {'have_weekender': False},
+        {'loyalty_enabled': False},
+    ]
+    rows = forecast.compare({'price_class_disc': 6}, scenarios, 0.9)
+    forecast.clear_results()
+    for row, overrides in zip(rows, scenarios):
+        expected = forecast.predict({'price_class_disc': 6, **overrides}, 0.9)
+        assert row['overrides'] == overrides and row['confidence'] == 0.9
+        for figure in ('net', 'year_end_balance'):
+            for k, v in expected[figure].items():
+                assert row[figure][k] == pytest.approx(v, abs=1)
+        assert row['p_green'] == pytest.approx(expected['p_green'], abs=1e-3)
+
+
+def test_compare_reads_memoised_results(ctx, monkeypatch):
+    shown = forecast.predict({'teacher_rate': 20})
+    monkeypatch.setattr(forecast, '_sigma_points', lambda *a: pytest.fail('re-ran a memoised scenario'))
+    [row] = forecast.compare({}, [{'teacher_rate': 20}])
+    assert row['net'] == shown['net'] and row['p_green'] == shown['p_green']
+
+
+def test_compare_limits_the_batch(ctx, monkeypatch):
+    monkeypatch.setattr('esds_apps.forecast.config.FORECAST_COMPARE_MAX_SCENARIOS', 3)
+    with pytest.raises(ValueError):
+        forecast.compare({}, [{}] * 4)
+
+
+def test_sweep_scenarios():
+    assert forecast.sweep('teacher_rate', values=[10, 20]) == [{'teacher_rate': 10}, {'teacher_rate': 20}]
+    assert forecast.sweep('price_class_ord', start=6, stop=8, steps=3) == [
+        {'price_class_ord': 6.0},
+        {'price_class_ord': 7.0},
+        {'price_class_ord': 8.0},
+    ]
+    with pytest.raises(ValueError):
+        forecast.sweep('not_a_param', values=[1])
+    with pytest.raises(ValueError):
+        forecast.sweep('teacher_rate', start=1)
+
+
+@pytest.mark.parametrize('sweep', [{'start': 0, 'stop': 1, 'steps': 1e9}, {'values': list(range(4))}, {'values': 3}])
+def test_sweep_is_limited_before_it_is_built(sweep, monkeypatch):
+    monkeypatch.setattr('esds_apps.forecast.config.FORECAST_COMPARE_MAX_SCENARIOS', 3)
+    monkeypatch.setattr(forecast.np, 'linspace', lambda *a: pytest.fail('built an oversized sweep'))
+    with pytest.raises(ValueError):
+        forecast.sweep('teacher_rate', **sweep)
+
+
+# ---------------------------------------------------------------- goal seek
+def test_solve_one_parameter_finds_the_break_even_price(ctx, forecast_defaults):
+    r = forecast.solve({}, {'price_class_ord': [6, 20]}, {'metric': 'p_green', 'at_least': 0.8})
+    assert r['feasible'] and r['base'] == {'price_class_ord': forecast_defaults['price_class_ord']}
+    price = r['optimum']['price_class_ord']
+    assert forecast.predict({'price_class_ord': price + 0.01})['p_green'] >= 0.8
+    assert forecast.predict({'price_class_ord': price - 0.05})['p_green'] < 0.8  # and no dearer than needed
+    curve = r['curve']
+    assert len(curve) == forecast.config.FORECAST_SOLVE_CURVE_STEPS
+    assert [row['metric'] for row in curve] == sorted(row['metric'] for row in curve)
+
+
+def test_solve_several_parameters_meets_the_target(ctx, forecast_defaults):
+    free = {'price_class_ord': [6, 20], 'teacher_rate': [10, 40]}
+    r = forecast.solve({}, free, {'metric': 'net', 'at_least': 0})
+    assert r['feasible'] and r['achieved'] >= -0.01
+    assert forecast.predict(r['optimum'])['net']['mean'] >= -1
+    assert r['optimum']['price_class_ord'] > forecast_defaults['price_class_ord']
+    assert r['optimum']['teacher_rate'] < forecast_defaults['teacher_rate']
+    # the trade-off: the cheaper the class, the less the teachers can be paid (None: not even at the floor)
+    rates = [row['teacher_rate'] for row in r['curve'] if row['teacher_rate'] is not None]
+    assert rates and rates == sorted(rates)
+
+
+def test_solve_reports_the_best_it_can_when_infeasible(ctx):
+    r = forecast.solve({}, {'price_class_ord': [6, 8]}, {'metric': 'p_green', 'at_least': 0.8})
+    assert not r['feasible']
+    assert r['optimum']['price_class_ord'] == pytest.approx(8, abs=0.01)  # dearer is better, up to the bound
+
+
+def test_solve_already_met_changes_nothing(ctx):
+    r = forecast.solve({}, {'teacher_rate': [10, 40]}, {'metric': 'net', 'at_least': -1e6})
+    assert r['feasible'] and r['optimum'] == r['base']
+
+
+def test_solve_results_are_cached(ctx, monkeypatch):
+    args = ({}, {'price_class_ord': [6, 20]}, {'metric': 'p_green', 'at_least': 0.8})
+    first = forecast.solve(*args)
+    monkeypatch.setattr(forecast, '_summary', lambda *a: pytest.fail('should be cached'))
+    assert forecast.solve(*args) is first
+
+
+@pytest.mark.parametrize(
+    'free, target',
+    [
+        ({}, {'metric': 'net', 'at_least': 0}),
+        ({'n_tea_dances': [1, 4]}, {'metric': 'net', 'at_least': 0}),
+        ({'nope': [1, 4]}, {'metric': 'net', 'at_least': 0}),
+        ({'teacher_rate': [40, 10]}, {'metric': 'net', 'at_least': 0}),
+        ({'teacher_rate': [10, 40]}, {'metric': 'vibes', 'at_least': 0}),
+        ([['teacher_rate', 10, 40]], {'metric': 'net', 'at_least': 0}),
+        ({'teacher_rate': [10, 40]}, 'p_green'),
+    ],
+)
+def test_solve_rejects_bad_problems(ctx, free, target):
+    with pytest.raises(ValueError):
+        forecast.solve({}, free, target)
+
+
+# ---------------------------------------------------------------- context from the attendance DB
+@pytest.fixture
+def sources(tmp_path, monkeypatch, forecast_sources):
+    """A synthetic attendance DB and defaults CSV in place of the real ones, with no context built yet."""
+    db, defaults = forecast_sources(tmp_path, years=3)
+    monkeypatch.setattr('esds_apps.forecast.config.ATTENDANCE_DB_PATH', db)
+    monkeypatch.setattr('esds_apps.forecast.config.FORECAST_DEFAULTS_PATH', defaults)
+    monkeypatch.setattr(forecast, '_CONTEXT', None)
+    monkeypatch.setattr(forecast, '_REBUILD', None)
+    monkeypatch.setattr(forecast, '_FAILED_FINGERPRINT', None)
+    return db
+
+
+def _wait_for_rebuild():
+    rebuild = forecast._REBUILD
+    if rebuild is not None:
+        rebuild.join(timeout=30)
+
+
+def test_build_context_from_db(sources):
+    ctx = forecast._build_context()
+    assert len(ctx.l1_history) == 18  # three full years of six Level 1 terms
+    assert all(r['interest'] > 0 for r in ctx.l1_history)
+    assert 0 < ctx.l1_attend_curve[-1] < ctx.l1_attend_curve[0] < 1
+    assert ctx.l2_vals and ctx.soc_vals and len(ctx.xmas_vals) == 3
+    assert ctx.wk_mix['retained'] > 0
+    assert forecast.get_context() is not ctx  # _build_context alone doesn't install it
+
+
+def test_build_context_query_count_does_not_grow_with_history(sources, monkeypatch, tmp_path, forecast_sources):
+    real_connect = sqlite3.connect
+
+    def count_queries(years):
+        db, _ = forecast_sources(tmp_path / f'{years}-years', years=years)
+        monkeypatch.setattr('esds_apps.forecast.config.ATTENDANCE_DB_PATH', db)
+        statements = []
+
+        def traced(*args, **kwargs):
+            conn = real_connect(*args, **kwargs)
+            conn.set_trace_callback(statements.append)
+            return conn
+
+        monkeypatch.setattr(sqlite3, 'connect', traced)
+        forecast._build_context()
+        monkeypatch.setattr(sqlite3, 'connect', real_connect)
+        return len(statements)
+
+    assert count_queries(3) == count_queries(6)
+
+
+def test_get_context_rebuilds_in_background_when_db_changes(sources, monkeypatch):
+    first = forecast.get_context()
+    assert forecast.get_context() is first and forecast._REBUILD is None
+
+    release = threading.Event()
+    real_build = forecast._build_context
+    monkeypatch.setattr(forecast, '_build_context', lambda: (release.wait(10), real_build())[1])
+    with sqlite3.connect(sources) as conn:
+        conn.execute('INSERT INTO waitlist (event_id, head_count) VALUES (1, 50)')
+    # the change is noticed, but the old context keeps serving until the rebuild finishes
+    assert forecast.get_context() is first
+    assert forecast._REBUILD is not None
+    release.set()
+    _wait_for_rebuild()
+
+    rebuilt = forecast.get_context()
+    assert rebuilt is not first and rebuilt.version != first.version
+    assert rebuilt.l1_history[0]['interest'] == first.l1_history[0]['interest'] + 50
+
+
+def test_get_context_keeps_serving_when_a_rebuild_fails(sources, monkeypatch):
+    first = forecast.get_context()
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise sqlite3.DatabaseError('file is not a database')
+
+    monkeypatch.setattr(forecast, '_build_context', broken)
+    sources.write_bytes(b'half-uploaded')
+    assert forecast.get_context() is first
+    _wait_for_rebuild()
+    # not retried until the files change again
+    assert forecast.get_context() is first and forecast._REBUILD is None
+    assert calls == [1]
+
+
 # ---------------------------------------------------------------- defaults CSV loading
 def test_coerce_infers_types():
     assert forecast._coerce('') is None
@@ -328,6 +632,27 @@ def test_to_workbook_is_valid_xlsx(ctx):
     assert 'Teacher pay per hour' in labels
 
 
+def test_to_workbook_reuses_the_scenario_on_screen(ctx, monkeypatch):
+    shown = forecast.predict({'teacher_rate': 20}, 0.9)
+    monkeypatch.setattr(forecast, '_forecast', lambda *a: pytest.fail('recomputed the forecast for a download'))
+    # the token wins over parameters the operator has since changed but not yet re-predicted
+    content = forecast.to_workbook({'teacher_rate': 30}, 0.8, shown['scenario'])
+    wb = openpyxl.load_workbook(io.BytesIO(content))
+    params = {row[2]: row[1] for row in wb['parameters'].iter_rows(min_row=2, values_only=True)}
+    assert params['teacher_rate'] == 20
+    assert wb['summary']['B3'].value == 0.9
+    assert wb['summary']['B6'].value == shown['net']['mean']
+
+
+@pytest.mark.parametrize('scenario', ['evicted-or-forged', 42, ['not', 'a', 'token']])
+def test_to_workbook_falls_back_to_params_for_an_unknown_scenario(ctx, scenario):
+    content = forecast.to_workbook({'teacher_rate': 30}, 0.8, scenario)
+    wb = openpyxl.load_workbook(io.BytesIO(content))
+    params = {row[2]: row[1] for row in wb['parameters'].iter_rows(min_row=2, values_only=True)}
+    assert params['teacher_rate'] == 30
+    assert wb['summary']['B3'].value == 0.8
+
+
 # ---------------------------------------------------------------- routes
 @pytest.fixture
 def client():
@@ -340,8 +665,8 @@ def auth_client(monkeypatch):
     return TestClient(app, follow_redirects=False)
 
 
-def test_forecast_page_renders(auth_client, monkeypatch):
-    monkeypatch.setattr('esds_apps.main.forecast.get_context', lambda: make_context())
+def test_forecast_page_renders(auth_client, monkeypatch, forecast_defaults):
+    monkeypatch.setattr('esds_apps.main.forecast.get_context', lambda: make_context(forecast_defaults))
     monkeypatch.setattr('esds_apps.main.forecast.predict', lambda: {'net': {'mean': -2000}})
     monkeypatch.setattr('esds_apps.main.forecast.default_params', lambda c: {'teacher_rate': 15})
     resp = auth_client.get('/forecast')
@@ -363,15 +688,41 @@ def test_forecast_page_unavailable_when_data_missing(auth_client, monkeypatch):
 def test_forecast_predict_json(auth_client, monkeypatch):
     captured = {}
 
-    def fake_predict(params, confidence):
-        captured['args'] = (params, confidence)
+    def fake_predict(params, confidence, engine):
+        captured['args'] = (params, confidence, engine)
         return {'net': {'mean': -2081, 'lo': -5500, 'hi': 1400}}
 
     monkeypatch.setattr('esds_apps.main.forecast.predict', fake_predict)
     resp = auth_client.post('/forecast/predict.json', json={'params': {'teacher_rate': 25}, 'confidence': 0.9})
     assert resp.status_code == HTTPStatus.OK
     assert resp.json()['net']['mean'] == -2081
-    assert captured['args'] == ({'teacher_rate': 25}, 0.9)
+    assert captured['args'] == ({'teacher_rate': 25}, 0.9, None)
+
+
+def test_forecast_predict_json_engine(auth_client, ctx):
+    resp = auth_client.post('/forecast/predict.json', json={'params': {}, 'engine': 'monte_carlo'})
+    assert resp.status_code == HTTPStatus.OK
+    assert resp.json()['engine']['name'] == 'monte_carlo' and resp.json()['histogram']['counts']
+    resp = auth_client.post('/forecast/predict.json', json={'params': {}, 'engine': 'tarot'})
+    assert resp.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_forecast_predict_server_timing(auth_client, ctx):
+    resp = auth_client.post('/forecast/predict.json', json={'params': {'teacher_rate': 31}})
+    assert resp.status_code == HTTPStatus.OK
+    stages = [part.split(';')[0] for part in resp.headers['server-timing'].split(', ')]
+    assert {'forecast_pool', 'context', 'forecast', 'mu_sigma', 'cholesky', 'evaluate', 'contributors'} <= set(stages)
+    assert stages[-2:] == ['encode', 'total']
+    assert 'timing' not in resp.json()
+
+    # the repeat is served from the result cache, so there's no forecast stage to time
+    resp = auth_client.post('/forecast/predict.json?debug=timing', json={'params': {'teacher_rate': 31}})
+    payload = resp.json()['timing']
+    assert 'forecast' not in payload and payload['total'] >= payload['context'] >= 0
+    assert 'timing' not in forecast.predict({'teacher_rate': 31})  # the cached result wasn't touched
+
+    resp = auth_client.post('/forecast/predict.json?debug=everything', json={'params': {}})
+    assert resp.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
 
 
 def test_forecast_predict_requires_auth(client):
@@ -380,7 +731,7 @@ def test_forecast_predict_requires_auth(client):
 
 
 def test_forecast_predict_db_missing(auth_client, monkeypatch):
-    def _raise(params, confidence):
+    def _raise(params, confidence, engine):
         raise FileNotFoundError('no data')
 
     monkeypatch.setattr('esds_apps.main.forecast.predict', _raise)
@@ -389,10 +740,64 @@ def test_forecast_predict_db_missing(auth_client, monkeypatch):
     assert 'error' in resp.json()
 
 
+def test_forecast_compare_sweep(auth_client, ctx):
+    body = {'params': {}, 'sweep': {'param': 'price_class_ord', 'start': 6, 'stop': 12, 'steps': 50}}
+    resp = auth_client.post('/forecast/compare.json', json=body)
+    assert resp.status_code == HTTPStatus.OK
+    rows = resp.json()['scenarios']
+    assert len(rows) == 50
+    nets = [r['net']['mean'] for r in rows]
+    assert nets == sorted(nets)  # dearer classes, more money
+
+
+def test_forecast_compare_rejects_bad_sweeps(auth_client, ctx):
+    resp = auth_client.post('/forecast/compare.json', json={'sweep': {'param': 'nope', 'values': [1]}})
+    assert resp.status_code == HTTPStatus.BAD_REQUEST
+    resp = auth_client.post('/forecast/compare.json', json={'sweep': {'param': 'teacher_rate', 'by': 2}})
+    assert resp.status_code == HTTPStatus.BAD_REQUEST
+    resp = auth_client.post('/forecast/compare.json', json={'sweep': ['teacher_rate', 10, 20]})
+    assert resp.status_code == HTTPStatus.BAD_REQUEST
+    resp = auth_client.post(
+        '/forecast/compare.json', json={'sweep': {'param': 'teacher_rate', 'start': 0, 'stop': 1, 'steps': 1e9}}
+    )
+    assert resp.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_forecast_solve_json(auth_client, ctx):
+    body = {'free': {'price_class_ord': [6, 20]}, 'target': {'metric': 'p_green', 'at_least': 0.8}}
+    resp = auth_client.post('/forecast/solve.json', json=body)
+    assert resp.status_code == HTTPStatus.OK
+    assert resp.json()['feasible'] and resp.json()['curve']
+    resp = auth_client.post('/forecast/solve.json', json={'free': {'price_class_ord': [6, 20]}, 'target': {}})
+    assert resp.status_code == HTTPStatus.BAD_REQUEST
+    body['target'] = {'metric': 'net'}
+    assert auth_client.post('/forecast/solve.json', json=body).status_code == HTTPStatus.BAD_REQUEST
+    body['target'] = 'p_green'
+    assert auth_client.post('/forecast/solve.json', json=body).status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_forecast_solve_requires_auth(client):
+    resp = client.post('/forecast/solve.json', json={'free': {'teacher_rate': [10, 40]}})
+    assert resp.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_forecast_compare_requires_auth(client):
+    resp = client.post('/forecast/compare.json', json={'scenarios': [{}]})
+    assert resp.status_code == HTTPStatus.UNAUTHORIZED
+
+
 def test_forecast_download_xlsx(auth_client, monkeypatch):
-    monkeypatch.setattr('esds_apps.main.forecast.to_workbook', lambda params, confidence: b'PK\x03\x04fakexlsx')
-    resp = auth_client.post('/forecast/download.xlsx', json={'params': {}, 'confidence': 0.95})
+    captured = {}
+
+    def fake_to_workbook(params, confidence, scenario, engine):
+        captured['args'] = (params, confidence, scenario, engine)
+        return b'PK\x03\x04fakexlsx'
+
+    monkeypatch.setattr('esds_apps.main.forecast.to_workbook', fake_to_workbook)
+    body = {'params': {}, 'confidence': 0.95, 'scenario': 'abc', 'engine': 'monte_carlo'}
+    resp = auth_client.post('/forecast/download.xlsx', json=body)
     assert resp.status_code == HTTPStatus.OK
+    assert captured['args'] == ({}, 0.95, 'abc', 'monte_carlo')
     assert resp.content == b'PK\x03\x04fakexlsx'
     assert resp.headers['content-disposition'].startswith('attachment; filename=esds_forecast_')
 
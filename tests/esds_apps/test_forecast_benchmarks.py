@@ -0,0 +1,148 @@
+"""pytest-benchmark timings of the forecast against a synthetic attendance DB.
+
+These run with the rest of the suite (``--benchmark-skip`` leaves them out, ``--benchmark-only`` runs just
+these). Absolute times depend on the machine, so a regression is judged against a run saved on the same
+machine (see "Benchmarks" in the README): ``--benchmark-compare-fail`` fails any benchmark whose median has
+grown past the bound since. The only timing assertions made here compare two timings taken in the same run.
+The engines are also compared on accuracy, against a high-sample reference.
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from esds_apps import forecast, timing
+
+
+@pytest.fixture(scope='module')
+def synthetic_sources(tmp_path_factory, forecast_sources):
+    return forecast_sources(tmp_path_factory.mktemp('forecast-benchmarks'), years=4)
+
+
+@pytest.fixture
+def sources(synthetic_sources, monkeypatch):
+    db, defaults = synthetic_sources
+    monkeypatch.setattr('esds_apps.forecast.config.ATTENDANCE_DB_PATH', db)
+    monkeypatch.setattr('esds_apps.forecast.config.FORECAST_DEFAULTS_PATH', defaults)
+    monkeypatch.setattr(forecast, '_CONTEXT', None)
+    monkeypatch.setattr(forecast, '_REBUILD', None)
+    monkeypatch.setattr(forecast, '_FAILED_FINGERPRINT', None)
+    forecast.clear_results()
+    yield
+    forecast.clear_results()
+
+
+def _best_of(fn, rounds: int = 3) -> float:
+    timings = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    return min(timings)
+
+
+def _assert_median_under(benchmark, seconds: float) -> None:
+    if benchmark.stats is not None:  # None under --benchmark-disable, which runs each function once
+        assert benchmark.stats.stats.median < seconds
+
+
+def test_bench_build_context(benchmark, sources):
+    ctx = benchmark.pedantic(forecast._build_context, rounds=3, iterations=1)
+    assert len(ctx.l1_history) == 24
+
+
+def test_bench_predict(benchmark, sources):
+    forecast.get_context()
+
+    def cold_predict():
+        forecast.clear_results()
+        with timing.record() as timings:
+            result = forecast.predict()
+        return result, timings
+
+    result, timings = benchmark.pedantic(cold_predict, rounds=20, iterations=1, warmup_rounds=1)
+    benchmark.extra_info['stages_ms'] = timings.as_dict()  # kept in the saved JSON alongside the stats
+    assert result['net']['lo'] < result['net']['mean'] < result['net']['hi']
+
+
+def test_bench_predict_cached(benchmark, sources):
+    forecast.get_context()
+    cold = _best_of(lambda: (forecast.clear_results(), forecast.predict()))
+    first = forecast.predict()
+    assert benchmark(forecast.predict) is first
+    _assert_median_under(benchmark, cold / 10)  # a repeat is a dictionary lookup, not a forecast
+
+
+def test_bench_predict_monte_carlo(benchmark, sources):
+    forecast.get_context()
+
+    def cold_predict():
+        forecast.clear_results()
+        return forecast.predict(engine='monte_carlo')
+
+    result = benchmark.pedantic(cold_predict, rounds=5, iterations=1, warmup_rounds=1)
+    assert result['engine']['samples'] >= forecast.config.FORECAST_MC_MIN_SAMPLES
+
+
+# How far either engine may sit from the reference on the DEFAULTS scenario: the means (the point estimate,
+# as reported) within £25, and each end of the 95% bands of the net and the year-end balance within £75,
+# about 1% of the band's width and three of the quasi-Monte Carlo engine's standard errors.
+_MEAN_TOLERANCE = 25
+_BAND_TOLERANCE = 75
+
+
+@pytest.fixture
+def reference(sources):
+    """The net and year-end balance of the DEFAULTS scenario from 2^17 plain Monte Carlo draws."""
+    ctx = forecast.get_context()
+    p = forecast._merge_params(ctx, {})
+    cal = forecast.build_calendar(int(p['forecast_ay']))
+    mu, sigma = forecast._mu_sigma(ctx, p, cal)
+    socials = forecast._socials_for(cal['ay'], int(p['n_tea_dances']), bool(p['have_weekender']))
+    ledger = forecast.compile_ledger(ctx, p, cal, socials)
+    draws = np.random.default_rng(1).multivariate_normal(mu, sigma, size=1 << 17)
+    evaluations = [ledger.evaluate(chunk) for chunk in np.array_split(draws, 32)]
+    return {
+        'net': np.concatenate([ev.net for ev in evaluations]),
+        'year_end_balance': np.concatenate([ev.balance[:, -1] for ev in evaluations]),
+    }
+
+
+@pytest.mark.parametrize('engine', sorted(forecast.ENGINES))
+def test_engine_agrees_with_the_reference(sources, reference, engine):
+    """Each engine's means and 95% bands match the high-sample reference within the stated tolerances.
+
+    With the unscented transform this close on the default scenario at a fraction of the cost (compare
+    ``test_bench_predict`` with ``test_bench_predict_monte_carlo``), it stays the default engine.
+    """
+    result = forecast.predict(confidence=0.95, engine=engine)
+    for metric, samples in reference.items():
+        lo, hi = np.percentile(samples, [2.5, 97.5])
+        assert abs(result[metric]['mean'] - samples.mean()) < _MEAN_TOLERANCE
+        assert abs(result[metric]['lo'] - lo) < _BAND_TOLERANCE
+        assert abs(result[metric]['hi'] - hi) < _BAND_TOLERANCE
+
+
+def test_bench_compare_sweep(benchmark, sources):
+    forecast.get_context()
+    scenarios = forecast.sweep('price_class_ord', start=6, stop=12, steps=50)
+
+    def cold_compare():
+        forecast.clear_results()
+        return forecast.compare({}, scenarios)
+
+    rows = benchmark.pedantic(cold_compare, rounds=5, iterations=1, warmup_rounds=1)
+    assert len(rows) == 50
+
+
+def test_bench_solve(benchmark, sources):
+    forecast.get_context()
+    free = {'price_class_ord': [6, 20], 'teacher_rate': [10, 40]}
+
+    def cold_solve():
+        forecast.clear_results()
+        return forecast.solve({}, free, {'metric': 'p_green', 'at_least': 0.8})
+
+    result = benchmark.pedantic(cold_solve, rounds=3, iterations=1)
+    assert len(result['curve']) == forecast.config.FORECAST_SOLVE_CURVE_STEPS
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from esds_apps.leader import LeaderLease, run_as_leader
+
+
+def test_only_one_lease_holder(tmp_path):
+    first = LeaderLease('poller', lock_root=tmp_path)
+    second = LeaderLease('poller', lock_root=tmp_path)
+
+    assert first.try_acquire()
+    assert not second.try_acquire()
+    assert first.try_acquire()  # re-acquiring a held lease is a no-op
+
+    first.release()
+    assert not first.is_held
+    assert second.try_acquire()
+    second.release()
+
+
+def test_leases_are_independent_by_name(tmp_path):
+    a = LeaderLease('a', lock_root=tmp_path)
+    b = LeaderLease('b', lock_root=tmp_path)
+    assert a.try_acquire() and b.try_acquire()
+    a.release()
+    b.release()
+
+
+@pytest.mark.asyncio
+async def test_standby_takes_over_when_leader_stops(tmp_path):
+    runs = []
+
+    async def poller():
+        runs.append('ran')
+        await asyncio.sleep(3600)
+
+    leader = asyncio.create_task(run_as_leader(LeaderLease('p', lock_root=tmp_path), poller, 0.01))
+    await asyncio.sleep(0.05)
+    standby_lease = LeaderLease('p', lock_root=tmp_path)
+    standby = asyncio.create_task(run_as_leader(standby_lease, poller, 0.01))
+    await asyncio.sleep(0.05)
+    assert runs == ['ran']  # the standby is waiting, not polling
+
+    leader.cancel()
+    await asyncio.gather(leader, return_exceptions=True)
+    await asyncio.sleep(0.05)
+    assert runs == ['ran', 'ran']
+    assert standby_lease.is_held
+
+    standby.cancel()
+    await asyncio.gather(standby, return_exceptions=True)
+    assert not standby_lease.is_held
@@ -1,3 +1,4 @@
+import json
 import types
 from http import HTTPStatus
 from unittest.mock import MagicMock, patch
@@ -9,7 +10,9 @@ from fastapi.responses import RedirectResponse, StreamingResponse
 from fastapi.testclient import TestClient
 
 from esds_apps import config
+from esds_apps.executors import ExecutorOverloaded
 from esds_apps.main import (
+    _activity_columns,
     _attendance_activity_rows,
     app,
     card_scanning_log,
@@ -182,6 +185,21 @@ def test_proxy_card_check_invalid_url(client):
     assert response.status_code == HTTPStatus.BAD_REQUEST
 
 
+def test_scanner_card_bundle_is_public(client, monkeypatch):
+    async def fake_bundle(since):
+        return {'version': 'v', 'full': since is None, 'cards': {}}
+
+    monkeypatch.setattr('esds_apps.main.card_bundle.bundle', fake_bundle)
+    response = client.get('/membership-cards/scanner/bundle.json')
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['full'] is True
+
+
+def test_proxy_card_check_rejects_lookalike_host(client):
+    response = client.get(f'/proxy-card-check?url={config.DC_HOST}.evil.example/check')
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
 @pytest.mark.asyncio
 @patch('esds_apps.auth._get_authenticated_email', return_value='user@example.com')
 @patch('esds_apps.main.fetch_membership_card_checks')
@@ -341,8 +359,28 @@ def test_download_qr_code_scans_csv(auth_client, monkeypatch):
     assert '2024-01-01' in response.text
 
 
+def _activity_row(activity_id, day, event_name, activity_name, difficulty, total, waitlisted=0):  # noqa: PLR0913
+    return {
+        'activity_id': activity_id,
+        'date': day,
+        'event_name': event_name,
+        'event_type': 'course',
+        'activity_name': activity_name,
+        'activity_type': 'lesson',
+        'difficulty': difficulty,
+        'named_total': total,
+        'aggregate_total': 0,
+        'total': total,
+        'named_unknown': 0,
+        'named_registered': total,
+        'waitlisted': waitlisted,
+    }
+
+
 def test_attendance_activities_includes_early_term_means(auth_client, monkeypatch):
-    monkeypatch.setattr('esds_apps.main._attendance_activity_rows', lambda: [{'activity_id': 1}])
+    monkeypatch.setattr(
+        'esds_apps.main._attendance_activity_rows', lambda: [_activity_row(1, '1970-01-02', 'L1', 'wk1', 'Level 1', 3)]
+    )
     monkeypatch.setattr(
         'esds_apps.main.analysis.early_term_means',
         lambda: [{'level': 'L1', 'date': '2022-10-01', 'mean': 33.43}],
@@ -350,10 +388,91 @@ def test_attendance_activities_includes_early_term_means(auth_client, monkeypatc
     response = auth_client.get('/attendance/activities.json')
     assert response.status_code == HTTPStatus.OK
     body = response.json()
-    assert body['activities'] == [{'activity_id': 1}]
+    assert body['activities']['activity_id'] == [1]
+    assert body['activities']['day'] == [1]
     assert body['early_term_means'][0]['level'] == 'L1'
 
 
+def test_activity_columns_dictionary_encode_and_count_days():
+    rows = [
+        _activity_row(7, '2024-09-05', 'L1 Autumn', 'wk1', 'Level 1', 20, waitlisted=4),
+        _activity_row(9, '2024-09-05', 'L2 Autumn', 'wk1', 'Level 2', 12),
+        _activity_row(8, '2024-09-12', 'L1 Autumn', 'wk2', 'Level 1', 18, waitlisted=4),
+        _activity_row(3, '2024-09-14', 'Summer party', 'party', None, 50),
+    ]
+    cols = _activity_columns(rows)
+    assert cols['n'] == 4
+    assert cols['activity_id'] == [7, 9, 8, 3]
+    assert cols['day'] == [19971, 0, 7, 2]  # 2024-09-05 is day 19971 of the Unix epoch
+    assert cols['event'] == [0, 1, 0, 2]
+    assert cols['events'] == {
+        'name': ['L1 Autumn', 'L2 Autumn', 'Summer party'],
+        'event_type': ['course', 'course', 'course'],
+        'waitlisted': [4, 0, 0],
+    }
+    assert cols['activity_name'] == {'values': ['wk1', 'wk2', 'party'], 'index': [0, 0, 1, 2]}
+    assert cols['difficulty'] == {'values': ['Level 1', 'Level 2', None], 'index': [0, 1, 0, 2]}
+    assert cols['total'] == [20, 12, 18, 50]
+
+
+def test_attendance_activities_are_cached_per_database_version(auth_client, monkeypatch, tmp_path):
+    from esds_apps.attendance import result_cache
+
+    db = tmp_path / 'attendance.sqlite'
+    db.write_bytes(b'v1')
+    monkeypatch.setattr(config, 'ATTENDANCE_DB_PATH', db)
+    calls = []
+    row = _activity_row(1, '2024-09-05', 'L1', 'wk1', 'Level 1', 3)
+    monkeypatch.setattr('esds_apps.main._attendance_activity_rows', lambda: calls.append(1) or [row])
+    monkeypatch.setattr('esds_apps.main.analysis.early_term_means', lambda: [])
+    result_cache.clear()
+    try:
+        first = auth_client.get('/attendance/activities.json')
+        assert first.status_code == HTTPStatus.OK
+        assert first.headers['cache-control'] == 'private, no-cache'
+        etag = first.headers['etag']
+
+        again = auth_client.get('/attendance/activities.json')
+        assert again.content == first.content and again.headers['etag'] == etag
+
+        revalidated = auth_client.get('/attendance/activities.json', headers={'If-None-Match': etag})
+        assert revalidated.status_code == HTTPStatus.NOT_MODIFIED
+        assert revalidated.content == b''
+        assert len(calls) == 1
+    finally:
+        result_cache.clear()
+
+
+def test_attendance_json_is_gzipped_for_clients_that_accept_it(auth_client, monkeypatch, tmp_path):
+    from esds_apps.attendance import result_cache
+
+    db = tmp_path / 'attendance.sqlite'
+    db.write_bytes(b'v1')
+    monkeypatch.setattr(config, 'ATTENDANCE_DB_PATH', db)
+    rows = [_activity_row(i, '2024-09-05', f'Event {i % 7}', f'wk{i % 10}', 'Level 1', i) for i in range(500)]
+    monkeypatch.setattr('esds_apps.main._attendance_activity_rows', lambda: rows)
+    monkeypatch.setattr('esds_apps.main.analysis.early_term_means', lambda: [])
+    result_cache.clear()
+    try:
+        gzipped = auth_client.get('/attendance/activities.json', headers={'Accept-Encoding': 'gzip'})
+        plain = auth_client.get('/attendance/activities.json', headers={'Accept-Encoding': 'identity'})
+    finally:
+        result_cache.clear()
+    assert gzipped.headers['content-encoding'] == 'gzip'
+    assert 'content-encoding' not in plain.headers
+    assert gzipped.headers['vary'] == plain.headers['vary'] == 'Accept-Encoding'
+    assert gzipped.headers['etag'] != plain.headers['etag']
+    assert gzipped.json() == plain.json()  # the client decodes the gzipped body transparently
+    assert int(gzipped.headers['content-length']) * 5 < int(plain.headers['content-length'])
+
+
+def test_attendance_activities_db_missing(auth_client, monkeypatch, tmp_path):
+    monkeypatch.setattr(config, 'ATTENDANCE_DB_PATH', tmp_path / 'missing.sqlite')
+    response = auth_client.get('/attendance/activities.json')
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert 'error' in response.json()
+
+
 def test_attendance_summaries_ok(auth_client, monkeypatch):
     payload = {'beginner_intake': [{'label': '24/25', 'points': []}], 'level2_socials': [], 'cohort_retention': {}}
     monkeypatch.setattr('esds_apps.main.analysis.summaries', lambda: payload)
@@ -408,6 +527,60 @@ def test_attendance_activity_records_requires_auth(client):
     assert client.get('/attendance/activity/7/records.json').status_code == HTTPStatus.UNAUTHORIZED
 
 
+def _fake_chunks(activity_id):
+    if activity_id == 404:
+        return []
+    return [
+        {'activity': {'activity_id': activity_id, 'event_name': 'Weekender'}},
+        {'record_type': 'named', 'dancer_id': f'DNC-{activity_id}', 'status': 'attended', 'enc_name': 'gAAAA'},
+        {'record_type': 'aggregate', 'ticket_type': 'ordinary', 'head_count': 5},
+    ]
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_attendance_activity_records_ndjson_sends_the_context_once(auth_client, monkeypatch):
+    monkeypatch.setattr('esds_apps.main.analysis.activity_record_chunk', _fake_chunks)
+    response = auth_client.get('/attendance/activity/7/records.ndjson')
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert response.headers['cache-control'] == 'no-store'
+    assert _ndjson(response) == [*_fake_chunks(7), {'end': {'activities': 1}}]
+
+
+def test_attendance_activities_records_ndjson_streams_each_activity(auth_client, monkeypatch):
+    monkeypatch.setattr('esds_apps.main.analysis.activity_record_chunk', _fake_chunks)
+    response = auth_client.get('/attendance/activities/records.ndjson?activity_id=3&activity_id=404&activity_id=5')
+    assert response.status_code == HTTPStatus.OK
+    lines = _ndjson(response)
+    assert [line['activity']['activity_id'] for line in lines if 'activity' in line] == [3, 5]  # 404 is unknown
+    assert lines[-1] == {'end': {'activities': 3}}
+
+
+def test_attendance_activities_records_ndjson_bounds_the_request(auth_client):
+    assert auth_client.get('/attendance/activities/records.ndjson').status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    too_many = '&'.join(f'activity_id={i}' for i in range(config.ATTENDANCE_RECORDS_EXPORT_MAX_ACTIVITIES + 1))
+    response = auth_client.get(f'/attendance/activities/records.ndjson?{too_many}')
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_attendance_activity_records_ndjson_db_missing(auth_client, monkeypatch):
+    def _raise(activity_id):
+        raise FileNotFoundError('no db')
+
+    monkeypatch.setattr('esds_apps.main.analysis.activity_record_chunk', _raise)
+    response = auth_client.get('/attendance/activity/7/records.ndjson')
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert 'error' in response.json()
+
+
+def test_attendance_activity_records_ndjson_requires_auth(client):
+    assert client.get('/attendance/activity/7/records.ndjson').status_code == HTTPStatus.UNAUTHORIZED
+    assert client.get('/attendance/activities/records.ndjson?activity_id=7').status_code == HTTPStatus.UNAUTHORIZED
+
+
 def test_attendance_activity_rows_include_event_waitlist(tmp_path, monkeypatch):
     """Each scatter row carries its parent event's waitlist count (0 where there is none)."""
     from esds_apps.attendance.attendance_db import ActivityType, AttendanceStatus, EventType, open_db
@@ -518,6 +691,27 @@ def test_health_endpoint(client):
     assert client.get('/health').status_code == HTTPStatus.OK
 
 
+def test_health_metrics_reports_pools(auth_client):
+    response = auth_client.get('/health/metrics')
+    assert response.status_code == HTTPStatus.OK
+    assert set(response.json()['executors']) == {'forecast', 'attendance', 'render'}
+
+
+def test_health_metrics_requires_auth(client):
+    assert client.get('/health/metrics').status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_overloaded_pool_returns_503_with_retry_after(auth_client, monkeypatch):
+    async def _reject(*args, **kwargs):
+        raise ExecutorOverloaded('forecast', 7)
+
+    monkeypatch.setattr('esds_apps.main.FORECAST_POOL.run', _reject)
+    response = auth_client.post('/forecast/predict.json', json={'params': {}})
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers['retry-after'] == '7'
+    assert 'forecast' in response.json()['error']
+
+
 def test_auth_login_redirects_to_google(client):
     response = client.get('/auth/login')
     assert response.status_code == HTTPStatus.FOUND
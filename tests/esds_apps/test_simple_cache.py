@@ -1,4 +1,5 @@
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import pytest
@@ -60,3 +61,37 @@ def test_invalid_timestamp_fails_cleanly():
     # Confirm ValueError bubbles up from datetime.fromisoformat
     with pytest.raises(ValueError):
         SimpleCache.from_os_safe_iso_timestamp('not-a-date')
+
+
+def test_cache_update_read_modify_write(tmp_path):
+    cache = SimpleCache('testcache', max_age_s=60, cache_root=tmp_path)
+    assert cache.update(lambda current: {**(current or {}), 'a': 1}) == {'a': 1}
+    assert cache.update(lambda current: {**current, 'b': 2}) == {'a': 1, 'b': 2}
+    assert cache.read() == {'a': 1, 'b': 2}
+    assert len(list(tmp_path.glob('testcache_*.json'))) == 1
+
+
+def test_cache_update_keeps_the_old_data_if_the_write_fails(tmp_path):
+    cache = SimpleCache('testcache', max_age_s=60, cache_root=tmp_path)
+    cache.write({'a': 1})
+    with pytest.raises(TypeError):
+        cache.update(lambda current: {**current, 'b': object()})  # not JSON-serialisable
+    assert cache.read() == {'a': 1}
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_cache_concurrent_updates_are_not_lost(tmp_path):
+    cache = SimpleCache('testcache', max_age_s=60, cache_root=tmp_path)
+
+    def add(i):
+        cache.update(lambda current: {**(current or {}), str(i): i})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(add, range(40)))
+    assert cache.read() == {str(i): i for i in range(40)}
+
+
+def test_cache_write_leaves_no_temporary_files(tmp_path):
+    cache = SimpleCache('testcache', max_age_s=60, cache_root=tmp_path)
+    cache.write({'x': 1})
+    assert not list(tmp_path.glob('*.tmp'))
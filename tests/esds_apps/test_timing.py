@@ -0,0 +1,51 @@
+import re
+
+from esds_apps import timing
+from esds_apps.executors import BoundedPool
+
+
+def test_spans_outside_a_recording_are_free():
+    with timing.span('nothing'):
+        pass
+
+
+def test_spans_add_up_and_nest():
+    with timing.record() as timings:
+        for _ in range(3):
+            with timing.span('outer'):
+                with timing.span('inner'):
+                    pass
+    assert list(timings.spans) == ['inner', 'outer']
+    assert timings.spans['outer'] >= timings.spans['inner'] > 0
+    as_dict = timings.as_dict()
+    assert list(as_dict) == ['inner', 'outer', 'total']
+    assert as_dict['total'] >= as_dict['outer']
+
+
+def test_header_format():
+    with timing.record() as timings:
+        timings.add('mu_sigma', 0.0012)
+    assert re.fullmatch(r'mu_sigma;dur=1\.2, total;dur=\d+\.?\d*', timings.header())
+
+
+def test_recordings_are_separate():
+    with timing.record() as outer:
+        with timing.record() as inner:
+            with timing.span('a'):
+                pass
+        with timing.span('b'):
+            pass
+    assert list(inner.spans) == ['a']
+    assert list(outer.spans) == ['b']
+
+
+async def test_spans_cross_into_executor_pools():
+    pool = BoundedPool('timing-test', max_workers=1, max_queued=1)
+
+    def work():
+        with timing.span('in_pool'):
+            return 42
+
+    with timing.record() as timings:
+        assert await pool.run(work) == 42
+    assert 'in_pool' in timings.spans